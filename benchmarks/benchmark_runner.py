@@ -0,0 +1,331 @@
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import sklearn
+from joblib import Parallel, delayed, effective_n_jobs
+from joblib.externals.loky import get_reusable_executor
+from sklearn.datasets import make_classification
+from tabulate import tabulate
+
+from benchmarks.fit_counter import FitCounter
+from benchmarks.benchmark_stages import BenchmarkStage, FeatureSearchStage, ParamsSearchStage, ValidationStage, \
+    ManagerStage
+from manager.process_usage import get_cpu_time, get_peak_rss
+from regression_vars_search.adaptive_recursive_feature_searcher import AdaptiveRecursiveFeatureSearcher
+from regression_vars_search.filter_feature_searcher import AnovaFeatureSearcher, MutualInformationFeatureSearcher
+from regression_vars_search.k_best_feature_searcher import SelectKBestFeatureSearcher
+
+SUITES = {
+    'quick': {
+        'rows': [1_000, 10_000],
+        'features': [10, 100],
+        'n_jobs': [1, -1],
+        'max_cells': None,
+    },
+    'full': {
+        'rows': [1_000, 10_000, 100_000, 1_000_000],
+        'features': [10, 100, 500],
+        'n_jobs': [1, -1],
+        'max_cells': 100_000_000,
+    },
+}
+"""
+Configurações das suítes. Combinações de linhas e features maiores que max_cells são ignoradas, os dados sintéticos
+são gerados inteiros em memória.
+"""
+
+
+class BenchmarkCase:
+    """
+    Combinação de uma etapa com um tamanho de dados sintéticos e uma quantidade de processos.
+    """
+
+    def __init__(self, stage: BenchmarkStage, rows: int, features: int, n_jobs: int):
+        """
+        :param stage: Etapa que será medida.
+
+        :param rows: Quantidade de linhas dos dados sintéticos.
+
+        :param features: Quantidade de features dos dados sintéticos, equivalente às colunas já codificadas.
+
+        :param n_jobs: Número de processos utilizados pela etapa.
+        """
+        self.stage = stage
+        self.rows = rows
+        self.features = features
+        self.n_jobs = n_jobs
+
+    @property
+    def key(self) -> str:
+        return f'{self.stage.name}|rows={self.rows}|features={self.features}|n_jobs={self.n_jobs}'
+
+
+class BenchmarkRunner:
+    """
+    Executa os casos de benchmark e compara os resultados com um baseline.
+
+    Cada medição acontece em um processo novo, dessa forma o pico de memória (RSS) de um caso não é herdado pelo caso
+    seguinte. São registrados o tempo total, o tempo de CPU do processo e dos processos filhos (como os do joblib), o
+    pico de memória e a quantidade de fits por segundo, contabilizados pelo FitCounter, inclusive os realizados em
+    outros processos.
+    """
+
+    def __init__(self,
+                 cases: list[BenchmarkCase],
+                 repeats: int = 1,
+                 tolerance: float = 0.2,
+                 seed: int = 42):
+        """
+        :param cases: Casos que serão executados.
+
+        :param repeats: Quantidade de vezes que cada caso é executado, é mantida a execução com o menor tempo.
+
+        :param tolerance: Aumento relativo, em relação ao baseline, a partir do qual o tempo ou a memória de um caso são
+        considerados uma regressão. Por exemplo, 0.2 aceita até 20% a mais.
+
+        :param seed: Seed utilizada na geração dos dados sintéticos.
+        """
+        self.cases = cases
+        self.repeats = repeats
+        self.tolerance = tolerance
+        self.seed = seed
+
+    def run(self) -> dict:
+        """
+        Executa todos os casos e retorna o relatório com o ambiente e os resultados.
+        """
+        results = []
+        context = multiprocessing.get_context('spawn')
+
+        for case in self.cases:
+            runs = []
+
+            for _ in range(self.repeats):
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as executor:
+                    runs.append(executor.submit(_measure_case, case, self.seed).result())
+
+            results.append(min(runs, key=lambda result: result['wall_time']))
+            print(f"{case.key}: {results[-1]['wall_time']:.3f}s, {results[-1]['fits_per_second']:.1f} fits/s")
+
+        return {
+            'created_at': datetime.now().isoformat(timespec='seconds'),
+            'environment': _get_environment(),
+            'results': results,
+        }
+
+    def compare(self, report: dict, baseline: dict) -> pd.DataFrame:
+        """
+        Compara os resultados com o baseline, caso a caso. Casos que não existem no baseline não são comparados.
+
+        :param report: Relatório retornado por run.
+
+        :param baseline: Relatório salvo anteriormente.
+
+        :return: DataFrame com os valores de cada caso, a razão em relação ao baseline e se houve regressão.
+        """
+        baseline_results = {result['key']: result for result in baseline['results']}
+        rows = []
+
+        for result in report['results']:
+            reference = baseline_results.get(result['key'])
+
+            if reference is None:
+                continue
+
+            wall_ratio = result['wall_time'] / reference['wall_time'] if reference['wall_time'] > 0 else 1.0
+            rss_ratio = result['peak_rss'] / reference['peak_rss'] if reference['peak_rss'] > 0 else 1.0
+
+            rows.append({
+                'case': result['key'],
+                'baseline_wall_time': reference['wall_time'],
+                'wall_time': result['wall_time'],
+                'wall_ratio': wall_ratio,
+                'rss_ratio': rss_ratio,
+                'regression': wall_ratio > 1 + self.tolerance or rss_ratio > 1 + self.tolerance,
+            })
+
+        return pd.DataFrame(rows, columns=['case', 'baseline_wall_time', 'wall_time', 'wall_ratio', 'rss_ratio',
+                                           'regression'])
+
+
+def save_report(report: dict, path: str):
+    """
+    Salva o relatório em JSON. O arquivo é gravado em um arquivo temporário e renomeado.
+    """
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+
+    file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+
+    with os.fdopen(file_descriptor, 'w') as file:
+        json.dump(report, file, indent=2)
+
+    os.replace(temp_path, path)
+
+
+def load_report(path: str) -> dict:
+    with open(path, 'r') as file:
+        return json.load(file)
+
+
+def get_suite_cases(suite: str) -> list[BenchmarkCase]:
+    """
+    Retorna os casos de uma das suítes de SUITES, todas as etapas combinadas com cada tamanho e n_jobs.
+    """
+    configuration = SUITES[suite]
+    stages = [
+        FeatureSearchStage(SelectKBestFeatureSearcher(feature_number=10)),
+        FeatureSearchStage(AnovaFeatureSearcher(feature_number=10)),
+        FeatureSearchStage(MutualInformationFeatureSearcher(feature_number=10)),
+        FeatureSearchStage(AdaptiveRecursiveFeatureSearcher(min_features=10)),
+        ParamsSearchStage(),
+        ValidationStage(),
+        ManagerStage(),
+    ]
+
+    return [
+        BenchmarkCase(stage, rows, features, n_jobs)
+        for stage in stages
+        for rows in configuration['rows']
+        for features in configuration['features']
+        for n_jobs in configuration['n_jobs']
+        if configuration['max_cells'] is None or rows * features <= configuration['max_cells']
+    ]
+
+
+def make_dataset(rows: int, features: int, seed: int) -> tuple[pd.DataFrame, pd.Series]:
+    """
+    Gera dados sintéticos de classificação binária, com float32 assim como os dados codificados do projeto.
+    """
+    x, y = make_classification(n_samples=rows,
+                               n_features=features,
+                               n_informative=max(2, features // 5),
+                               n_redundant=features // 10,
+                               random_state=seed)
+
+    data_x = pd.DataFrame(x.astype(np.float32), columns=[f'feature_{position}' for position in range(features)])
+
+    return data_x, pd.Series(y.astype(np.int8), name='target')
+
+
+def _measure_case(case: BenchmarkCase, seed: int) -> dict:
+    """
+    Executa um caso dentro do processo novo e retorna as medições.
+
+    Os processos do executor do joblib são iniciados antes do início da medição e finalizados depois do fim da medição
+    do tempo, os tempos gastos nessas etapas são informados separadamente. O executor precisa ser finalizado para que o
+    tempo de CPU e o pico de memória dos processos filhos sejam contabilizados, por isso o tempo de CPU inclui também a
+    inicialização dos processos.
+    """
+    data_x, data_y = make_dataset(case.rows, case.features, seed)
+    np.random.seed(seed)
+
+    with tempfile.TemporaryDirectory() as directory:
+        fit_counter = FitCounter(os.path.join(directory, 'fits'))
+        estimator = fit_counter.wrap(case.stage.estimator)
+
+        start_usage = get_cpu_time()
+        executor_startup_time = _start_executor(case.n_jobs)
+        start_time = time.perf_counter()
+
+        case.stage.run(estimator, data_x, data_y, case.n_jobs)
+
+        wall_time = time.perf_counter() - start_time
+
+        get_reusable_executor().shutdown(wait=True)
+
+        executor_shutdown_time = time.perf_counter() - start_time - wall_time
+        cpu_time = get_cpu_time() - start_usage
+        fits = fit_counter.count()
+
+    return {
+        'key': case.key,
+        'stage': case.stage.name,
+        'rows': case.rows,
+        'features': case.features,
+        'n_jobs': case.n_jobs,
+        'wall_time': wall_time,
+        'cpu_time': cpu_time,
+        'executor_startup_time': executor_startup_time,
+        'executor_shutdown_time': executor_shutdown_time,
+        'peak_rss': get_peak_rss(),
+        'children_peak_rss': get_peak_rss(children=True),
+        'fits': fits,
+        'fits_per_second': fits / wall_time if wall_time > 0 else 0.0,
+    }
+
+
+def _start_executor(n_jobs: int) -> float:
+    """
+    Inicia os processos do executor reutilizável do joblib, que serão aproveitados pela etapa, e retorna o tempo gasto.
+
+    :param n_jobs: Número de processos que a etapa irá utilizar.
+    """
+    if n_jobs == 1:
+        return 0.0
+
+    start_time = time.perf_counter()
+    workers = effective_n_jobs(n_jobs)
+    Parallel(n_jobs=n_jobs)(delayed(abs)(position) for position in range(workers * 2))
+
+    return time.perf_counter() - start_time
+
+
+def _get_environment() -> dict:
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'numpy': np.__version__,
+        'pandas': pd.__version__,
+        'scikit-learn': sklearn.__version__,
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Executa os benchmarks das etapas e do '
+                                                 'ScikitLearnMultiProcessManager.')
+    parser.add_argument('--suite', choices=list(SUITES), default='quick')
+    parser.add_argument('--rows', type=int, nargs='+', help='Substitui as quantidades de linhas da suíte.')
+    parser.add_argument('--features', type=int, nargs='+', help='Substitui as quantidades de features da suíte.')
+    parser.add_argument('--n-jobs', type=int, nargs='+', help='Substitui os valores de n_jobs da suíte.')
+    parser.add_argument('--max-cells', type=int, help='Substitui o limite de linhas x features da suíte.')
+    parser.add_argument('--stages', nargs='+', help='Executa apenas as etapas cujo nome começa com um dos valores.')
+    parser.add_argument('--repeats', type=int, default=1)
+    parser.add_argument('--output', default='benchmarks/results/latest.json')
+    parser.add_argument('--baseline', help='Relatório salvo anteriormente para comparação.')
+    parser.add_argument('--save-baseline', action='store_true', help='Salva os resultados também no --baseline.')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args()
+
+    for name in ['rows', 'features', 'n_jobs', 'max_cells']:
+        if getattr(args, name) is not None:
+            SUITES[args.suite][name] = getattr(args, name)
+
+    selected_cases = [
+        case for case in get_suite_cases(args.suite)
+        if args.stages is None or any(case.stage.name.startswith(stage) for stage in args.stages)
+    ]
+
+    runner = BenchmarkRunner(cases=selected_cases, repeats=args.repeats, tolerance=args.tolerance)
+    benchmark_report = runner.run()
+    save_report(benchmark_report, args.output)
+
+    if args.baseline is not None and args.save_baseline:
+        save_report(benchmark_report, args.baseline)
+    elif args.baseline is not None:
+        comparison = runner.compare(benchmark_report, load_report(args.baseline))
+        print(tabulate(comparison, headers='keys', tablefmt='fancy_grid', floatfmt='.3f', showindex=False))
+
+        if comparison['regression'].any():
+            sys.exit(1)
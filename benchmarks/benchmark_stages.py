@@ -0,0 +1,184 @@
+import contextlib
+import io
+import os
+import tempfile
+from abc import ABC, abstractmethod
+
+from scipy.stats import randint
+from sklearn.model_selection import StratifiedKFold
+from sklearn.tree import DecisionTreeClassifier
+
+from hiper_params_search.random_searcher import RandomHipperParamsSearcher
+from manager.history_manager import CrossValidationHistoryManager
+from manager.multi_process_manager import ScikitLearnMultiProcessManager
+from manager.multi_process_manager_pipelines import ScikitLearnPipeline
+from model_validator.cross_validator import CrossValidatorScikitLearn
+from regression_vars_search.features_searcher import FeaturesSearcher
+from regression_vars_search.filter_feature_searcher import AnovaFeatureSearcher
+
+DEFAULT_PARAMS = {
+    'max_depth': randint(2, 20),
+    'min_samples_split': randint(2, 20),
+}
+
+
+class BenchmarkStage(ABC):
+    """
+    Classe base das etapas medidas pelo BenchmarkRunner. Cada etapa executa uma parte do processo, ou o processo
+    inteiro, sobre os dados sintéticos do caso.
+
+    As instâncias são enviadas para um processo novo a cada medição, por isso devem ser serializáveis.
+    """
+
+    def __init__(self,
+                 estimator=None,
+                 params: dict = None,
+                 fold_splits: int = 3):
+        """
+        :param estimator: Estimador utilizado pela etapa. Se não for definido será utilizado DecisionTreeClassifier.
+
+        :param params: Distribuições dos parâmetros testados na busca. Se não for definido será utilizado
+        DEFAULT_PARAMS, que corresponde aos parâmetros do DecisionTreeClassifier.
+
+        :param fold_splits: Quantidade de folds da validação cruzada.
+        """
+        self.estimator = estimator if estimator is not None else DecisionTreeClassifier()
+        self.params = params if params is not None else DEFAULT_PARAMS
+        self.fold_splits = fold_splits
+
+    @property
+    @abstractmethod
+    def name(self) -> str:
+        """
+        Identificação da etapa, utilizada para comparar os resultados com o baseline.
+        """
+
+    @abstractmethod
+    def run(self, estimator, data_x, data_y, n_jobs: int):
+        """
+        Executa a etapa.
+
+        :param estimator: Cópia do estimador da etapa que contabiliza os fits realizados.
+
+        :param data_x: Valores de x (features).
+
+        :param data_y: Valores de y (target).
+
+        :param n_jobs: Número de processos que a etapa deve utilizar.
+        """
+
+    def _get_cv(self):
+        return StratifiedKFold(n_splits=self.fold_splits, shuffle=True, random_state=42)
+
+
+class FeatureSearchStage(BenchmarkStage):
+    """
+    Mede apenas a seleção de features de um FeaturesSearcher.
+    """
+
+    def __init__(self, feature_searcher: FeaturesSearcher, estimator=None, fold_splits: int = 3):
+        """
+        :param feature_searcher: Searcher que será medido.
+        """
+        super().__init__(estimator=estimator, fold_splits=fold_splits)
+
+        self.feature_searcher = feature_searcher
+
+    @property
+    def name(self) -> str:
+        return f'feature_search.{type(self.feature_searcher).__name__}'
+
+    def run(self, estimator, data_x, data_y, n_jobs: int):
+        self.feature_searcher.n_jobs = n_jobs
+        self.feature_searcher.select_features(data_x, data_y, self._get_cv(), estimator=estimator)
+
+
+class ParamsSearchStage(BenchmarkStage):
+    """
+    Mede apenas a busca de parâmetros do RandomHipperParamsSearcher.
+    """
+
+    def __init__(self, number_iterations: int = 10, estimator=None, params: dict = None, fold_splits: int = 3):
+        """
+        :param number_iterations: Número de iterações da busca.
+        """
+        super().__init__(estimator, params, fold_splits)
+
+        self.number_iterations = number_iterations
+
+    @property
+    def name(self) -> str:
+        return 'params_search.RandomHipperParamsSearcher'
+
+    def run(self, estimator, data_x, data_y, n_jobs: int):
+        searcher = RandomHipperParamsSearcher(number_iterations=self.number_iterations, n_jobs=n_jobs)
+        searcher.search_hipper_parameters(estimator, self.params, data_x, data_y, self._get_cv(), 'accuracy')
+
+
+class ValidationStage(ParamsSearchStage):
+    """
+    Mede a validação cruzada aninhada do CrossValidatorScikitLearn, ou seja, a busca de parâmetros refeita dentro de
+    cada fold.
+    """
+
+    @property
+    def name(self) -> str:
+        return 'validation.CrossValidatorScikitLearn'
+
+    def run(self, estimator, data_x, data_y, n_jobs: int):
+        searcher = RandomHipperParamsSearcher(number_iterations=self.number_iterations, n_jobs=n_jobs)
+        search_cv = searcher.search_hipper_parameters(estimator, self.params, data_x, data_y, self._get_cv(),
+                                                      'accuracy')
+
+        CrossValidatorScikitLearn(n_jobs=n_jobs).validate(search_cv, data_x, data_y, self._get_cv())
+
+
+class ManagerStage(ParamsSearchStage):
+    """
+    Mede o processo completo do ScikitLearnMultiProcessManager com um pipeline: seleção de features com o
+    AnovaFeatureSearcher, busca de parâmetros, validação aninhada e gravação do histórico em um diretório temporário.
+    """
+
+    def __init__(self,
+                 number_iterations: int = 10,
+                 estimator=None,
+                 params: dict = None,
+                 fold_splits: int = 3,
+                 feature_number: int = 10):
+        """
+        :param feature_number: Quantidade de features selecionadas pelo AnovaFeatureSearcher.
+        """
+        super().__init__(number_iterations, estimator, params, fold_splits)
+
+        self.feature_number = feature_number
+
+    @property
+    def name(self) -> str:
+        return 'manager.ScikitLearnMultiProcessManager'
+
+    def run(self, estimator, data_x, data_y, n_jobs: int):
+        with tempfile.TemporaryDirectory() as directory, contextlib.redirect_stdout(io.StringIO()):
+            pipeline = ScikitLearnPipeline(
+                estimator=estimator,
+                params=self.params,
+                feature_searcher=AnovaFeatureSearcher(feature_number=self.feature_number),
+                params_searcher=RandomHipperParamsSearcher(number_iterations=self.number_iterations),
+                validator=CrossValidatorScikitLearn(),
+                history_manager=CrossValidationHistoryManager(output_directory=os.path.join(directory, 'history'),
+                                                              models_directory='models',
+                                                              params_file_name='params')
+            )
+            pipeline.set_n_jobs(n_jobs)
+
+            manager = ScikitLearnMultiProcessManager(
+                data_x=data_x,
+                data_y=data_y,
+                seed=42,
+                fold_splits=self.fold_splits,
+                pipelines=[pipeline],
+                history_manager=CrossValidationHistoryManager(output_directory=os.path.join(directory, 'bests'),
+                                                              models_directory='models',
+                                                              params_file_name='params'),
+                stratified=True
+            )
+            manager.process_pipelines()
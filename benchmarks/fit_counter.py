@@ -0,0 +1,92 @@
+import os
+
+
+class FitCounter:
+    """
+    Contador dos fits realizados por um estimador e por todas as suas cópias, inclusive as criadas pelo clone do
+    scikit-learn e as enviadas para outros processos pelo joblib.
+
+    Cada fit adiciona um byte no arquivo do contador. Escritas com O_APPEND são atômicas, por isso fits de processos
+    diferentes não se perdem e a quantidade de fits é o tamanho do arquivo.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Caminho do arquivo do contador.
+        """
+        self.path = path
+
+    def wrap(self, estimator):
+        """
+        Retorna uma cópia do estimador, com os mesmos parâmetros, que contabiliza os fits. A classe retornada possui o
+        mesmo nome da classe original.
+
+        :param estimator: Instância do estimador que deseja contabilizar.
+        """
+        counted_class = _get_counted_class(_get_base_class(type(estimator)))
+        counted_estimator = counted_class(**estimator.get_params(deep=False))
+        counted_estimator.counter_path = self.path
+
+        return counted_estimator
+
+    def count(self) -> int:
+        """
+        Retorna a quantidade de fits contabilizados.
+        """
+        return os.path.getsize(self.path) if os.path.exists(self.path) else 0
+
+    def add(self):
+        file_descriptor = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+
+        try:
+            os.write(file_descriptor, b'.')
+        finally:
+            os.close(file_descriptor)
+
+
+class _CountedFitMixin:
+    """
+    Mixin adicionado às classes dos estimadores para que cada fit seja registrado no FitCounter.
+    """
+
+    counter_path: str = None
+
+    def fit(self, X, y=None, **fit_params):
+        result = super().fit(X, y, **fit_params)
+        FitCounter(self.counter_path).add()
+
+        return result
+
+    def __sklearn_clone__(self):
+        estimator = type(self)(**self.get_params(deep=False))
+        estimator.counter_path = self.counter_path
+
+        return estimator
+
+    def __reduce__(self):
+        return _rebuild_counted_estimator, (_get_base_class(type(self)),), self.__getstate__()
+
+
+_counted_classes = {}
+
+
+def _get_counted_class(estimator_class):
+    """
+    Cria, uma única vez por classe de estimador, a subclasse que contabiliza os fits.
+    """
+    if estimator_class not in _counted_classes:
+        _counted_classes[estimator_class] = type(estimator_class.__name__,
+                                                 (_CountedFitMixin, estimator_class),
+                                                 {'__module__': _CountedFitMixin.__module__})
+
+    return _counted_classes[estimator_class]
+
+
+def _get_base_class(estimator_class):
+    return estimator_class.__bases__[1] if issubclass(estimator_class, _CountedFitMixin) else estimator_class
+
+
+def _rebuild_counted_estimator(estimator_class):
+    counted_class = _get_counted_class(estimator_class)
+
+    return counted_class.__new__(counted_class)
@@ -1,25 +1,262 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+from typing import Iterator
+
+import joblib
+import numpy as np
 import pandas as pd
-from pandas.core.interchange.dataframe_protocol import DataFrame
+from pandas import CategoricalDtype, DataFrame
+
+from data.preprocessor import TabularPreprocessor
+
+DATA_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_CACHE_DIRECTORY = os.path.join(DATA_DIRECTORY, 'cache')
+
+# Deve ser incrementada sempre que o tratamento dos dados mudar de uma forma que não esteja refletida nas constantes
+# deste módulo, dessa forma os caches antigos deixam de ser utilizados.
+PREPROCESSING_VERSION = 2
+
+TRAIN_COLUMNS = ['id_passageiro', 'sobreviveu', 'classe_social', 'nome', 'sexo', 'idade', 'qtd_irmaos_conjuges',
+                 'qtd_pais_filhos', 'ticket', 'valor_ticket', 'cabine', 'porta_embarque']
+
+TEST_COLUMNS = ['id_passageiro', 'classe_social', 'nome', 'sexo', 'idade', 'qtd_irmaos_conjuges', 'qtd_pais_filhos',
+                'ticket', 'valor_ticket', 'cabine', 'porta_embarque']
+
+# Id do Passageiro, Nome do passageiro e ticket não fazem diferença para classificar, valor do ticket já é representado
+# pela classe social e cabine possui muitos valores nulos.
+DROPPED_COLUMNS = ['id_passageiro', 'nome', 'ticket', 'valor_ticket', 'cabine']
+
+# As categorias são fixas para que todos os blocos lidos tenham o mesmo tipo e a concatenação mantenha as categorias.
+COLUMNS_DTYPES = {
+    'sobreviveu': 'int8',
+    'classe_social': 'int8',
+    'sexo': CategoricalDtype(['female', 'male']),
+    'idade': 'float32',
+    'qtd_irmaos_conjuges': 'int8',
+    'qtd_pais_filhos': 'int8',
+    'porta_embarque': CategoricalDtype(['C', 'Q', 'S']),
+}
+
+DEFAULT_CHUNK_SIZE = 100_000
+
+
+def get_train_data(path: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DataFrame:
+    """
+    Carrega os dados de treino já tratados.
+
+    :param path: Caminho do CSV de treino. Se não for definido será utilizado o train.csv do diretório data.
+
+    :param chunk_size: Quantidade de linhas lidas por vez.
+    """
+    path = path if path is not None else os.path.join(DATA_DIRECTORY, 'train.csv')
+
+    return _read_passengers_csv(path, TRAIN_COLUMNS, chunk_size)
+
+
+def get_test_data(path: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> DataFrame:
+    """
+    Carrega os dados de teste já tratados.
+
+    :param path: Caminho do CSV de teste. Se não for definido será utilizado o test.csv do diretório data.
+
+    :param chunk_size: Quantidade de linhas lidas por vez.
+    """
+    path = path if path is not None else os.path.join(DATA_DIRECTORY, 'test.csv')
+
+    return _read_passengers_csv(path, TEST_COLUMNS, chunk_size)
+
+
+def iter_test_data(path: str = None, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[DataFrame]:
+    """
+    Percorre os dados de teste em blocos, com os mesmos tipos compactos do get_test_data, mas mantendo o id_passageiro
+    e os registros sem idade, que também precisam ser classificados. Utilizado na inferência de arquivos grandes.
+
+    :param path: Caminho do arquivo de teste, CSV ou Parquet. Se não for definido será utilizado o test.csv do diretório
+    data. Arquivos Parquet dependem do pyarrow e suas colunas são identificadas pela posição, assim como no CSV.
+
+    :param chunk_size: Quantidade de linhas de cada bloco.
+    """
+    path = path if path is not None else os.path.join(DATA_DIRECTORY, 'test.csv')
+    dropped_columns = [column for column in DROPPED_COLUMNS if column != 'id_passageiro']
+
+    return _iter_passengers_file(path, TEST_COLUMNS, dropped_columns, chunk_size)
+
+
+def get_encoded_train_data(path: str = None,
+                           cache_directory: str = DEFAULT_CACHE_DIRECTORY,
+                           chunk_size: int = DEFAULT_CHUNK_SIZE) -> tuple[DataFrame, TabularPreprocessor]:
+    """
+    Retorna os dados de treino tratados e codificados pelo TabularPreprocessor, prontos para serem separados em x e y,
+    junto com o próprio preprocessor treinado, que deve ser utilizado para transformar os dados de inferência.
+
+    O resultado é mantido em um cache colunar, um arquivo .npy por coluna e o preprocessor, identificado pelo hash do
+    CSV e pela configuração do tratamento. Nas execuções seguintes as colunas são abertas mapeadas em memória, sem
+    copiar os dados e sem ler o CSV novamente. Quando o CSV ou o tratamento mudarem um novo cache é gerado e o anterior
+    é removido.
+
+    :param path: Caminho do CSV de treino. Se não for definido será utilizado o train.csv do diretório data.
+
+    :param cache_directory: Diretório onde o cache será armazenado. Se for None o cache não é utilizado.
+
+    :param chunk_size: Quantidade de linhas lidas por vez quando o CSV precisar ser lido.
+    """
+    path = path if path is not None else os.path.join(DATA_DIRECTORY, 'train.csv')
+
+    if cache_directory is None:
+        return _encode(get_train_data(path, chunk_size))
+
+    prefix = f'{os.path.splitext(os.path.basename(path))[0]}_{joblib.hash(os.path.abspath(path))[:8]}_'
+    entry_directory = os.path.join(cache_directory, prefix + _get_cache_key(path))
+
+    if not os.path.exists(entry_directory):
+        _write_columnar_cache(*_encode(get_train_data(path, chunk_size)), entry_directory)
+        _remove_stale_caches(cache_directory, prefix, entry_directory)
+
+    return _read_columnar_cache(entry_directory)
+
+
+def _encode(df: DataFrame) -> tuple[DataFrame, TabularPreprocessor]:
+    data_x = df.drop(columns=['sobreviveu'])
+    preprocessor = TabularPreprocessor().fit(data_x)
+
+    encoded = preprocessor.transform(data_x)
+    encoded.insert(0, 'sobreviveu', df['sobreviveu'])
+
+    return encoded, preprocessor
+
+
+def _get_cache_key(path: str) -> str:
+    """
+    Calcula a chave do cache a partir do conteúdo do CSV e da configuração do tratamento dos dados.
+    """
+    file_hash = hashlib.sha256()
+
+    with open(path, 'rb') as file:
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            file_hash.update(block)
+
+    config = (PREPROCESSING_VERSION, TRAIN_COLUMNS, DROPPED_COLUMNS, {
+        column: str(dtype) if not isinstance(dtype, CategoricalDtype) else list(dtype.categories)
+        for column, dtype in COLUMNS_DTYPES.items()
+    })
+
+    return joblib.hash((file_hash.hexdigest(), config))
+
+
+def _write_columnar_cache(df: DataFrame, preprocessor: TabularPreprocessor, entry_directory: str):
+    """
+    Grava cada coluna em um arquivo .npy, o índice em index.npy, os nomes em um metadata.json e o preprocessor com
+    joblib. Os arquivos são gravados em um diretório temporário que é renomeado no final, dessa forma nenhum processo lê
+    um cache incompleto.
+    """
+    cache_directory = os.path.dirname(entry_directory)
+    os.makedirs(cache_directory, exist_ok=True)
+    temp_directory = tempfile.mkdtemp(dir=cache_directory, prefix='.tmp_')
+
+    try:
+        for position, column in enumerate(df.columns):
+            np.save(os.path.join(temp_directory, f'{position}.npy'), df[column].to_numpy())
+
+        np.save(os.path.join(temp_directory, 'index.npy'), df.index.to_numpy())
+        joblib.dump(preprocessor, os.path.join(temp_directory, 'preprocessor.joblib'))
+
+        with open(os.path.join(temp_directory, 'metadata.json'), 'w') as file:
+            json.dump({'columns': df.columns.tolist()}, file)
+
+        os.rename(temp_directory, entry_directory)
+    except OSError:
+        shutil.rmtree(temp_directory, ignore_errors=True)
+
+        if not os.path.exists(entry_directory):
+            raise
+
+
+def _read_columnar_cache(entry_directory: str) -> tuple[DataFrame, TabularPreprocessor]:
+    with open(os.path.join(entry_directory, 'metadata.json'), 'r') as file:
+        columns = json.load(file)['columns']
+
+    data = {
+        column: np.load(os.path.join(entry_directory, f'{position}.npy'), mmap_mode='r')
+        for position, column in enumerate(columns)
+    }
+    index = np.load(os.path.join(entry_directory, 'index.npy'))
+    preprocessor = joblib.load(os.path.join(entry_directory, 'preprocessor.joblib'))
+
+    return pd.DataFrame(data, index=index, copy=False), preprocessor
+
+
+def _remove_stale_caches(cache_directory: str, prefix: str, current_directory: str):
+    for name in os.listdir(cache_directory):
+        path = os.path.join(cache_directory, name)
+
+        if name.startswith(prefix) and path != current_directory:
+            shutil.rmtree(path, ignore_errors=True)
+
+
+def _read_passengers_csv(path: str, columns: list[str], chunk_size: int) -> DataFrame:
+    """
+    Lê o CSV em blocos, apenas com as colunas utilizadas e com tipos compactos (categorias, int8 e float32). Os
+    registros sem idade são removidos em cada bloco, dessa forma o arquivo inteiro nunca fica em memória com todas as
+    colunas e tipos object.
+
+    :param path: Caminho do CSV.
+
+    :param columns: Nomes, em português, de todas as colunas do CSV na ordem em que aparecem.
+
+    :param chunk_size: Quantidade de linhas lidas por vez.
+    """
+    reader = _iter_passengers_file(path, columns, DROPPED_COLUMNS, chunk_size)
+
+    return pd.concat([chunk.dropna(subset=['idade']) for chunk in reader])
+
+
+def _iter_passengers_file(path: str,
+                          columns: list[str],
+                          dropped_columns: list[str],
+                          chunk_size: int) -> Iterator[DataFrame]:
+    """
+    Percorre o arquivo em blocos, apenas com as colunas utilizadas e com tipos compactos. Arquivos com a extensão
+    .parquet são lidos com o pyarrow, os demais como CSV.
 
+    :param path: Caminho do arquivo.
 
-def get_train_data() -> DataFrame:
-    df = pd.read_csv(r'C:\Users\nikol\git\IA\TitanicClassifier\data\train.csv')
+    :param columns: Nomes, em português, de todas as colunas do arquivo na ordem em que aparecem.
 
-    df.columns = ['id_passageiro', 'sobreviveu', 'classe_social', 'nome', 'sexo', 'idade', 'qtd_irmaos_conjuges',
-                  'qtd_pais_filhos', 'ticket', 'valor_ticket', 'cabine', 'porta_embarque']
+    :param dropped_columns: Colunas que não devem ser retornadas.
 
-    df.drop(columns=['id_passageiro', 'nome', 'ticket', 'valor_ticket', 'cabine'], inplace=True, axis=1)
-    df.dropna(subset=['idade'], inplace=True)
+    :param chunk_size: Quantidade de linhas lidas por vez.
+    """
+    used_columns = [column for column in columns if column not in dropped_columns]
+    dtypes = {column: COLUMNS_DTYPES[column] for column in used_columns if column in COLUMNS_DTYPES}
 
-    return df
+    if os.path.splitext(path)[1].lower() != '.parquet':
+        yield from pd.read_csv(path,
+                               header=0,
+                               names=columns,
+                               usecols=used_columns,
+                               dtype=dtypes,
+                               chunksize=chunk_size)
+        return
 
-def get_test_data() -> DataFrame:
-    df = pd.read_csv(r'C:\Users\nikol\git\IA\TitanicClassifier\data\test.csv')
+    try:
+        import pyarrow.parquet as pq
+    except ImportError as error:
+        raise ImportError('A leitura de arquivos Parquet depende do pyarrow, instale-o com pip install pyarrow.') \
+            from error
 
-    df.columns = ['id_passageiro', 'classe_social', 'nome', 'sexo', 'idade', 'qtd_irmaos_conjuges',
-                  'qtd_pais_filhos', 'ticket', 'valor_ticket', 'cabine', 'porta_embarque']
+    parquet_file = pq.ParquetFile(path)
+    used_positions = [columns.index(column) for column in used_columns]
+    used_names = [parquet_file.schema_arrow.names[position] for position in used_positions]
+    start = 0
 
-    df.drop(columns=['id_passageiro', 'nome', 'ticket', 'valor_ticket', 'cabine'], inplace=True, axis=1)
-    df.dropna(subset=['idade'], inplace=True)
+    for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=used_names):
+        chunk = batch.to_pandas()
+        chunk.columns = used_columns
+        chunk.index = pd.RangeIndex(start, start + len(chunk))
+        start += len(chunk)
 
-    return df
\ No newline at end of file
+        yield chunk.astype(dtypes)
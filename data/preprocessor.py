@@ -0,0 +1,122 @@
+import copy
+
+import numpy as np
+import pandas as pd
+from pandas import CategoricalDtype, DataFrame
+from sklearn.base import BaseEstimator, TransformerMixin
+from sklearn.compose import ColumnTransformer
+from sklearn.impute import SimpleImputer
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.utils.validation import check_is_fitted
+
+
+class TabularPreprocessor(TransformerMixin, BaseEstimator):
+    """
+    Tratamento dos dados tabulares que substitui o get_dummies. Depois de treinado, ele transforma qualquer lote de
+    dados nas mesmas colunas, na mesma ordem, sem que seja necessário alinhar as colunas a cada chamada.
+
+    As colunas categóricas são codificadas com OneHotEncoder, categorias que não existiam no treino geram apenas zeros.
+    As colunas numéricas têm os valores nulos preenchidos com a mediana do treino. As colunas geradas utilizam os mesmos
+    nomes do get_dummies, por exemplo, sexo_female.
+
+    O preprocessor é salvo no histórico junto com o modelo, já restrito às features selecionadas, dessa forma os dados
+    brutos podem ser transformados e enviados diretamente para o predict.
+    """
+
+    def __init__(self,
+                 categorical_columns: list[str] = None,
+                 sparse: bool = False,
+                 dtype=np.float32,
+                 output_features: list[str] = None):
+        """
+        :param categorical_columns: Colunas que devem ser codificadas. Se não for definido serão utilizadas as colunas
+        do tipo object e category. As categorias de colunas do tipo category são fixas, as demais são obtidas no fit.
+
+        :param sparse: Flag que indica se o DataFrame retornado deve ser esparso, útil quando existirem muitas
+        categorias.
+
+        :param dtype: Tipo dos valores retornados.
+
+        :param output_features: Colunas retornadas pelo transform, na ordem desejada. Se não for definido serão
+        retornadas todas.
+        """
+        self.categorical_columns = categorical_columns
+        self.sparse = sparse
+        self.dtype = dtype
+        self.output_features = output_features
+
+    def fit(self, X: DataFrame, y=None):
+        if self.categorical_columns is None:
+            categorical_columns = X.select_dtypes(include=['object', 'category']).columns.tolist()
+        else:
+            categorical_columns = list(self.categorical_columns)
+
+        numeric_columns = [column for column in X.columns if column not in categorical_columns]
+        categories = [
+            list(X[column].dtype.categories) if isinstance(X[column].dtype, CategoricalDtype) else
+            sorted(X[column].dropna().unique().tolist())
+            for column in categorical_columns
+        ]
+
+        self.column_transformer_ = ColumnTransformer(
+            transformers=[
+                ('numeric', SimpleImputer(strategy='median'), numeric_columns),
+                ('categorical', OneHotEncoder(categories=categories,
+                                              handle_unknown='ignore',
+                                              sparse_output=self.sparse,
+                                              dtype=self.dtype), categorical_columns)
+            ],
+            sparse_threshold=1.0 if self.sparse else 0.0,
+            verbose_feature_names_out=False
+        )
+        self.column_transformer_.fit(X)
+
+        self.feature_names_in_ = self.column_transformer_.feature_names_in_
+        self.all_features_ = self.column_transformer_.get_feature_names_out().tolist()
+        self._set_output_positions()
+
+        return self
+
+    def transform(self, X: DataFrame) -> DataFrame:
+        check_is_fitted(self, 'column_transformer_')
+
+        values = self.column_transformer_.transform(X)[:, self.output_positions_]
+        columns = self.get_feature_names_out().tolist()
+
+        if self.sparse:
+            return pd.DataFrame.sparse.from_spmatrix(values.astype(self.dtype), index=X.index, columns=columns)
+
+        return pd.DataFrame(np.asarray(values, dtype=self.dtype), index=X.index, columns=columns)
+
+    def get_feature_names_out(self, input_features=None) -> np.ndarray:
+        check_is_fitted(self, 'column_transformer_')
+
+        return np.asarray(self.all_features_, dtype=object)[self.output_positions_]
+
+    def with_output_features(self, features: list[str]):
+        """
+        Retorna uma cópia do preprocessor já treinado que retorna apenas as features informadas, na ordem informada.
+        Utilizado para salvar o preprocessor com as features selecionadas pelo pipeline.
+
+        :param features: Colunas que devem ser retornadas pelo transform.
+        """
+        check_is_fitted(self, 'column_transformer_')
+
+        preprocessor = copy.copy(self)
+        preprocessor.output_features = list(features)
+        preprocessor._set_output_positions()
+
+        return preprocessor
+
+    def _set_output_positions(self):
+        if self.output_features is None:
+            self.output_positions_ = np.arange(len(self.all_features_))
+            return
+
+        positions = {feature: position for position, feature in enumerate(self.all_features_)}
+        missing = [feature for feature in self.output_features if feature not in positions]
+
+        if missing:
+            raise ValueError(f'As features {missing} não são geradas pelo preprocessor.')
+
+        self.output_positions_ = np.array([positions[feature] for feature in self.output_features], dtype=int)
@@ -0,0 +1,368 @@
+import numbers
+import time
+import warnings
+
+import numpy as np
+from scipy.stats import norm, rv_discrete
+from sklearn.exceptions import ConvergenceWarning
+from sklearn.gaussian_process import GaussianProcessRegressor
+from sklearn.gaussian_process.kernels import ConstantKernel, Matern, WhiteKernel
+from sklearn.model_selection import ParameterSampler
+from sklearn.model_selection._search import BaseSearchCV
+from sklearn.utils import check_random_state
+
+from hiper_params_search.params_searcher import HipperParamsSearcher
+from manager.history_manager import HistoryManager
+
+
+class BayesianSearchCV(BaseSearchCV):
+    """
+    Busca de parâmetros baseada em modelo. Um GaussianProcessRegressor é utilizado como modelo substituto (surrogate)
+    dos scores obtidos na validação cruzada e os próximos candidatos são escolhidos pela melhoria esperada (expected
+    improvement), em lotes que são avaliados em paralelo.
+
+    Os candidatos definidos em warm_start_params são avaliados antes de todos os outros, dessa forma os melhores
+    resultados de execuções anteriores já formam a base do modelo substituto.
+    """
+
+    def __init__(self,
+                 estimator,
+                 param_distributions: dict,
+                 *,
+                 n_iter: int = 50,
+                 batch_size: int = 8,
+                 n_initial_points: int = 10,
+                 n_pool_candidates: int = 1000,
+                 xi: float = 0.01,
+                 warm_start_params: list[dict] = None,
+                 random_state=None,
+                 scoring=None,
+                 n_jobs=None,
+                 refit=True,
+                 cv=None,
+                 verbose=0,
+                 pre_dispatch='2*n_jobs',
+                 error_score=np.nan,
+                 return_train_score=False):
+        """
+        :param estimator: Instância do estimador que deseja procurar os parâmetros.
+
+        :param param_distributions: Dicionário com os parâmetros e valores que deseja testar, no mesmo formato aceito
+        pelo RandomizedSearchCV.
+
+        :param n_iter: Quantidade total de candidatos avaliados, incluindo os candidatos do warm start.
+
+        :param batch_size: Quantidade de candidatos avaliados em paralelo a cada rodada.
+
+        :param n_initial_points: Quantidade de candidatos, aleatórios ou do warm start, avaliados antes de utilizar o
+        modelo substituto.
+
+        :param n_pool_candidates: Quantidade de candidatos aleatórios sorteados a cada rodada para que a melhoria
+        esperada seja calculada.
+
+        :param xi: Margem utilizada no cálculo da melhoria esperada, valores maiores favorecem a exploração.
+
+        :param warm_start_params: Lista de parâmetros que devem ser avaliados antes dos demais.
+
+        :param random_state: Seed utilizada nos sorteios dos candidatos.
+        """
+        super().__init__(estimator=estimator,
+                         scoring=scoring,
+                         n_jobs=n_jobs,
+                         refit=refit,
+                         cv=cv,
+                         verbose=verbose,
+                         pre_dispatch=pre_dispatch,
+                         error_score=error_score,
+                         return_train_score=return_train_score)
+
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.batch_size = batch_size
+        self.n_initial_points = n_initial_points
+        self.n_pool_candidates = n_pool_candidates
+        self.xi = xi
+        self.warm_start_params = warm_start_params
+        self.random_state = random_state
+
+    def _run_search(self, evaluate_candidates):
+        random_state = check_random_state(self.random_state)
+        encoder = _ParamsEncoder(self.param_distributions, random_state)
+
+        initial_params = list(self.warm_start_params or [])[:self.n_iter]
+        initial_size = min(self.n_iter, max(self.n_initial_points, len(initial_params)))
+        initial_params += self._sample(initial_size - len(initial_params), random_state)
+
+        results = evaluate_candidates(initial_params)
+
+        while len(results['params']) < self.n_iter:
+            batch_size = min(self.batch_size, self.n_iter - len(results['params']))
+            batch = self._propose_batch(encoder, results, batch_size, random_state)
+
+            if len(batch) == 0:
+                break
+
+            results = evaluate_candidates(batch)
+
+    def _propose_batch(self, encoder, results, batch_size: int, random_state) -> list[dict]:
+        """
+        Função que escolhe o próximo lote de candidatos. Após escolher um candidato, ele é adicionado ao modelo
+        substituto com o pior score observado (constant liar), evitando que o lote inteiro fique concentrado na mesma
+        região do espaço de parâmetros.
+        """
+        scores = np.asarray(results['mean_test_score'], dtype=float)
+        observed_x = encoder.transform(results['params'])[np.isfinite(scores)]
+        observed_y = scores[np.isfinite(scores)]
+
+        pool = self._sample(self.n_pool_candidates, random_state)
+        pool_x = encoder.transform(pool)
+
+        observed_keys = {row.tobytes() for row in observed_x}
+        available = [i for i, row in enumerate(pool_x) if row.tobytes() not in observed_keys]
+
+        if len(observed_y) < 2:
+            return [pool[i] for i in available[:batch_size]]
+
+        lie = observed_y.min()
+        batch = []
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', ConvergenceWarning)
+
+            surrogate = self._fit_surrogate(observed_x, observed_y, random_state)
+
+            for _ in range(batch_size):
+                if len(available) == 0:
+                    break
+
+                improvement = self._expected_improvement(surrogate, pool_x[available], observed_y.max())
+                chosen = available.pop(int(np.argmax(improvement)))
+                batch.append(pool[chosen])
+
+                observed_x = np.vstack([observed_x, pool_x[chosen]])
+                observed_y = np.append(observed_y, lie)
+                surrogate = GaussianProcessRegressor(kernel=surrogate.kernel_, optimizer=None, normalize_y=True)
+                surrogate.fit(observed_x, observed_y)
+
+        return batch
+
+    def _fit_surrogate(self, observed_x, observed_y, random_state) -> GaussianProcessRegressor:
+        kernel = (ConstantKernel(1.0) * Matern(length_scale=np.ones(observed_x.shape[1]), nu=2.5)
+                  + WhiteKernel(noise_level=1e-3))
+
+        surrogate = GaussianProcessRegressor(kernel=kernel,
+                                             normalize_y=True,
+                                             n_restarts_optimizer=2,
+                                             random_state=random_state)
+
+        return surrogate.fit(observed_x, observed_y)
+
+    def _expected_improvement(self, surrogate, candidates_x, best_score: float) -> np.ndarray:
+        mean, std = surrogate.predict(candidates_x, return_std=True)
+
+        improvement = mean - best_score - self.xi
+        z = np.divide(improvement, std, out=np.zeros_like(improvement), where=std > 0)
+
+        expected_improvement = improvement * norm.cdf(z) + std * norm.pdf(z)
+        expected_improvement[std <= 0] = 0.0
+
+        return expected_improvement
+
+    def _sample(self, size: int, random_state) -> list[dict]:
+        if size <= 0:
+            return []
+
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', UserWarning)
+            return list(ParameterSampler(self.param_distributions, n_iter=size, random_state=random_state))
+
+
+class _ParamsEncoder:
+    """
+    Converte dicionários de parâmetros em vetores numéricos para o modelo substituto. Valores de listas são codificados
+    com one-hot e valores de distribuições são normalizados entre 0 e 1 a partir de uma amostra da distribuição.
+    """
+
+    def __init__(self, param_distributions: dict, random_state, sample_size: int = 1000):
+        self.names = sorted(param_distributions.keys())
+        self.choices = {}
+        self.bounds = {}
+
+        for name in self.names:
+            distribution = param_distributions[name]
+
+            if hasattr(distribution, 'rvs'):
+                sample = np.asarray(distribution.rvs(size=sample_size, random_state=random_state), dtype=float)
+                self.bounds[name] = (sample.min(), max(sample.max() - sample.min(), 1e-12))
+            else:
+                self.choices[name] = list(distribution)
+
+    def transform(self, params_list: list[dict]) -> np.ndarray:
+        return np.array([self._encode(params) for params in params_list], dtype=float)
+
+    def _encode(self, params: dict) -> list[float]:
+        row = []
+
+        for name in self.names:
+            value = params.get(name)
+
+            if name in self.choices:
+                row.extend(float(_same_value(value, choice)) for choice in self.choices[name])
+            else:
+                minimum, scale = self.bounds[name]
+                row.append((float(value) - minimum) / scale)
+
+        return row
+
+
+def _same_value(value, choice) -> bool:
+    try:
+        return bool(value == choice) and type(value) is type(choice)
+    except (TypeError, ValueError):
+        return False
+
+
+class BayesianHipperParamsSearcher(HipperParamsSearcher):
+    """
+    Implementação para busca de parâmetros utilizando BayesianSearchCV.
+
+    Quando um HistoryManager é definido, os parâmetros dos melhores resultados já salvos para o mesmo estimador são
+    avaliados primeiro (warm start), evitando recomeçar a busca do zero a cada execução.
+    """
+
+    def __init__(self,
+                 number_iterations: int,
+                 batch_size: int = 8,
+                 number_initial_points: int = 10,
+                 history_manager: HistoryManager = None,
+                 n_jobs: int = -1,
+                 log_level: int = 0):
+        """
+        :param number_iterations: Número total de candidatos avaliados, isso impacta no número de fits realizados.
+
+        :param batch_size: Quantidade de candidatos avaliados em paralelo a cada rodada da busca.
+
+        :param number_initial_points: Quantidade de candidatos avaliados antes de utilizar o modelo substituto.
+
+        :param history_manager: Implementação de HistoryManager utilizada para recuperar os resultados anteriores do
+        mesmo estimador.
+
+        :param n_jobs: Número de threads usadas no processamento.
+
+        :param log_level: Nível de log do processo de busca, isso impacta em quanta informação você verá no console.
+        """
+        super().__init__(n_jobs, log_level)
+
+        self.number_iterations = number_iterations
+        self.batch_size = batch_size
+        self.number_initial_points = number_initial_points
+        self.history_manager = history_manager
+
+    def search_hipper_parameters(self,
+                                 estimator,
+                                 params,
+                                 data_x,
+                                 data_y,
+                                 cv,
+                                 scoring: str) -> BayesianSearchCV:
+        self.start_search_parameter_time = time.time()
+
+        search = BayesianSearchCV(estimator=estimator,
+                                  param_distributions=params,
+                                  n_iter=self.number_iterations,
+                                  batch_size=self.batch_size,
+                                  n_initial_points=self.number_initial_points,
+                                  warm_start_params=self._get_warm_start_params(estimator, params, scoring),
+                                  random_state=np.random.randint(np.iinfo(np.int32).max),
+                                  cv=cv,
+                                  n_jobs=self.n_jobs,
+                                  verbose=self.log_level,
+                                  scoring=scoring)
+
+        search.fit(X=data_x, y=data_y)
+
+        self.end_search_parameter_time = time.time()
+
+        return search
+
+    def get_config(self) -> dict:
+        """
+        O HistoryManager do warm start é identificado pelo caminho do histórico, o estado dele não faz parte da
+        configuração.
+        """
+        config = super().get_config()
+
+        if self.history_manager is not None:
+            config['history_manager'] = self.history_manager.store.path
+
+        return config
+
+    def _get_warm_start_params(self, estimator, params, scoring: str) -> list[dict]:
+        """
+        Função que recupera do histórico os parâmetros já avaliados para o estimador, ordenados do melhor para o pior
+        score e sem repetições. Apenas os parâmetros presentes na busca atual são considerados e os candidatos com
+        algum valor fora do espaço atual (fora dos limites da distribuição ou das opções da lista) são descartados.
+
+        :param estimator: Instância do estimador que deseja procurar os parâmetros.
+
+        :param params: Dicionário com os parâmetros e valores que deseja testar.
+
+        :param scoring: Métrica avaliada para definição do melhor estimador.
+        """
+        if self.history_manager is None or not self.history_manager.has_history():
+            return []
+
+        records = [
+            record for record in self.history_manager.get_dictionaries_from_json(type(estimator).__name__)
+            if record['scoring'] == scoring
+        ]
+        records.sort(key=lambda record: record['mean'], reverse=True)
+
+        warm_start_params = []
+
+        for record in records:
+            candidate = {
+                name: _restore_history_value(record['estimator_params'][name], params[name])
+                for name in params if name in record['estimator_params']
+            }
+
+            if len(candidate) != len(params) or candidate in warm_start_params:
+                continue
+
+            if all(_is_in_space(value, params[name]) for name, value in candidate.items()):
+                warm_start_params.append(candidate)
+
+        return warm_start_params
+
+
+def _restore_history_value(value, distribution):
+    """
+    O JSON do histórico converte tuplas em listas, quando o valor original existir como tupla nas opções da busca ele é
+    convertido novamente.
+    """
+    if isinstance(value, list) and not hasattr(distribution, 'rvs') and tuple(value) in list(distribution):
+        return tuple(value)
+
+    return value
+
+
+def _is_in_space(value, distribution) -> bool:
+    """
+    Verifica se o valor pertence ao espaço do parâmetro: para listas o valor deve ser uma das opções e para
+    distribuições deve ser numérico, finito e estar dentro do suporte, sendo inteiro nas distribuições discretas.
+    """
+    if not hasattr(distribution, 'rvs'):
+        return any(_same_value(value, choice) for choice in distribution)
+
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    if not isinstance(value, numbers.Real) or isinstance(value, bool) or not np.isfinite(value):
+        return False
+
+    if isinstance(getattr(distribution, 'dist', None), rv_discrete) and value != int(value):
+        return False
+
+    low, high = distribution.support()
+
+    return low <= value <= high
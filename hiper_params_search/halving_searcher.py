@@ -0,0 +1,135 @@
+import numbers
+import time
+
+import numpy as np
+from sklearn.ensemble import HistGradientBoostingClassifier, HistGradientBoostingRegressor
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.linear_model import SGDClassifier, SGDRegressor, Perceptron, PassiveAggressiveClassifier, \
+    PassiveAggressiveRegressor
+from sklearn.model_selection import HalvingRandomSearchCV
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+
+from hiper_params_search.params_searcher import HipperParamsSearcher
+
+_MAX_ITER_BUDGET_ESTIMATORS = (MLPClassifier, MLPRegressor, SGDClassifier, SGDRegressor, Perceptron,
+                               PassiveAggressiveClassifier, PassiveAggressiveRegressor, HistGradientBoostingClassifier,
+                               HistGradientBoostingRegressor)
+"""
+Estimadores em que o max_iter é a quantidade de épocas ou iterações de treino, e não apenas um limite para a
+convergência, como no SVC ou no LogisticRegression.
+"""
+
+
+class HalvingHipperParamsSearcher(HipperParamsSearcher):
+    """
+    Implementação para busca de parâmetros utilizando HalvingRandomSearchCV (successive halving).
+
+    Diferente da busca aleatória, todos os candidatos começam com poucos recursos (amostras, quantidade de árvores ou
+    iterações) e apenas os melhores de cada rodada avançam para a próxima, recebendo mais recursos. Dessa forma os
+    candidatos ruins são descartados cedo e não consomem o mesmo tempo de fit dos melhores.
+    """
+
+    def __init__(self,
+                 number_candidates: int | str = 'exhaust',
+                 resource: str = 'auto',
+                 factor: int = 3,
+                 min_resources: int | str = 'smallest',
+                 max_resources: int | str = 'auto',
+                 aggressive_elimination: bool = False,
+                 n_jobs: int = -1,
+                 log_level: int = 0):
+        """
+        :param number_candidates: Número de candidatos avaliados na primeira rodada. Se for 'exhaust' a quantidade é
+        definida para que a última rodada utilize o máximo de recursos.
+
+        :param resource: Recurso que é incrementado a cada rodada. Se for 'auto' será utilizado n_estimators para os
+        estimadores que possuem esse parâmetro (florestas, boosting), max_iter para os estimadores em que ele é a
+        quantidade de iterações de treino (MLP, SGD, HistGradientBoosting) e n_samples para os demais. O recurso não
+        pode estar presente nos parâmetros buscados e deve ser um inteiro positivo, caso contrário é utilizado
+        n_samples.
+
+        :param factor: Proporção de candidatos que são mantidos a cada rodada, com 3 apenas 1/3 dos candidatos avança.
+
+        :param min_resources: Quantidade de recursos utilizada na primeira rodada.
+
+        :param max_resources: Quantidade máxima de recursos de um candidato. Se for 'auto' e o recurso for um parâmetro
+        do estimador, será utilizado o valor definido na instância do estimador.
+
+        :param aggressive_elimination: Flag que indica se devem ser feitas rodadas extras com o mínimo de recursos
+        quando a quantidade de candidatos for grande demais para a quantidade de recursos.
+
+        :param n_jobs: Número de threads usadas no processamento.
+
+        :param log_level: Nível de log do processo de busca, isso impacta em quanta informação você verá no console.
+        """
+        super().__init__(n_jobs, log_level)
+
+        self.number_candidates = number_candidates
+        self.resource = resource
+        self.factor = factor
+        self.min_resources = min_resources
+        self.max_resources = max_resources
+        self.aggressive_elimination = aggressive_elimination
+
+    def search_hipper_parameters(self,
+                                 estimator,
+                                 params,
+                                 data_x,
+                                 data_y,
+                                 cv,
+                                 scoring: str) -> HalvingRandomSearchCV:
+        self.start_search_parameter_time = time.time()
+
+        resource = self._get_resource(estimator, params)
+        max_resources = self.max_resources
+
+        if resource != 'n_samples' and max_resources == 'auto':
+            max_resources = estimator.get_params()[resource]
+
+        search = HalvingRandomSearchCV(estimator=estimator,
+                                       param_distributions=params,
+                                       n_candidates=self.number_candidates,
+                                       resource=resource,
+                                       factor=self.factor,
+                                       min_resources=self.min_resources,
+                                       max_resources=max_resources,
+                                       aggressive_elimination=self.aggressive_elimination,
+                                       cv=cv,
+                                       n_jobs=self.n_jobs,
+                                       verbose=self.log_level,
+                                       random_state=np.random.randint(np.iinfo(np.int32).max),
+                                       scoring=scoring)
+
+        search.fit(X=data_x, y=data_y)
+
+        self.end_search_parameter_time = time.time()
+
+        return search
+
+    def _get_resource(self, estimator, params) -> str:
+        """
+        Função que define qual o recurso que será incrementado a cada rodada.
+
+        :param estimator: Instância do estimador que deseja procurar os parâmetros.
+
+        :param params: Dicionário com os parâmetros e valores que deseja testar.
+        """
+        if self.resource != 'auto':
+            return self.resource
+
+        estimator_params = estimator.get_params()
+        resources = ['n_estimators']
+
+        if isinstance(estimator, _MAX_ITER_BUDGET_ESTIMATORS):
+            resources.append('max_iter')
+
+        for resource in resources:
+            if resource in params:
+                continue
+
+            value = estimator_params.get(resource)
+
+            if isinstance(value, numbers.Integral) and not isinstance(value, bool) and value > 0:
+                return resource
+
+        return 'n_samples'
@@ -0,0 +1,237 @@
+import numpy as np
+from sklearn.ensemble import ExtraTreesClassifier, ExtraTreesRegressor, RandomForestClassifier, RandomForestRegressor
+from sklearn.linear_model import LogisticRegression
+from sklearn.model_selection import ParameterGrid
+from sklearn.neighbors import KNeighborsClassifier, KNeighborsRegressor, RadiusNeighborsClassifier, \
+    RadiusNeighborsRegressor
+from sklearn.neural_network import MLPClassifier, MLPRegressor
+from sklearn.svm import SVC, SVR, NuSVC, NuSVR
+from sklearn.utils import check_random_state
+from sklearn.utils.random import sample_without_replacement
+
+_NEIGHBORS = (KNeighborsClassifier, KNeighborsRegressor, RadiusNeighborsClassifier, RadiusNeighborsRegressor)
+_SVM = (SVC, SVR, NuSVC, NuSVR)
+_MLP = (MLPClassifier, MLPRegressor)
+_FORESTS = (RandomForestClassifier, RandomForestRegressor, ExtraTreesClassifier, ExtraTreesRegressor)
+
+_CONDITIONAL_PARAMS = [
+    (_NEIGHBORS, 'p', 'metric', ('minkowski',)),
+    (_SVM, 'degree', 'kernel', ('poly',)),
+    (_SVM, 'coef0', 'kernel', ('poly', 'sigmoid')),
+    (_SVM, 'gamma', 'kernel', ('rbf', 'poly', 'sigmoid')),
+    (_MLP, 'learning_rate', 'solver', ('sgd',)),
+    (_MLP, 'momentum', 'solver', ('sgd',)),
+    (_MLP, 'nesterovs_momentum', 'solver', ('sgd',)),
+    (_MLP, 'power_t', 'solver', ('sgd',)),
+    (_MLP, 'beta_1', 'solver', ('adam',)),
+    (_MLP, 'beta_2', 'solver', ('adam',)),
+    (_MLP, 'epsilon', 'solver', ('adam',)),
+    (_MLP, 'batch_size', 'solver', ('sgd', 'adam')),
+    (_MLP, 'learning_rate_init', 'solver', ('sgd', 'adam')),
+    (_MLP, 'shuffle', 'solver', ('sgd', 'adam')),
+    (_MLP, 'early_stopping', 'solver', ('sgd', 'adam')),
+    (_MLP, 'n_iter_no_change', 'solver', ('sgd', 'adam')),
+    (_FORESTS, 'max_samples', 'bootstrap', (True,)),
+    ((LogisticRegression,), 'l1_ratio', 'penalty', ('elasticnet',)),
+]
+"""
+Parâmetros que só são utilizados pelo estimador quando outro parâmetro possui determinados valores, no formato
+(estimadores, parâmetro, parâmetro que o controla, valores em que ele é utilizado). Nos demais casos o valor do
+parâmetro não altera o resultado e os candidatos que só diferem nele são equivalentes.
+"""
+
+_METRIC_ALIASES = {'l1': 'manhattan', 'cityblock': 'manhattan', 'l2': 'euclidean'}
+_MINKOWSKI_METRICS = {1: 'manhattan', 2: 'euclidean'}
+
+_MAX_ENUMERATED_VALUES = 10_000
+_MAX_GRID_SIZE = 100_000
+_MAX_DRAWS_PER_CANDIDATE = 100
+
+
+class ParamSpace:
+    """
+    Espaço de parâmetros de um estimador, compilado a partir do mesmo dicionário, ou lista de dicionários, aceito pelo
+    RandomizedSearchCV, que gera candidatos sem repetições. Cada dicionário da lista é um subespaço e os candidatos
+    repetidos entre subespaços diferentes também são removidos.
+
+    Na normalização, as distribuições randint são convertidas em listas com todos os valores do intervalo e os valores
+    repetidos das listas são removidos. Quando todos os parâmetros são finitos, o grid inteiro é montado e os candidatos
+    são sorteados dele sem reposição, ou o grid inteiro é utilizado quando possui até n_iter combinações. Com
+    distribuições contínuas os candidatos são sorteados e os repetidos são descartados.
+
+    Cada candidato é convertido para uma forma canônica antes da comparação: os parâmetros que o estimador ignora para
+    aquela combinação, como o p do KNeighborsClassifier com metric diferente de minkowski, recebem o valor definido no
+    próprio estimador, e nos estimadores de vizinhos a metric minkowski com p igual a 1 ou 2 é substituída por
+    manhattan ou euclidean, assim como os apelidos das métricas. Dessa forma combinações equivalentes são avaliadas uma
+    única vez.
+    """
+
+    def __init__(self, estimator, param_distributions: dict | list[dict]):
+        """
+        :param estimator: Instância do estimador, utilizada para identificar as combinações equivalentes e os valores
+        dos parâmetros ignorados.
+
+        :param param_distributions: Dicionário com os parâmetros e valores que deseja testar, ou lista de dicionários.
+        """
+        if isinstance(param_distributions, dict):
+            param_distributions = [param_distributions]
+
+        self.estimator = estimator
+        self.params = [{name: _normalize_values(values) for name, values in subspace.items()}
+                       for subspace in param_distributions]
+
+        self._estimator_params = estimator.get_params()
+
+    @property
+    def is_finite(self) -> bool:
+        return all(isinstance(values, list) for subspace in self.params for values in subspace.values())
+
+    @property
+    def size(self) -> float:
+        """
+        Quantidade de combinações do grid, antes da remoção das equivalentes, ou infinito se houver distribuições
+        contínuas.
+        """
+        if not self.is_finite:
+            return np.inf
+
+        return float(sum(np.prod([len(values) for values in subspace.values()]) for subspace in self.params))
+
+    def get_grid(self) -> list[dict]:
+        """
+        Retorna todas as combinações do espaço, na forma canônica e sem repetições.
+        """
+        if not self.is_finite:
+            raise ValueError('O espaço de parâmetros possui distribuições contínuas e não pode ser enumerado.')
+
+        grid = {}
+
+        for params in ParameterGrid(self.params):
+            params = self.canonicalize(params)
+            grid.setdefault(_get_key(params), params)
+
+        return list(grid.values())
+
+    def sample(self, n_iter: int, random_state=None) -> list[dict]:
+        """
+        Retorna até n_iter candidatos distintos. A quantidade só é menor que n_iter quando o espaço não possui
+        combinações distintas suficientes.
+
+        :param n_iter: Quantidade de candidatos.
+
+        :param random_state: Seed utilizada nos sorteios.
+        """
+        random_state = check_random_state(random_state)
+
+        if self.size <= _MAX_GRID_SIZE:
+            grid = self.get_grid()
+
+            if len(grid) <= n_iter:
+                return grid
+
+            return [grid[index] for index in sample_without_replacement(len(grid), n_iter, random_state=random_state)]
+
+        candidates = {}
+
+        for _ in range(n_iter * _MAX_DRAWS_PER_CANDIDATE):
+            if len(candidates) == n_iter:
+                break
+
+            params = self.canonicalize(self._draw(random_state))
+            candidates.setdefault(_get_key(params), params)
+
+        return list(candidates.values())
+
+    def canonicalize(self, params: dict) -> dict:
+        """
+        Retorna a forma canônica do candidato, descrita na classe.
+        """
+        params = dict(params)
+
+        if isinstance(self.estimator, _NEIGHBORS) and 'metric' in params:
+            metric = _METRIC_ALIASES.get(params['metric'], params['metric'])
+            p = self._get_value(params, 'p')
+
+            if _same_value(metric, 'minkowski') and any(_same_value(p, value) for value in _MINKOWSKI_METRICS):
+                metric = _MINKOWSKI_METRICS[int(p)]
+
+            params['metric'] = metric
+
+        for estimator_types, name, condition, values in _CONDITIONAL_PARAMS:
+            if name not in params or not isinstance(self.estimator, estimator_types):
+                continue
+
+            if not any(_same_value(self._get_value(params, condition), value) for value in values):
+                params[name] = self._estimator_params[name]
+
+        return params
+
+    def _get_value(self, params: dict, name: str):
+        return params[name] if name in params else self._estimator_params.get(name)
+
+    def _draw(self, random_state) -> dict:
+        """
+        Sorteia um candidato da mesma forma que o ParameterSampler: o subespaço e os valores das listas com a mesma
+        probabilidade e os valores das distribuições pelo rvs. Como o rvs do randint faz o mesmo sorteio da lista gerada na normalização,
+        enquanto não há repetições os candidatos são os mesmos do RandomizedSearchCV com a mesma seed.
+        """
+        subspace = random_state.choice(self.params)
+        params = {}
+
+        for name in sorted(subspace):
+            values = subspace[name]
+
+            if isinstance(values, list):
+                params[name] = values[random_state.randint(len(values))]
+            else:
+                params[name] = values.rvs(random_state=random_state)
+
+        return params
+
+
+def _normalize_values(values):
+    """
+    Converte as distribuições randint em listas e remove os valores repetidos das listas. As demais distribuições são
+    mantidas.
+    """
+    if hasattr(values, 'rvs'):
+        if getattr(getattr(values, 'dist', None), 'name', None) != 'randint':
+            return values
+
+        low, high = values.support()
+
+        if high - low + 1 > _MAX_ENUMERATED_VALUES:
+            return values
+
+        return list(range(int(low), int(high) + 1))
+
+    unique_values = {}
+
+    for value in values:
+        unique_values.setdefault(_get_value_key(value), value)
+
+    return list(unique_values.values())
+
+
+def _get_key(params: dict) -> tuple:
+    return tuple(sorted((name, _get_value_key(value)) for name, value in params.items()))
+
+
+def _get_value_key(value):
+    """
+    Converte o valor em algo que possa ser comparado e utilizado em um set. Os escalares do numpy são convertidos nos
+    tipos do Python, dessa forma np.int64(3) e 3 são o mesmo valor, mas 1 e True continuam diferentes.
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+
+    try:
+        hash(value)
+    except TypeError:
+        return type(value).__name__, repr(value)
+
+    return type(value).__name__, value
+
+
+def _same_value(value, other) -> bool:
+    return _get_value_key(value) == _get_value_key(other)
@@ -0,0 +1,59 @@
+from abc import ABC, abstractmethod
+
+from sklearn.model_selection._search import BaseSearchCV
+
+
+class HipperParamsSearcher(ABC):
+    """
+    Classe base para implementar as buscas de parâmetros dos estimadores.
+    """
+
+    def __init__(self,
+                 n_jobs: int = -1,
+                 log_level: int = 0):
+        """
+        :param n_jobs: Número de threads usadas no processamento.
+
+        :param log_level: Nível de log do processo de busca, isso impacta em quanta informação você verá no console.
+        """
+        self.n_jobs = n_jobs
+        self.log_level = log_level
+
+        self.start_search_parameter_time = 0
+        self.end_search_parameter_time = 0
+
+    @abstractmethod
+    def search_hipper_parameters(self,
+                                 estimator,
+                                 params,
+                                 data_x,
+                                 data_y,
+                                 cv,
+                                 scoring: str) -> BaseSearchCV:
+        """
+        Função para realizar a busca dos melhores parâmetros do estimador.
+
+        :param estimator: Instância do estimador que deseja procurar os parâmetros.
+
+        :param params: Dicionário com os parâmetros e valores que deseja testar.
+
+        :param data_x: Valores de x (features).
+
+        :param data_y: Valores de y (target).
+
+        :param cv: Definição da validação cruzada dentro do processo de busca. Valores que podem ser usados: KFold ou
+        StratifiedKFold.
+
+        :param scoring: Métrica avaliada para definição do melhor estimador.
+
+        :return: Retorna a instância da busca após os fits, contendo o melhor estimador.
+        """
+
+    def get_config(self) -> dict:
+        """
+        Retorna a configuração que influencia no resultado da busca, ou seja, todos os atributos exceto os de
+        paralelismo, log e tempos de execução.
+        """
+        ignored = {'n_jobs', 'log_level', 'start_search_parameter_time', 'end_search_parameter_time'}
+
+        return {name: value for name, value in vars(self).items() if name not in ignored}
@@ -1,31 +1,345 @@
 import time
+import warnings
 
-from sklearn.model_selection import RandomizedSearchCV
+import numpy as np
+from joblib import effective_n_jobs
+from scipy.stats import t
+from sklearn.base import clone, is_classifier
+from sklearn.metrics import check_scoring
+from sklearn.model_selection import RandomizedSearchCV, ParameterSampler, check_cv
+from sklearn.model_selection._search import BaseSearchCV
+from sklearn.model_selection._validation import _fit_and_score, _warn_or_raise_about_fit_failures
+from sklearn.utils import indexable
+from sklearn.utils.parallel import Parallel, delayed
+from sklearn.utils.validation import _check_method_params
 
-class RandomHipperParamsSearcher:
+from hiper_params_search.param_space import ParamSpace
+from hiper_params_search.params_searcher import HipperParamsSearcher
+
+
+class UniqueRandomSearchCV(RandomizedSearchCV):
+    """
+    RandomizedSearchCV em que os candidatos são gerados pelo ParamSpace: sem candidatos repetidos ou equivalentes e com
+    o grid inteiro avaliado quando ele possui até n_iter combinações.
+    """
+
+    def _run_search(self, evaluate_candidates):
+        evaluate_candidates(ParamSpace(self.estimator, self.param_distributions).sample(self.n_iter, self.random_state))
+
+
+class EarlyStoppingRandomSearchCV(BaseSearchCV):
+    """
+    Busca aleatória, com os mesmos candidatos do RandomizedSearchCV ou do UniqueRandomSearchCV, conforme
+    unique_candidates, em que cada fold de cada candidato é uma tarefa separada. Os resultados são processados conforme
+    são concluídos e, a partir de min_folds folds, cada candidato é comparado com o melhor candidato já avaliado em
+    todos os folds (incumbente). Se o limite superior do intervalo de confiança da diferença entre os scores dos dois,
+    nos mesmos folds, for menor que zero, o candidato não tem chances de ser o melhor e os folds restantes dele não são
+    executados.
+
+    As tarefas são enviadas ao joblib uma a uma, conforme os processos ficam livres, dessa forma a decisão vale
+    inclusive com vários processos, apenas os folds já enviados são finalizados. Como o incumbente depende da ordem em
+    que os folds terminam, com n_jobs maior que 1 os candidatos descartados podem variar entre execuções.
+
+    Os candidatos descartados ficam no cv_results_ com pruned igual a True, a quantidade de folds avaliados em
+    n_evaluated_splits, os scores dos folds não avaliados como NaN e a média dos folds avaliados em
+    partial_mean_test_score. Eles ficam nas últimas posições do ranking. Apenas uma métrica é suportada no scoring.
+    """
+
+    def __init__(self,
+                 estimator,
+                 param_distributions: dict | list[dict],
+                 *,
+                 n_iter: int = 10,
+                 min_folds: int = 3,
+                 confidence: float = 0.95,
+                 unique_candidates: bool = False,
+                 random_state=None,
+                 scoring=None,
+                 n_jobs=None,
+                 refit=True,
+                 cv=None,
+                 verbose=0,
+                 pre_dispatch='2*n_jobs',
+                 error_score=np.nan,
+                 return_train_score=False):
+        """
+        :param estimator: Instância do estimador que deseja procurar os parâmetros.
+
+        :param param_distributions: Dicionário, ou lista de dicionários, com os parâmetros e valores que deseja testar,
+        no mesmo formato aceito pelo RandomizedSearchCV.
+
+        :param n_iter: Quantidade de candidatos sorteados.
+
+        :param min_folds: Quantidade mínima de folds avaliados antes que um candidato possa ser descartado, deve ser
+        pelo menos 2.
+
+        :param confidence: Nível de confiança do limite superior, calculado com a distribuição t. Valores maiores
+        descartam menos candidatos.
+
+        :param unique_candidates: Flag que indica se os candidatos devem ser gerados pelo ParamSpace, sem repetições.
+
+        :param random_state: Seed utilizada no sorteio dos candidatos.
+        """
+        super().__init__(estimator=estimator,
+                         scoring=scoring,
+                         n_jobs=n_jobs,
+                         refit=refit,
+                         cv=cv,
+                         verbose=verbose,
+                         pre_dispatch=pre_dispatch,
+                         error_score=error_score,
+                         return_train_score=return_train_score)
+
+        self.param_distributions = param_distributions
+        self.n_iter = n_iter
+        self.min_folds = min_folds
+        self.confidence = confidence
+        self.unique_candidates = unique_candidates
+        self.random_state = random_state
+
+    def fit(self, X, y=None, **params):
+        if self.min_folds < 2:
+            raise ValueError(f'min_folds deve ser pelo menos 2, recebido {self.min_folds}.')
+
+        if not (self.scoring is None or isinstance(self.scoring, str) or callable(self.scoring)):
+            raise ValueError('EarlyStoppingRandomSearchCV suporta apenas uma métrica no scoring.')
+
+        scorer = check_scoring(self.estimator, self.scoring)
+
+        X, y = indexable(X, y)
+        params = _check_method_params(X, params=params)
+        groups = params.pop('groups', None)
+
+        cv = check_cv(self.cv, y, classifier=is_classifier(self.estimator))
+        splits = list(cv.split(X, y, groups))
+        candidate_params = self._get_candidate_params()
+
+        base_estimator = clone(self.estimator)
+        out, evaluated, pruned = self._evaluate_candidates(base_estimator, candidate_params, splits, X, y, scorer,
+                                                           params)
+
+        n_splits = len(splits)
+        scores = np.array([result['test_scores'] for result in out], dtype=float).reshape(-1, n_splits)
+
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='One or more of the test scores are non-finite')
+
+            partial_means = np.nanmean(np.where(evaluated, scores, np.nan), axis=1)
+
+            results = self._format_results(candidate_params, n_splits, out, more_results={
+                'pruned': pruned.tolist(),
+                'n_evaluated_splits': evaluated.sum(axis=1).tolist(),
+                'partial_mean_test_score': partial_means.tolist(),
+            })
+
+        self.multimetric_ = False
+        self.best_index_ = self._select_best_index(self.refit, 'score', results)
+
+        if not callable(self.refit):
+            self.best_score_ = results['mean_test_score'][self.best_index_]
+
+        self.best_params_ = results['params'][self.best_index_]
+
+        if self.refit:
+            self.best_estimator_ = clone(base_estimator).set_params(**clone(self.best_params_, safe=False))
+
+            refit_start_time = time.time()
+
+            if y is not None:
+                self.best_estimator_.fit(X, y, **params)
+            else:
+                self.best_estimator_.fit(X, **params)
+
+            self.refit_time_ = time.time() - refit_start_time
+
+            if hasattr(self.best_estimator_, 'feature_names_in_'):
+                self.feature_names_in_ = self.best_estimator_.feature_names_in_
+
+        self.scorer_ = scorer
+        self.cv_results_ = results
+        self.n_splits_ = n_splits
+
+        return self
+
+    def _run_search(self, evaluate_candidates):
+        """
+        Avalia todos os folds dos candidatos, sem descartes. Utilizado apenas pelo fit do BaseSearchCV, que é
+        substituído nessa classe.
+        """
+        evaluate_candidates(self._get_candidate_params())
+
+    def _get_candidate_params(self) -> list[dict]:
+        if self.unique_candidates:
+            return ParamSpace(self.estimator, self.param_distributions).sample(self.n_iter, self.random_state)
+
+        return list(ParameterSampler(self.param_distributions, self.n_iter, random_state=self.random_state))
+
+    def _evaluate_candidates(self, base_estimator, candidate_params: list[dict], splits: list, X, y, scorer,
+                             fit_params: dict) -> tuple[list[dict], np.ndarray, np.ndarray]:
+        """
+        Executa os folds dos candidatos descartando os candidatos sem chances de serem o melhor. Os folds são enviados
+        ao joblib alternando entre n_jobs candidatos em andamento, dessa forma cada candidato tem poucos folds em
+        execução quando é descartado. Com n_jobs igual a 1 os candidatos são avaliados um de cada vez, na ordem.
+
+        :return: Resultados do _fit_and_score de cada candidato e fold, com NaN nos folds não avaliados, a matriz dos
+        folds avaliados e os candidatos descartados.
+        """
+        n_candidates = len(candidate_params)
+        n_splits = len(splits)
+        width = effective_n_jobs(self.n_jobs)
+
+        scores = np.full((n_candidates, n_splits), np.nan)
+        evaluated = np.zeros((n_candidates, n_splits), dtype=bool)
+        pruned = np.zeros(n_candidates, dtype=bool)
+        out = [None] * (n_candidates * n_splits)
+
+        def get_tasks():
+            candidates = iter(range(n_candidates))
+            active = []
+
+            while True:
+                active = [item for item in active if not pruned[item[0]] and item[1] < n_splits]
+
+                while len(active) < width and (candidate_index := next(candidates, None)) is not None:
+                    active.append([candidate_index, 0])
+
+                if len(active) == 0:
+                    return
+
+                for item in active:
+                    candidate_index, split_index = item
+
+                    if pruned[candidate_index]:
+                        continue
+
+                    item[1] += 1
+                    train, test = splits[split_index]
+
+                    yield delayed(_fit_and_score_split)(
+                        candidate_index,
+                        split_index,
+                        clone(base_estimator),
+                        X,
+                        y,
+                        scorer=scorer,
+                        train=train,
+                        test=test,
+                        verbose=self.verbose,
+                        parameters=candidate_params[candidate_index],
+                        fit_params=fit_params,
+                        score_params={},
+                        return_train_score=self.return_train_score,
+                        return_n_test_samples=True,
+                        return_times=True,
+                        split_progress=(split_index, n_splits),
+                        candidate_progress=(candidate_index, n_candidates),
+                        error_score=self.error_score
+                    )
+
+        parallel = Parallel(n_jobs=self.n_jobs, pre_dispatch=self.pre_dispatch, batch_size=1,
+                            return_as='generator_unordered')
+
+        for candidate_index, split_index, result in parallel(get_tasks()):
+            out[candidate_index * n_splits + split_index] = result
+            scores[candidate_index, split_index] = result['test_scores']
+            evaluated[candidate_index, split_index] = True
+
+            self._prune(scores, evaluated, pruned)
+
+        _warn_or_raise_about_fit_failures([result for result in out if result is not None], self.error_score)
+
+        pruned &= ~evaluated.all(axis=1)
+        template = next(result for result in out if result is not None)
+
+        for position, result in enumerate(out):
+            if result is None:
+                out[position] = {**{key: np.nan for key in template}, 'fit_error': None,
+                                 'n_test_samples': len(splits[position % n_splits][1])}
+
+        if self.verbose > 0:
+            print(f'{pruned.sum()} de {n_candidates} candidatos descartados, '
+                  f'{evaluated.sum()} de {n_candidates * n_splits} fits realizados')
+
+        return out, evaluated, pruned
+
+    def _prune(self, scores: np.ndarray, evaluated: np.ndarray, pruned: np.ndarray):
+        """
+        Marca como descartados os candidatos incompletos cujo limite superior da diferença para o incumbente, nos folds
+        já avaliados, é menor que zero.
+        """
+        complete = evaluated.all(axis=1)
+        complete_means = np.where(complete, scores.mean(axis=1), np.nan)
+
+        if np.isnan(complete_means).all():
+            return
+
+        incumbent = int(np.nanargmax(complete_means))
+
+        for candidate_index in np.flatnonzero(~complete & ~pruned):
+            candidate_evaluated = evaluated[candidate_index]
+            folds = int(candidate_evaluated.sum())
+
+            if folds < self.min_folds:
+                continue
+
+            differences = scores[candidate_index, candidate_evaluated] - scores[incumbent, candidate_evaluated]
+            margin = t.ppf(self.confidence, folds - 1) * differences.std(ddof=1) / np.sqrt(folds)
+
+            if differences.mean() + margin < 0:
+                pruned[candidate_index] = True
+
+
+def _fit_and_score_split(candidate_index: int, split_index: int, *args, **kwargs) -> tuple[int, int, dict]:
+    """
+    Executa o _fit_and_score retornando junto a posição do candidato e do fold, já que os resultados chegam fora de
+    ordem.
+    """
+    return candidate_index, split_index, _fit_and_score(*args, **kwargs)
+
+
+class RandomHipperParamsSearcher(HipperParamsSearcher):
     """
-    Implementação para busca de parâmetros utilizando RandomizedSearchCV
+    Implementação para busca de parâmetros utilizando RandomizedSearchCV, ou EarlyStoppingRandomSearchCV quando
+    early_stopping é utilizado.
+
+    Por padrão os candidatos são gerados pelo ParamSpace, dessa forma nenhum fit é gasto com combinações repetidas ou
+    equivalentes e, quando o espaço possui até number_iterations combinações, todas elas são avaliadas uma única vez.
     """
 
     def __init__(self,
                  number_iterations: int,
+                 unique_candidates: bool = True,
+                 early_stopping: bool = False,
+                 min_folds: int = 3,
+                 confidence: float = 0.95,
                  n_jobs: int = -1,
                  log_level: int = 0):
         """
         :param number_iterations: Número de iterações da busca, isso impacta no número de fits realizados com diferentes
         valores.
 
+        :param unique_candidates: Flag que indica se os candidatos devem ser gerados pelo ParamSpace, sem repetições e
+        sem combinações equivalentes. Caso contrário são sorteados pelo ParameterSampler, como no RandomizedSearchCV.
+
+        :param early_stopping: Flag que indica se os folds restantes dos candidatos sem chances de serem o melhor devem
+        ser descartados. Os candidatos avaliados são os mesmos da busca sem descarte.
+
+        :param min_folds: Quantidade mínima de folds avaliados antes que um candidato possa ser descartado.
+
+        :param confidence: Nível de confiança utilizado na comparação com o melhor candidato.
+
         :param n_jobs: Número de threads usadas no processamento.
 
         :param log_level: Nível de log do processo de busca, isso impacta em quanta informação você verá no console.
         """
 
-        self.number_iterations = number_iterations
-        self.n_jobs = n_jobs
-        self.log_level = log_level
+        super().__init__(n_jobs, log_level)
 
-        self.start_search_parameter_time = 0
-        self.end_search_parameter_time = 0
+        self.number_iterations = number_iterations
+        self.unique_candidates = unique_candidates
+        self.early_stopping = early_stopping
+        self.min_folds = min_folds
+        self.confidence = confidence
 
     def search_hipper_parameters(self,
                                  estimator,
@@ -33,7 +347,7 @@ class RandomHipperParamsSearcher:
                                  data_x,
                                  data_y,
                                  cv,
-                                 scoring: str) -> RandomizedSearchCV:
+                                 scoring: str) -> RandomizedSearchCV | EarlyStoppingRandomSearchCV:
         """
         Função para realizar a busca dos melhores parâmetros do estimador, utilizando RandomizedSearchCV
 
@@ -55,16 +369,44 @@ class RandomHipperParamsSearcher:
 
         self.start_search_parameter_time = time.time()
 
-        search = RandomizedSearchCV(estimator=estimator,
-                                    param_distributions=params,
-                                    cv=cv,
-                                    n_jobs=self.n_jobs,
-                                    verbose=self.log_level,
-                                    n_iter=self.number_iterations,
-                                    scoring=scoring)
+        if self.early_stopping:
+            search = EarlyStoppingRandomSearchCV(estimator=estimator,
+                                                 param_distributions=params,
+                                                 cv=cv,
+                                                 n_jobs=self.n_jobs,
+                                                 verbose=self.log_level,
+                                                 n_iter=self.number_iterations,
+                                                 min_folds=self.min_folds,
+                                                 confidence=self.confidence,
+                                                 unique_candidates=self.unique_candidates,
+                                                 random_state=np.random.randint(np.iinfo(np.int32).max),
+                                                 scoring=scoring)
+        else:
+            search_class = UniqueRandomSearchCV if self.unique_candidates else RandomizedSearchCV
+            search = search_class(estimator=estimator,
+                                  param_distributions=params,
+                                  cv=cv,
+                                  n_jobs=self.n_jobs,
+                                  verbose=self.log_level,
+                                  n_iter=self.number_iterations,
+                                  random_state=np.random.randint(np.iinfo(np.int32).max),
+                                  scoring=scoring)
 
         search.fit(X=data_x, y=data_y)
 
         self.end_search_parameter_time = time.time()
 
         return search
+
+    def get_config(self) -> dict:
+        """
+        Sem early_stopping os parâmetros do descarte não influenciam na busca e não fazem parte da configuração, dessa
+        forma os fingerprints salvos antes dessas opções continuam válidos.
+        """
+        config = super().get_config()
+
+        if not self.early_stopping:
+            for name in ['early_stopping', 'min_folds', 'confidence']:
+                config.pop(name)
+
+        return config
@@ -0,0 +1,213 @@
+import argparse
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+
+from data.data_processing import DEFAULT_CHUNK_SIZE, iter_test_data
+from manager.history_manager import HistoryManager, CrossValidationHistoryManager
+
+
+class BatchPredictionReport:
+    """
+    Informações de desempenho de uma execução do BatchPredictor.
+    """
+
+    def __init__(self, version: int, rows: int, batches: int, workers: int, start_time: float, end_time: float):
+        """
+        :param version: Versão do histórico do modelo utilizado.
+
+        :param rows: Quantidade de linhas classificadas.
+
+        :param batches: Quantidade de blocos processados.
+
+        :param workers: Quantidade de processos utilizados.
+
+        :param start_time: Momento do início da classificação.
+
+        :param end_time: Momento do fim da classificação, depois de gravar o último bloco.
+        """
+        self.version = version
+        self.rows = rows
+        self.batches = batches
+        self.workers = workers
+        self.start_time = start_time
+        self.end_time = end_time
+
+    @property
+    def elapsed_time(self) -> float:
+        return self.end_time - self.start_time
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed_time if self.elapsed_time > 0 else float('inf')
+
+
+class BatchPredictor:
+    """
+    Classifica arquivos grandes com um modelo salvo no histórico, normalmente o history_bests.
+
+    O modelo e o preprocessor são carregados uma única vez em cada processo, os dados são lidos em blocos de tamanho
+    fixo e os blocos são distribuídos entre os processos. As predições são gravadas no arquivo de saída assim que cada
+    bloco termina, na mesma ordem da entrada, por isso o arquivo inteiro nunca fica em memória.
+
+    O arquivo de saída segue o formato do gender_submission.csv (PassengerId,Survived) e, quando predict_proba for
+    utilizado, recebe uma coluna de probabilidade para cada classe.
+    """
+
+    def __init__(self,
+                 history_manager: HistoryManager,
+                 index: int = -1,
+                 batch_size: int = DEFAULT_CHUNK_SIZE,
+                 n_workers: int = -1,
+                 predict_proba: bool = False,
+                 log_level: int = 1):
+        """
+        :param history_manager: Histórico de onde o modelo e o preprocessor serão carregados. O registro deve ter sido
+        salvo com um preprocessor, caso contrário os dados brutos não podem ser transformados.
+
+        :param index: Índice do registro do histórico que deseja utilizar, por padrão o último.
+
+        :param batch_size: Quantidade de linhas enviadas de uma vez para cada processo.
+
+        :param n_workers: Quantidade de processos utilizados. Se for -1 serão utilizados todos os núcleos da máquina e
+        se for 1 os blocos são processados no processo atual.
+
+        :param predict_proba: Flag que indica se as probabilidades de cada classe devem ser gravadas junto com a classe.
+
+        :param log_level: Nível de log do processo, com 0 nada é exibido e com 1 o resumo da execução é exibido.
+        """
+        self.history_manager = history_manager
+        self.index = index
+        self.batch_size = batch_size
+        self.n_workers = n_workers
+        self.predict_proba = predict_proba
+        self.log_level = log_level
+
+    def predict_file(self, input_path: str, output_path: str) -> BatchPredictionReport:
+        """
+        Classifica todas as linhas do arquivo de entrada e grava as predições no arquivo de saída.
+
+        :param input_path: Caminho do arquivo no formato do test.csv, CSV ou Parquet.
+
+        :param output_path: Caminho do CSV onde as predições serão gravadas.
+        """
+        if not self.history_manager.has_history():
+            raise FileNotFoundError(f'O histórico {self.history_manager.params_file_name} não foi encontrado no '
+                                    f'diretório {self.history_manager.output_directory}.')
+
+        version = self.history_manager.store.get_version(self.index)
+
+        if self.history_manager.get_saved_preprocessor(version) is None:
+            raise ValueError(f'O registro {version} do histórico {self.history_manager.params_file_name} foi salvo sem '
+                             f'preprocessor, não é possível transformar os dados brutos.')
+
+        workers = os.cpu_count() if self.n_workers == -1 else self.n_workers
+        batches = iter_test_data(input_path, self.batch_size)
+        start_time = time.time()
+        rows = 0
+        batches_number = 0
+
+        with open(output_path, 'w', newline='') as output_file:
+            for predictions in self._predict_batches(batches, version, workers):
+                predictions.to_csv(output_file, header=batches_number == 0, index=False)
+                rows += len(predictions)
+                batches_number += 1
+
+        report = BatchPredictionReport(version=version,
+                                       rows=rows,
+                                       batches=batches_number,
+                                       workers=workers,
+                                       start_time=start_time,
+                                       end_time=time.time())
+
+        if self.log_level > 0:
+            print(f'{report.rows} linhas classificadas em {report.batches} blocos com {report.workers} processos em '
+                  f'{report.elapsed_time:.2f}s ({report.rows_per_second:.0f} linhas/s).')
+
+        return report
+
+    def _predict_batches(self, batches: Iterator[DataFrame], version: int, workers: int) -> Iterator[DataFrame]:
+        """
+        Retorna as predições de cada bloco na ordem da entrada. Com mais de um processo, no máximo dois blocos por
+        processo ficam aguardando ao mesmo tempo, dessa forma a leitura não se adianta à classificação.
+        """
+        if workers == 1:
+            _load_artifacts(self.history_manager, version)
+
+            for batch in batches:
+                yield _predict_batch(batch, self.predict_proba)
+
+            return
+
+        with ProcessPoolExecutor(max_workers=workers,
+                                 initializer=_load_artifacts,
+                                 initargs=(self.history_manager, version)) as executor:
+            pending = deque()
+
+            for batch in batches:
+                pending.append(executor.submit(_predict_batch, batch, self.predict_proba))
+
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+
+            while pending:
+                yield pending.popleft().result()
+
+
+_model = None
+_preprocessor = None
+
+
+def _load_artifacts(history_manager: HistoryManager, version: int):
+    """
+    Carrega o modelo e o preprocessor da versão uma única vez por processo. Com o MemoryMappedModelSerializer os arrays
+    do modelo são mapeados do mesmo arquivo em todos os processos, sem uma cópia para cada um.
+    """
+    global _model, _preprocessor
+
+    _model = history_manager.get_saved_model(version)
+    _preprocessor = history_manager.get_saved_preprocessor(version)
+
+
+def _predict_batch(batch: DataFrame, predict_proba: bool) -> DataFrame:
+    data_x = _preprocessor.transform(batch.drop(columns=['id_passageiro']))
+    predictions = pd.DataFrame({'PassengerId': batch['id_passageiro'].to_numpy(),
+                                'Survived': _model.predict(data_x)})
+
+    if predict_proba:
+        probabilities = _model.predict_proba(data_x)
+
+        for position, model_class in enumerate(_model.classes_):
+            predictions[f'Probability_{model_class}'] = probabilities[:, position].astype(np.float32)
+
+    return predictions
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Classifica um arquivo no formato do test.csv com o melhor modelo '
+                                                 'salvo no histórico.')
+    parser.add_argument('input_path', help='Arquivo CSV ou Parquet que será classificado.')
+    parser.add_argument('output_path', help='CSV onde as predições serão gravadas.')
+    parser.add_argument('--output-directory', default='history_bests')
+    parser.add_argument('--models-directory', default='best_models')
+    parser.add_argument('--params-file-name', default='best_params')
+    parser.add_argument('--index', type=int, default=-1)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--n-workers', type=int, default=-1)
+    parser.add_argument('--predict-proba', action='store_true')
+    args = parser.parse_args()
+
+    predictor = BatchPredictor(history_manager=CrossValidationHistoryManager(output_directory=args.output_directory,
+                                                                             models_directory=args.models_directory,
+                                                                             params_file_name=args.params_file_name),
+                               index=args.index,
+                               batch_size=args.batch_size,
+                               n_workers=args.n_workers,
+                               predict_proba=args.predict_proba)
+    predictor.predict_file(args.input_path, args.output_path)
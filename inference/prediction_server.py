@@ -0,0 +1,383 @@
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+from urllib.parse import urlsplit
+
+import numpy as np
+import pandas as pd
+
+from manager.fit_cache import FitCache
+from manager.history_manager import HistoryManager, CrossValidationHistoryManager
+
+
+class ServingMetrics:
+    """
+    Contadores do PredictionServer. As latências são mantidas em uma janela com as últimas requisições, dessa forma os
+    percentis refletem o comportamento recente do servidor.
+    """
+
+    def __init__(self, window_size: int = 10_000):
+        """
+        :param window_size: Quantidade de latências consideradas no cálculo dos percentis.
+        """
+        self.start_time = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.reloads = 0
+        self.latencies = deque(maxlen=window_size)
+
+    def add_batch(self, latencies: list[float], errors: int):
+        """
+        Registra um micro-batch processado.
+
+        :param latencies: Tempo, em segundos, entre a chegada e a resposta de cada requisição do batch.
+
+        :param errors: Quantidade de requisições do batch que falharam.
+        """
+        self.batches += 1
+        self.requests += len(latencies)
+        self.errors += errors
+        self.latencies.extend(latencies)
+
+    def to_dict(self) -> dict:
+        uptime = time.time() - self.start_time
+        latencies = np.array(self.latencies) * 1000 if self.latencies else np.zeros(1)
+
+        return {
+            'uptime': uptime,
+            'requests': self.requests,
+            'errors': self.errors,
+            'batches': self.batches,
+            'mean_batch_size': self.requests / self.batches if self.batches else 0.0,
+            'reloads': self.reloads,
+            'throughput': self.requests / uptime if uptime > 0 else 0.0,
+            'latency_p50_ms': float(np.percentile(latencies, 50)),
+            'latency_p99_ms': float(np.percentile(latencies, 99)),
+        }
+
+
+class PredictionServer:
+    """
+    Servidor HTTP assíncrono que disponibiliza o melhor modelo salvo no histórico, normalmente o history_bests salvo
+    pelo ScikitLearnMultiProcessManager.
+
+    As requisições de uma única linha que chegam ao mesmo tempo são agrupadas em micro-batches, limitados por
+    max_batch_size e por max_wait, e classificadas com uma única chamada vetorizada do predict, executada fora do loop
+    de eventos. O histórico é verificado periodicamente e, quando uma nova versão aparece, o modelo é carregado em
+    segundo plano e substituído entre dois batches, sem perder requisições.
+
+    Rotas:
+
+    - POST /predict: recebe um objeto JSON com as colunas brutas, por exemplo, {"classe_social": 3, "sexo": "male",
+      "idade": 34.5, ...}, e retorna a predição e a versão do modelo utilizado. Registros salvos sem preprocessor
+      recebem as features já codificadas.
+    - GET /metrics: retorna os contadores de requisições, a vazão e as latências p50 e p99.
+    - GET /health: retorna a versão do modelo carregado.
+    """
+
+    def __init__(self,
+                 history_manager: HistoryManager,
+                 host: str = '127.0.0.1',
+                 port: int = 8080,
+                 max_batch_size: int = 256,
+                 max_wait: float = 0.002,
+                 reload_interval: float = 5.0,
+                 predict_proba: bool = False):
+        """
+        :param history_manager: Histórico de onde o modelo e o preprocessor serão carregados, sempre o último registro.
+
+        :param host: Endereço em que o servidor ficará disponível.
+
+        :param port: Porta em que o servidor ficará disponível. Se for 0 uma porta livre é escolhida.
+
+        :param max_batch_size: Quantidade máxima de requisições classificadas juntas.
+
+        :param max_wait: Tempo máximo, em segundos, que a primeira requisição de um batch aguarda por outras.
+
+        :param reload_interval: Intervalo, em segundos, entre as verificações de novas versões no histórico.
+
+        :param predict_proba: Flag que indica se as probabilidades de cada classe devem ser retornadas.
+        """
+        self.history_manager = history_manager
+        self.host = host
+        self.port = port
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.reload_interval = reload_interval
+        self.predict_proba = predict_proba
+
+        self.metrics = ServingMetrics()
+        self.version = None
+        self._model = None
+        self._preprocessor = None
+        self._queue = None
+        self._server = None
+        self._tasks = []
+        self._connections = {}
+
+    async def start(self):
+        """
+        Carrega o modelo e começa a aceitar conexões. Retorna assim que o servidor estiver disponível.
+        """
+        await self._reload()
+
+        self._queue = asyncio.Queue()
+        self._tasks = [asyncio.create_task(self._process_batches()), asyncio.create_task(self._watch_history())]
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def serve_forever(self):
+        await self.start()
+
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self):
+        self._server.close()
+
+        for writer in self._connections.values():
+            writer.close()
+
+        await asyncio.gather(*self._connections, return_exceptions=True)
+        await self._server.wait_closed()
+
+        for task in self._tasks:
+            task.cancel()
+
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def predict(self, row: dict):
+        """
+        Adiciona uma linha na fila do próximo micro-batch e aguarda a predição.
+
+        :param row: Valores das colunas de uma linha.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future, time.perf_counter()))
+
+        return await future
+
+    async def _process_batches(self):
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                timeout = deadline - loop.time()
+
+                if timeout <= 0:
+                    break
+
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            version, model, preprocessor = self.version, self._model, self._preprocessor
+            rows = [row for row, _, _ in batch]
+            results = await loop.run_in_executor(None, _predict_rows, model, preprocessor, rows, self.predict_proba)
+
+            latencies = []
+            errors = 0
+
+            for (_, future, arrival_time), result in zip(batch, results):
+                latencies.append(time.perf_counter() - arrival_time)
+
+                if isinstance(result, Exception):
+                    errors += 1
+
+                    if not future.done():
+                        future.set_exception(result)
+                elif not future.done():
+                    future.set_result({**result, 'version': version})
+
+            self.metrics.add_batch(latencies, errors)
+
+    async def _watch_history(self):
+        while True:
+            await asyncio.sleep(self.reload_interval)
+
+            try:
+                await self._reload()
+            except Exception as error:
+                print(f'Não foi possível recarregar o modelo: {error!r}')
+
+    async def _reload(self):
+        """
+        Carrega a última versão do histórico quando ela for diferente da versão atual. A leitura é feita em uma thread e
+        a troca acontece de uma vez, os batches em andamento terminam com o modelo anterior.
+        """
+        loop = asyncio.get_running_loop()
+        version = await loop.run_in_executor(None, self._get_last_version)
+
+        if version == self.version:
+            return
+
+        model, preprocessor = await loop.run_in_executor(None, self._load_version, version)
+
+        if self.version is not None:
+            self.metrics.reloads += 1
+
+        self.version, self._model, self._preprocessor = version, model, preprocessor
+
+    def _get_last_version(self) -> int:
+        if not self.history_manager.has_history():
+            raise FileNotFoundError(f'O histórico {self.history_manager.params_file_name} não foi encontrado no '
+                                    f'diretório {self.history_manager.output_directory}.')
+
+        return self.history_manager.store.get_version(-1)
+
+    def _load_version(self, version: int) -> tuple:
+        """
+        Carrega cópias independentes do modelo e do preprocessor da versão, que não são compartilhadas com outros
+        usuários do HistoryManager. Modelos salvos com a classe do FitCache, por versões anteriores do manager, voltam
+        para a classe original do estimador.
+        """
+        model = FitCache.unwrap(self.history_manager.get_saved_model(version))
+
+        return model, self.history_manager.get_saved_preprocessor(version)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """
+        Atende as requisições HTTP/1.1 de uma conexão, mantendo-a aberta enquanto o cliente desejar.
+        """
+        self._connections[asyncio.current_task()] = writer
+
+        try:
+            while True:
+                request_line = await reader.readline()
+
+                if not request_line:
+                    break
+
+                method, target, _ = request_line.decode('latin-1').split(' ', 2)
+                headers = {}
+
+                while (line := await reader.readline()) not in (b'\r\n', b'\n', b''):
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                body = await reader.readexactly(int(headers.get('content-length', 0)))
+                status, response = await self._route(method, urlsplit(target).path, body)
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                payload = json.dumps(response).encode()
+                writer.write(f'HTTP/1.1 {status}\r\n'
+                             f'Content-Type: application/json\r\n'
+                             f'Content-Length: {len(payload)}\r\n'
+                             f'Connection: {"keep-alive" if keep_alive else "close"}\r\n\r\n'.encode() + payload)
+                await writer.drain()
+
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            self._connections.pop(asyncio.current_task(), None)
+            writer.close()
+
+    async def _route(self, method: str, path: str, body: bytes) -> tuple[str, dict]:
+        if method == 'POST' and path == '/predict':
+            try:
+                row = json.loads(body)
+            except json.JSONDecodeError as error:
+                return '400 Bad Request', {'error': f'JSON inválido: {error}'}
+
+            if not isinstance(row, dict):
+                return '400 Bad Request', {'error': 'O corpo deve ser um objeto JSON com os valores de uma linha.'}
+
+            missing = [column for column in self._get_input_columns() if column not in row]
+
+            if missing:
+                return '400 Bad Request', {'error': f'As colunas {missing} não foram informadas.'}
+
+            try:
+                return '200 OK', await self.predict(row)
+            except Exception as error:
+                return '422 Unprocessable Entity', {'error': repr(error)}
+
+        if method == 'GET' and path == '/metrics':
+            return '200 OK', {**self.metrics.to_dict(), 'version': self.version}
+
+        if method == 'GET' and path == '/health':
+            return '200 OK', {'status': 'ok', 'version': self.version}
+
+        return '404 Not Found', {'error': f'Rota {method} {path} não encontrada.'}
+
+    def _get_input_columns(self) -> list[str]:
+        if self._preprocessor is not None:
+            columns = getattr(self._preprocessor, 'feature_names_in_', None)
+        else:
+            columns = getattr(self._model, 'feature_names_in_', None)
+
+        return [] if columns is None else list(columns)
+
+
+def _predict_rows(model, preprocessor, rows: list[dict], predict_proba: bool) -> list:
+    """
+    Classifica todas as linhas com uma única chamada do predict. Se o batch falhar, as linhas são classificadas uma a
+    uma, dessa forma uma linha inválida não causa erro nas demais.
+
+    :return: Lista com o resultado de cada linha, um dicionário com a predição ou a exceção ocorrida.
+    """
+    try:
+        return _predict_data_frame(model, preprocessor, pd.DataFrame.from_records(rows), predict_proba)
+    except Exception:
+        return [_capture_error(model, preprocessor, row, predict_proba) for row in rows]
+
+
+def _capture_error(model, preprocessor, row: dict, predict_proba: bool):
+    try:
+        return _predict_data_frame(model, preprocessor, pd.DataFrame.from_records([row]), predict_proba)[0]
+    except Exception as error:
+        return error
+
+
+def _predict_data_frame(model, preprocessor, data_x: pd.DataFrame, predict_proba: bool) -> list[dict]:
+    if preprocessor is not None:
+        data_x = preprocessor.transform(data_x)
+    elif hasattr(model, 'feature_names_in_'):
+        data_x = data_x[model.feature_names_in_]
+
+    results = [{'prediction': prediction} for prediction in model.predict(data_x).tolist()]
+
+    if predict_proba:
+        classes = [str(model_class) for model_class in model.classes_.tolist()]
+
+        for result, probabilities in zip(results, model.predict_proba(data_x).tolist()):
+            result['probabilities'] = dict(zip(classes, probabilities))
+
+    return results
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Disponibiliza o melhor modelo salvo no histórico em um servidor '
+                                                 'HTTP.')
+    parser.add_argument('--output-directory', default='history_bests')
+    parser.add_argument('--models-directory', default='best_models')
+    parser.add_argument('--params-file-name', default='best_params')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--max-batch-size', type=int, default=256)
+    parser.add_argument('--max-wait', type=float, default=0.002)
+    parser.add_argument('--reload-interval', type=float, default=5.0)
+    parser.add_argument('--predict-proba', action='store_true')
+    args = parser.parse_args()
+
+    server = PredictionServer(history_manager=CrossValidationHistoryManager(output_directory=args.output_directory,
+                                                                            models_directory=args.models_directory,
+                                                                            params_file_name=args.params_file_name),
+                              host=args.host,
+                              port=args.port,
+                              max_batch_size=args.max_batch_size,
+                              max_wait=args.max_wait,
+                              reload_interval=args.reload_interval,
+                              predict_proba=args.predict_proba)
+
+    asyncio.run(server.serve_forever())
@@ -0,0 +1,101 @@
+import json
+import os
+import tempfile
+
+import joblib
+
+
+class FeatureSelectionCache:
+    """
+    Cache das features selecionadas em cada pipeline. A chave é formada pela configuração do FeaturesSearcher, pelo
+    estimador e seus parâmetros (apenas quando o searcher utiliza o estimador), pela impressão digital dos dados e pela
+    validação cruzada.
+
+    Dessa forma pipelines que utilizam o mesmo searcher sobre os mesmos dados não repetem a seleção. Searchers que não
+    dependem do estimador, como o SelectKBestFeatureSearcher, executam a seleção uma única vez para todos os pipelines.
+
+    Os resultados sempre ficam em memória. Quando um diretório é definido eles também são gravados em disco, o que
+    permite compartilhar as seleções entre os processos do ProcessPoolPipelineScheduler e entre execuções diferentes.
+    """
+
+    def __init__(self, directory: str = None):
+        """
+        :param directory: Diretório onde as seleções serão gravadas. Se não for definido o cache fica apenas em memória.
+        """
+        self.directory = directory
+        self._selections = {}
+
+    def get_key(self, feature_searcher, estimator, data_fingerprint: str, cv, scoring: str) -> str:
+        """
+        Calcula a chave da seleção de features.
+
+        :param feature_searcher: Implementação de FeaturesSearcher que fará a seleção.
+
+        :param estimator: Estimador do pipeline.
+
+        :param data_fingerprint: Hash dos dados de x e y utilizados na seleção.
+
+        :param cv: Definição da validação cruzada utilizada na seleção.
+
+        :param scoring: Métrica avaliada na seleção.
+        """
+        estimator_config = None
+
+        if feature_searcher.uses_estimator:
+            estimator_config = (type(estimator).__name__, estimator.get_params(deep=False))
+
+        return joblib.hash((
+            f'{type(feature_searcher).__module__}.{type(feature_searcher).__qualname__}',
+            feature_searcher.get_config(),
+            estimator_config,
+            data_fingerprint,
+            cv,
+            scoring
+        ))
+
+    def load(self, key: str) -> list[str] | None:
+        """
+        Recupera as colunas selecionadas, primeiro da memória e depois do diretório, se existir.
+
+        :param key: Chave calculada por get_key.
+        """
+        if key in self._selections:
+            return list(self._selections[key])
+
+        if self.directory is None:
+            return None
+
+        try:
+            with open(self._get_path(key), 'r') as file:
+                columns = json.load(file)
+        except FileNotFoundError:
+            return None
+
+        self._selections[key] = columns
+
+        return list(columns)
+
+    def save(self, key: str, columns: list[str]):
+        """
+        Salva as colunas selecionadas. No diretório o arquivo é gravado em um arquivo temporário e renomeado, dessa forma
+        processos concorrentes nunca leem uma seleção incompleta.
+
+        :param key: Chave calculada por get_key.
+
+        :param columns: Colunas selecionadas.
+        """
+        self._selections[key] = list(columns)
+
+        if self.directory is None:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+
+        with os.fdopen(file_descriptor, 'w') as file:
+            json.dump(list(columns), file)
+
+        os.replace(temp_path, self._get_path(key))
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.json')
@@ -0,0 +1,212 @@
+import os
+import tempfile
+
+import joblib
+from pandas import DataFrame
+from sklearn.base import clone
+
+
+class FitCache:
+    """
+    Cache em disco dos estimadores treinados, endereçado pelo conteúdo do que foi utilizado no fit.
+
+    A chave de cada fit é um hash da classe do estimador, dos seus parâmetros, das colunas selecionadas e dos próprios
+    dados de treino do fold (o que já identifica os índices de treino e o conjunto de dados). Quando o mesmo fit é
+    solicitado novamente, seja pela seleção de features, pela busca de parâmetros, pela validação ou por uma nova
+    execução, o estimador treinado é recuperado do disco ao invés de ser treinado novamente.
+
+    Estimadores com random_state=None também são reaproveitados, ou seja, o primeiro resultado obtido para uma chave
+    passa a ser o resultado de todas as execuções seguintes.
+    """
+
+    def __init__(self,
+                 directory: str,
+                 max_size_bytes: int = None,
+                 max_items: int = None):
+        """
+        :param directory: Diretório onde os estimadores treinados serão armazenados.
+
+        :param max_size_bytes: Tamanho máximo do cache em bytes. Quando ultrapassado, os itens utilizados há mais tempo
+        são removidos.
+
+        :param max_items: Quantidade máxima de itens do cache. Quando ultrapassada, os itens utilizados há mais tempo
+        são removidos.
+        """
+        self.directory = directory
+        self.max_size_bytes = max_size_bytes
+        self.max_items = max_items
+
+    def wrap(self, estimator):
+        """
+        Retorna uma cópia do estimador, com os mesmos parâmetros, que consulta o cache antes de realizar o fit. A classe
+        retornada possui o mesmo nome da classe original, por isso os resultados e o histórico não são alterados.
+
+        :param estimator: Instância do estimador que deseja utilizar com o cache.
+        """
+        if isinstance(estimator, _CachedFitMixin):
+            return clone(estimator)
+
+        cached_class = _get_cached_class(type(estimator), self)
+
+        return cached_class(**estimator.get_params(deep=False))
+
+    @staticmethod
+    def unwrap(estimator):
+        """
+        Retorna o estimador, com o mesmo estado, sem a consulta ao cache. Utilizado antes de salvar o modelo, dessa forma
+        o modelo salvo não depende deste módulo nem do diretório do cache para ser carregado.
+
+        :param estimator: Instância retornada por wrap ou alguma cópia dela.
+        """
+        if not isinstance(estimator, _CachedFitMixin):
+            return estimator
+
+        estimator_class = _get_base_class(type(estimator))
+        unwrapped = estimator_class.__new__(estimator_class)
+        unwrapped.__dict__.update(estimator.__dict__)
+
+        return unwrapped
+
+    def get_key(self, estimator, data_x, data_y, fit_params: dict) -> str:
+        """
+        Calcula a chave do fit a partir da classe e dos parâmetros do estimador e dos dados de treino.
+        """
+        estimator_class = _get_base_class(type(estimator))
+        columns = data_x.columns.tolist() if isinstance(data_x, DataFrame) else None
+
+        return joblib.hash((
+            f'{estimator_class.__module__}.{estimator_class.__qualname__}',
+            estimator.get_params(deep=False),
+            columns,
+            data_x,
+            data_y,
+            fit_params
+        ))
+
+    def load(self, key: str) -> dict | None:
+        """
+        Recupera o estado do estimador treinado. A data de modificação do arquivo é atualizada a cada acesso, ela define
+        quais itens foram utilizados há mais tempo no momento da remoção.
+
+        :param key: Chave do fit calculada por get_key.
+        """
+        path = self._get_path(key)
+
+        try:
+            state = joblib.load(path)
+            os.utime(path)
+        except (FileNotFoundError, EOFError):
+            return None
+
+        return state
+
+    def save(self, key: str, state: dict):
+        """
+        Salva o estado do estimador treinado. O arquivo é gravado em um arquivo temporário e renomeado, dessa forma
+        processos concorrentes nunca leem um item incompleto.
+
+        :param key: Chave do fit calculada por get_key.
+
+        :param state: Dicionário com os atributos do estimador treinado.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(file_descriptor)
+
+        joblib.dump(state, temp_path)
+        os.replace(temp_path, self._get_path(key))
+
+        self.evict()
+
+    def evict(self):
+        """
+        Remove os itens utilizados há mais tempo até que o cache respeite os limites de tamanho e de quantidade.
+        """
+        if self.max_size_bytes is None and self.max_items is None:
+            return
+
+        entries = []
+
+        with os.scandir(self.directory) as iterator:
+            for entry in iterator:
+                if entry.name.endswith('.joblib'):
+                    stat = entry.stat()
+                    entries.append((stat.st_mtime, stat.st_size, entry.path))
+
+        entries.sort()
+        total_size = sum(size for _, size, _ in entries)
+
+        while entries and self._exceeds_limits(len(entries), total_size):
+            _, size, path = entries.pop(0)
+            total_size -= size
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def _exceeds_limits(self, items: int, size: int) -> bool:
+        return ((self.max_items is not None and items > self.max_items) or
+                (self.max_size_bytes is not None and size > self.max_size_bytes))
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, f'{key}.joblib')
+
+
+class _CachedFitMixin:
+    """
+    Mixin adicionado às classes dos estimadores para que o fit seja realizado através do FitCache.
+    """
+
+    fit_cache: FitCache = None
+
+    def fit(self, X, y=None, **fit_params):
+        key = self.fit_cache.get_key(self, X, y, fit_params)
+        state = self.fit_cache.load(key)
+
+        if state is None:
+            super().fit(X, y, **fit_params)
+            self.fit_cache.save(key, self.__getstate__())
+        else:
+            self.__setstate__(state)
+
+        return self
+
+    def __reduce__(self):
+        return _rebuild_cached_estimator, (_get_base_class(type(self)), self.fit_cache), self.__getstate__()
+
+
+_cached_classes = {}
+
+
+def _get_cached_class(estimator_class, fit_cache: FitCache):
+    """
+    Cria, uma única vez por classe de estimador e configuração do cache (diretório e limites), a subclasse que realiza o
+    fit através do cache.
+    """
+    key = (estimator_class, os.path.abspath(fit_cache.directory), fit_cache.max_size_bytes, fit_cache.max_items)
+
+    if key not in _cached_classes:
+        _cached_classes[key] = type(estimator_class.__name__,
+                                    (_CachedFitMixin, estimator_class),
+                                    {'fit_cache': fit_cache, '__module__': _CachedFitMixin.__module__})
+
+    return _cached_classes[key]
+
+
+def _get_base_class(estimator_class):
+    """
+    Retorna a classe original do estimador. A classe do cache pode ter sido estendida novamente, por exemplo, pelo
+    Tracer, por isso a hierarquia é percorrida até a primeira classe que não utiliza o cache.
+    """
+    while issubclass(estimator_class, _CachedFitMixin):
+        estimator_class = estimator_class.__bases__[-1]
+
+    return estimator_class
+
+
+def _rebuild_cached_estimator(estimator_class, fit_cache: FitCache):
+    cached_class = _get_cached_class(estimator_class, fit_cache)
+
+    return cached_class.__new__(cached_class)
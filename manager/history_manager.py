@@ -1,34 +1,130 @@
+import copy
 import json
 import os
 import pickle
+import tempfile
 from abc import ABC, abstractmethod
+from collections import OrderedDict
 from typing import TypeVar
 
+from manager.history_store import SQLiteHistoryStore
+from manager.model_serializer import ModelSerializer, MemoryMappedModelSerializer, PickleModelSerializer
 from model_validator.result import ScikitLearnCrossValidationResult, ValidationResult
 
 R = TypeVar('R', bound=ValidationResult)
 
+
+class _LRUCache:
+    """
+    Cache limitado que remove o item utilizado há mais tempo quando a quantidade máxima de itens é ultrapassada.
+    """
+
+    _MISSING = object()
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self._items = OrderedDict()
+
+    def get(self, key, default=None):
+        value = self._items.get(key, self._MISSING)
+
+        if value is self._MISSING:
+            return default
+
+        self._items.move_to_end(key)
+
+        return value
+
+    def put(self, key, value):
+        if self.max_size <= 0:
+            return
+
+        self._items[key] = value
+        self._items.move_to_end(key)
+
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
+
+    def clear(self):
+        self._items.clear()
+
+    def __contains__(self, key):
+        return key in self._items
+
+
+class _ArtifactSnapshot:
+    """
+    Forma serializada de um modelo ou preprocessor mantida no cache. Cada restore cria uma cópia independente do
+    objeto, dessa forma um modelo retornado pelo histórico pode ser treinado novamente sem alterar o que está em cache.
+
+    Os arrays somente leitura, como os arrays mapeados em memória pelo MemoryMappedModelSerializer, ficam fora do
+    pickle e as cópias continuam apontando para o mesmo mapeamento, sem copiar os dados. Os demais arrays são copiados
+    a cada restore.
+    """
+
+    def __init__(self, artifact):
+        self._buffers = []
+        self._data = pickle.dumps(artifact, protocol=5, buffer_callback=self._keep_read_only_buffer)
+
+    def restore(self):
+        return pickle.loads(self._data, buffers=self._buffers)
+
+    def _keep_read_only_buffer(self, buffer: pickle.PickleBuffer) -> bool:
+        if not buffer.raw().readonly:
+            return True
+
+        self._buffers.append(buffer)
+
+        return False
+
+
 class HistoryManager(ABC):
     """
     Classe responsável por armazenar os dados históricos das buscas de hiper parâmetros dos modelos. Isso pode evitar
     um reprocessamento quando desejar apenas exibir novamente no console um resultado obtido em uma das tentativas.
 
-    Os dados referentes ao desempenho do modelo são salvos no formato de JSON, dentro de uma lista, onde poderão ser
-    recuperados através do seu índice. Além disso, o próprio modelo é salvo para que possa ser utilizado com dados diferentes
-    e possa ser verificado o seu comportamento.
+    Os dados referentes ao desempenho do modelo são salvos em um HistoryStore, por padrão um banco SQLite onde cada
+    registro é adicionado sem reescrever os anteriores, e poderão ser recuperados através do seu índice. Além disso, o
+    próprio modelo é salvo para que possa ser utilizado com dados diferentes e possa ser verificado o seu comportamento.
+    O formato dos arquivos dos modelos é definido por um ModelSerializer.
+
+    Os registros lidos e os modelos carregados são mantidos em caches LRU, indexados pela versão. Os caches são
+    descartados sempre que a assinatura do histórico (versão do último registro) mudar por causa de outro processo,
+    os registros salvos por esse objeto já entram nos caches. Os modelos ficam serializados no cache e cada leitura
+    retorna uma cópia independente.
     """
 
-    def __init__(self, output_directory: str, models_directory: str, params_file_name: str):
+    def __init__(self,
+                 output_directory: str,
+                 models_directory: str,
+                 params_file_name: str,
+                 serializer: ModelSerializer = None,
+                 cache_size: int = 32):
         """
         :param output_directory: Diretório que armazenará todos os dados de histórico.
 
         :param models_directory: Diretório específico para os modelos treinados.
 
-        :param params_file_name: Nome do arquivo JSON que salvará os valores dos parâmetros que geraram o melhor modelo.
+        :param params_file_name: Nome do arquivo que salvará os valores dos parâmetros que geraram o melhor modelo. Se
+        existir um arquivo JSON com esse nome, no formato antigo, os registros dele são migrados automaticamente.
+
+        :param serializer: Implementação de ModelSerializer utilizada para gravar e ler os modelos. Se não for definido
+        será utilizado MemoryMappedModelSerializer, que prioriza a velocidade de leitura. Para arquivos menores utilize
+        JoblibModelSerializer com compressão.
+
+        :param cache_size: Quantidade máxima de registros e de modelos mantidos em memória. O valor 0 desativa os caches.
         """
         self.output_directory = output_directory
         self.models_directory = os.path.join(self.output_directory, models_directory)
         self.params_file_name = params_file_name
+        self.serializer = MemoryMappedModelSerializer() if serializer is None else serializer
+
+        self.store = SQLiteHistoryStore(path=os.path.join(self.output_directory, f"{self.params_file_name}.db"),
+                                        legacy_json_path=os.path.join(self.output_directory,
+                                                                      f"{self.params_file_name}.json"))
+
+        self.cache_size = cache_size
+        self._create_caches()
 
     @abstractmethod
     def save_result(self,
@@ -37,7 +133,8 @@ class HistoryManager(ABC):
                     search_time: str,
                     validation_time: str,
                     scoring: str,
-                    features: list[str]):
+                    features: list[str],
+                    fingerprint: str = None):
         """
         Função responsável por salvar todos os dados relevantes para o histórico.
 
@@ -52,118 +149,254 @@ class HistoryManager(ABC):
         :param scoring: Métrica utilizada para definição do melhor modelo.
 
         :param features: Features selecionadas.
+
+        :param fingerprint: Hash da configuração do pipeline e da execução que gerou o resultado, utilizado pelo modo
+        incremental do MultiProcessManager para encontrar resultados que podem ser reaproveitados.
         """
 
     def _create_output_dir(self):
         """
-        Função para criar o diretório de histório caso não exista. É nesse diretório que o arquivo JSON e os modelos
-        ficarão.
+        Função para criar o diretório de histório caso não exista. É nesse diretório que o banco do histórico e os
+        modelos ficarão. Vários processos podem criar o diretório ao mesmo tempo.
         """
-        if not os.path.exists(self.output_directory):
-            os.makedirs(self.output_directory)
-
-        if not os.path.exists(self.models_directory):
-            os.makedirs(self.models_directory)
+        os.makedirs(self.models_directory, exist_ok=True)
 
-    def _save_dictionary_in_json(self, dictionary):
+    def _save_dictionary(self, dictionary, estimator, preprocessor=None) -> int:
         """
-        Função utilizada para adicionar o dicionário com os valores resultantes da busca dentro da lista do JSON
+        Função utilizada para adicionar o dicionário com os valores resultantes da busca no histórico, junto com o
+        modelo treinado e o preprocessor utilizado para gerar os dados do modelo.
+
+        O registro e o modelo são salvos na mesma transação do HistoryStore: a versão é atribuída pelo store, o modelo é
+        gravado com essa versão e só então o registro é confirmado. Se a gravação do modelo falhar o registro não é
+        adicionado, dessa forma execuções paralelas nunca deixam registros sem modelo nem sobrescrevem modelos umas das
+        outras.
 
         :param dictionary: Dicionário com os dados
+
+        :param estimator: Estimador que deseja salvar junto com o registro.
+
+        :param preprocessor: Preprocessor treinado que deseja salvar junto com o registro, pode ser None.
+
+        :return: Versão atribuída ao registro, utilizada também no nome do arquivo do modelo.
         """
-        output_path = os.path.join(self.output_directory, f"{self.params_file_name}.json")
+        def save_artifacts(version: int):
+            self._save_model(estimator, version)
 
-        if os.path.exists(output_path):
-            with open(output_path, 'r') as file:
-                data = json.load(file)
-        else:
-            data = []
+            if preprocessor is not None:
+                self._save_artifact(preprocessor, 'preprocessor', version)
 
-        data.append(dictionary)
+        self._validate_caches()
 
-        with open(output_path, 'w') as file:
-            json.dump(data, file, indent=4)
+        version = self.store.append(dictionary, on_version_assigned=save_artifacts)
+        signature = self.store.get_signature_after_append(self._cache_signature, version)
+
+        if signature is None:
+            self._clear_caches()
+            signature = self.store.get_signature()
+
+        self._cache_signature = signature
+        self._records_cache.put(version, json.loads(json.dumps(dictionary)))
+
+        return version
 
     def has_history(self) -> bool:
         """
-        Retorna se há ao menos um registro dentro do arquivo de histórico
+        Retorna se há ao menos um registro dentro do histórico
         """
-        output_path = os.path.join(self.output_directory, f"{self.params_file_name}.json")
-
-        if not os.path.exists(output_path):
-            return False
-
-        with open(output_path, 'r') as file:
-            data = json.load(file)
-            return len(data) > 0
+        return self.store.count() > 0
 
     @abstractmethod
     def load_validation_result_from_history(self, index: int = -1) -> R:
         """
-        Função para obter um objeto ValidationResult com os dados obtidos do JSON.
+        Função para obter um objeto ValidationResult com os dados obtidos do histórico.
 
         :param index: Índice da lista que deseja retornar
         """
 
     def get_dictionary_from_json(self, index):
         """
-        Retorna um dicionário a partir do JSON do histórico
+        Retorna um dicionário a partir do histórico
 
         :param index: Índice da lista de histórico que deseja recuperar
         """
-        output_path = os.path.join(self.output_directory, f"{self.params_file_name}.json")
-
-        if not os.path.exists(output_path):
+        if not self.has_history():
             raise FileNotFoundError(
-                f"O arquivo {self.params_file_name}.json não foi encontrado no diretório {self.output_directory}.")
+                f"O histórico {self.params_file_name} não foi encontrado no diretório {self.output_directory}.")
+
+        self._validate_caches()
+        version = self.store.get_version(index)
+        record = self._records_cache.get(version)
+
+        if record is None:
+            record = self.store.get(version - 1)
+            self._records_cache.put(version, record)
 
-        with open(output_path, 'r') as file:
-            data = json.load(file)
+        return copy.deepcopy(record)
 
-        if index < -1 or index >= len(data):
-            raise IndexError(f"Índice {index} fora dos limites. O arquivo contém {len(data)} entradas.")
+    def get_dictionaries_from_json(self, estimator_name: str = None) -> list[dict]:
+        """
+        Retorna todos os dicionários do histórico.
+
+        :param estimator_name: Nome da classe do estimador. Se for definido serão retornados apenas os registros desse
+        estimador.
+        """
+        self._validate_caches()
+        key = (self.store.count(), estimator_name)
+        records = self._searches_cache.get(key)
 
-        result_dict = data[index]
+        if records is None:
+            records = self.store.find(estimator_name)
+            self._searches_cache.put(key, records)
 
-        return result_dict
+        return copy.deepcopy(records)
 
-    def _save_model(self, estimator):
+    def get_index_by_fingerprint(self, fingerprint: str) -> int | None:
         """
-        Função para salvar o modelo treinado e utilizá-lo para prever com outros dados.
+        Retorna o índice do registro mais recente salvo com o fingerprint informado, ou None se não existir.
+
+        :param fingerprint: Hash da configuração do pipeline, o mesmo enviado para save_result.
+        """
+        records = self.get_dictionaries_from_json()
+
+        for index in range(len(records) - 1, -1, -1):
+            if records[index].get('fingerprint') == fingerprint:
+                return index
+
+        return None
+
+    def _save_model(self, estimator, version: int):
+        """
+        Função para salvar o modelo treinado e utilizá-lo para prever com outros dados. O modelo é gravado em um arquivo
+        temporário e renomeado, dessa forma nenhum processo lê um modelo incompleto.
 
         :param estimator: Estimador que deseja salvar
+
+        :param version: Versão do registro do histórico ao qual o modelo pertence.
+        """
+        self._save_artifact(estimator, 'model', version)
+
+    def _save_artifact(self, artifact, name: str, version: int):
+        """
+        Grava um objeto relacionado a um registro do histórico, como o modelo ou o preprocessor, utilizando o
+        serializer.
+
+        :param artifact: Objeto que deseja salvar.
+
+        :param name: Nome do objeto, utilizado como prefixo do nome do arquivo.
+
+        :param version: Versão do registro do histórico ao qual o objeto pertence.
         """
+        output_path = self._get_artifact_path(name, version, self.serializer)
+        file_descriptor, temp_path = tempfile.mkstemp(dir=self.models_directory, suffix='.tmp')
+        os.close(file_descriptor)
 
-        history_len = self._get_history_len()
-        output_path = os.path.join(self.models_directory, f"model_{history_len}.pkl")
+        try:
+            self.serializer.dump(artifact, temp_path)
+            os.replace(temp_path, output_path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
 
-        with open(output_path, 'wb') as file:
-            pickle.dump(estimator, file)
+            raise
 
     def get_saved_model(self, version: int):
         """
-        Recupera o modelo que foi salvo de acordo com a versão
+        Recupera o modelo que foi salvo de acordo com a versão. Modelos salvos antes da definição do serializer, no
+        formato pickle, continuam sendo lidos.
+
+        Cada chamada retorna uma cópia independente do modelo salvo, ela pode ser treinada novamente sem alterar as
+        próximas leituras.
 
         :param version: Versão do modelo, concatenada no nome do arquivo, que deseja recuperar.
         """
+        return self._load_artifact('model', version)
+
+    def get_saved_preprocessor(self, version: int):
+        """
+        Recupera o preprocessor que foi salvo junto com o modelo da versão. Retorna None quando o registro não possuir
+        preprocessor.
+
+        :param version: Versão do registro do histórico.
+        """
+        return self._load_artifact('preprocessor', version, required=False)
+
+    def _load_artifact(self, name: str, version: int, required: bool = True):
+        self._validate_caches()
+        key = (name, version)
+
+        if key in self._models_cache:
+            snapshot = self._models_cache.get(key)
+
+            return None if snapshot is None else snapshot.restore()
+
+        artifact = None
+
+        for serializer in [self.serializer, PickleModelSerializer()]:
+            output_path = self._get_artifact_path(name, version, serializer)
+
+            if os.path.exists(output_path):
+                artifact = serializer.load(output_path)
+                break
+        else:
+            if required:
+                raise FileNotFoundError(f"O arquivo {name}_{version} não foi encontrado no diretório "
+                                        f"{self.models_directory}.")
+
+        if artifact is None or self.cache_size <= 0:
+            self._models_cache.put(key, None)
+            return artifact
 
-        output_path = os.path.join(self.models_directory, f"model_{version}.pkl")
+        snapshot = _ArtifactSnapshot(artifact)
+        self._models_cache.put(key, snapshot)
 
-        with open(output_path, 'rb') as f:
-            return pickle.load(f)
+        return snapshot.restore()
+
+    def _get_artifact_path(self, name: str, version: int, serializer: ModelSerializer) -> str:
+        return os.path.join(self.models_directory, f"{name}_{version}.{serializer.extension}")
 
     def _get_history_len(self) -> int:
         """
         Retorna o tamanho da lista do histórico
         """
-        output_path = os.path.join(self.output_directory, f"{self.params_file_name}.json")
+        return self.store.count()
+
+    def _create_caches(self):
+        self._records_cache = _LRUCache(self.cache_size)
+        self._searches_cache = _LRUCache(self.cache_size)
+        self._models_cache = _LRUCache(self.cache_size)
+        self._cache_signature = self.store.get_signature()
+
+    def _validate_caches(self):
+        """
+        Descarta os caches quando o histórico for alterado desde a última leitura, por exemplo, por outro processo ou
+        pela recriação do arquivo.
+        """
+        signature = self.store.get_signature()
+
+        if signature != self._cache_signature:
+            self._clear_caches()
+            self._cache_signature = signature
+
+    def _clear_caches(self):
+        self._records_cache.clear()
+        self._searches_cache.clear()
+        self._models_cache.clear()
+
+    def __getstate__(self):
+        """
+        Os caches não são enviados para outros processos, cada processo mantém os seus.
+        """
+        state = self.__dict__.copy()
+        state.pop('_records_cache')
+        state.pop('_searches_cache')
+        state.pop('_models_cache')
+        state.pop('_cache_signature')
 
-        if not os.path.exists(output_path):
-            return 0
+        return state
 
-        with open(output_path, 'r') as file:
-            data = json.load(file)
-            return len(data)
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._create_caches()
 
 
 class CrossValidationHistoryManager(HistoryManager):
@@ -171,8 +404,13 @@ class CrossValidationHistoryManager(HistoryManager):
     Classe para manipular o histórico quando é utilizada a estratégia de validação cruzada.
     """
 
-    def __init__(self, output_directory: str, models_directory: str, params_file_name: str):
-        super().__init__(output_directory, models_directory, params_file_name)
+    def __init__(self,
+                 output_directory: str,
+                 models_directory: str,
+                 params_file_name: str,
+                 serializer: ModelSerializer = None,
+                 cache_size: int = 32):
+        super().__init__(output_directory, models_directory, params_file_name, serializer, cache_size)
 
     def save_result(self,
                     classifier_result: ScikitLearnCrossValidationResult,
@@ -180,7 +418,8 @@ class CrossValidationHistoryManager(HistoryManager):
                     search_time: str,
                     validation_time: str,
                     scoring: str,
-                    features: list[str]):
+                    features: list[str],
+                    fingerprint: str = None):
         dictionary = {
             'estimator': type(classifier_result.estimator).__name__,
             'mean': classifier_result.mean,
@@ -191,18 +430,20 @@ class CrossValidationHistoryManager(HistoryManager):
             'min_max_score': classifier_result.min_max_score,
             'estimator_params': classifier_result.estimator.get_params(),
             'scoring': scoring,
+            'validation_mode': classifier_result.validation_mode,
             'features': ", ".join(features),
             'feature_selection_time': feature_selection_time,
             'search_time': search_time,
-            'validation_time': validation_time
+            'validation_time': validation_time,
+            'fingerprint': fingerprint
         }
 
         self._create_output_dir()
-        self._save_dictionary_in_json(dictionary)
-        self._save_model(classifier_result.estimator)
+        self._save_dictionary(dictionary, classifier_result.estimator, classifier_result.preprocessor)
 
     def load_validation_result_from_history(self, index: int = -1) -> ScikitLearnCrossValidationResult:
         result_dict = self.get_dictionary_from_json(index)
+        version = self.store.get_version(index)
 
         return ScikitLearnCrossValidationResult(
             mean=result_dict['mean'],
@@ -212,5 +453,7 @@ class CrossValidationHistoryManager(HistoryManager):
             standard_error=result_dict['standard_error'],
             min_max_score=result_dict['min_max_score'],
             scoring=result_dict['scoring'],
-            estimator=self.get_saved_model(self._get_history_len()),
+            validation_mode=result_dict.get('validation_mode', 'nested'),
+            estimator=self.get_saved_model(version),
+            preprocessor=self.get_saved_preprocessor(version)
         )
\ No newline at end of file
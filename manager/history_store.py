@@ -0,0 +1,260 @@
+import json
+import os
+import sqlite3
+from abc import ABC, abstractmethod
+from contextlib import closing, contextmanager
+from typing import Callable
+
+
+class HistoryStore(ABC):
+    """
+    Classe responsável pela persistência dos registros do histórico. Os registros são apenas adicionados, nunca
+    alterados, e cada um recebe uma versão sequencial, começando em 1, que também identifica o modelo salvo.
+    """
+
+    @abstractmethod
+    def append(self, record: dict, on_version_assigned: Callable[[int], None] = None) -> int:
+        """
+        Adiciona um registro ao histórico. O registro e os arquivos que dependem da sua versão devem ser salvos de forma
+        atômica, ou seja, se on_version_assigned falhar o registro não deve ser adicionado.
+
+        :param record: Dicionário com os dados do registro.
+
+        :param on_version_assigned: Função chamada com a versão atribuída ao registro antes dele ser confirmado, utilizada
+        para salvar o modelo com o nome da versão.
+
+        :return: Versão atribuída ao registro.
+        """
+
+    @abstractmethod
+    def count(self) -> int:
+        """
+        Retorna a quantidade de registros do histórico.
+        """
+
+    @abstractmethod
+    def get_signature(self):
+        """
+        Retorna um valor que muda sempre que o histórico for alterado, utilizado para invalidar caches. Retorna None se o
+        histórico ainda não existir.
+        """
+
+    @abstractmethod
+    def get_signature_after_append(self, signature, version: int):
+        """
+        Retorna a assinatura do histórico após a adição do registro version, quando o histórico possuía a assinatura
+        signature imediatamente antes dela, ou seja, nenhum outro registro foi adicionado entre as duas. Caso contrário
+        retorna None.
+
+        :param signature: Assinatura obtida por get_signature antes da adição.
+
+        :param version: Versão retornada por append.
+        """
+
+    @abstractmethod
+    def get_version(self, index: int) -> int:
+        """
+        Retorna a versão do registro que está na posição informada.
+
+        :param index: Posição do registro no histórico, -1 representa o último registro.
+        """
+
+    @abstractmethod
+    def get(self, index: int) -> dict:
+        """
+        Retorna o registro que está na posição informada.
+
+        :param index: Posição do registro no histórico, -1 representa o último registro.
+        """
+
+    @abstractmethod
+    def find(self, estimator_name: str = None) -> list[dict]:
+        """
+        Retorna os registros do histórico, na ordem em que foram adicionados.
+
+        :param estimator_name: Nome da classe do estimador. Se for definido serão retornados apenas os registros desse
+        estimador.
+        """
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    Implementação de HistoryStore utilizando SQLite. Cada registro é uma linha da tabela, com o JSON do registro e o nome
+    do estimador indexado, dessa forma adicionar um registro não exige ler o histórico inteiro e a busca por posição ou
+    por estimador não percorre todos os registros.
+
+    Como os registros nunca são removidos, a versão do último registro é também a quantidade de registros.
+
+    Cada registro é adicionado dentro de uma transação que bloqueia a escrita no banco, por isso vários processos podem
+    salvar no mesmo histórico ao mesmo tempo: a versão é atribuída pelo próprio banco e os arquivos que dependem dela
+    são gravados antes da transação ser confirmada.
+
+    Se o banco ainda não existir e houver um arquivo JSON no formato antigo (uma lista de registros), os registros desse
+    arquivo são migrados para o banco no primeiro acesso. O arquivo JSON não é alterado.
+    """
+
+    def __init__(self, path: str, legacy_json_path: str = None, timeout: float = 60.0):
+        """
+        :param path: Caminho do arquivo do banco de dados.
+
+        :param legacy_json_path: Caminho do arquivo JSON no formato antigo que deve ser migrado.
+
+        :param timeout: Tempo máximo, em segundos, que um processo aguarda outro processo liberar o banco.
+        """
+        self.path = path
+        self.legacy_json_path = legacy_json_path
+        self.timeout = timeout
+
+    def append(self, record: dict, on_version_assigned: Callable[[int], None] = None) -> int:
+        """
+        Adiciona um registro ao histórico.
+
+        :param record: Dicionário com os dados do registro.
+
+        :param on_version_assigned: Função chamada com a versão atribuída, antes da transação ser confirmada. Se essa
+        função falhar o registro não é adicionado.
+
+        :return: Versão atribuída ao registro.
+        """
+        with self._transaction() as connection:
+            cursor = connection.execute('INSERT INTO records (estimator, data) VALUES (?, ?)',
+                                        (record.get('estimator'), json.dumps(record)))
+
+            if on_version_assigned is not None:
+                on_version_assigned(cursor.lastrowid)
+
+            return cursor.lastrowid
+
+    def count(self) -> int:
+        """
+        Retorna a quantidade de registros do histórico.
+        """
+        if not self._exists():
+            return 0
+
+        with closing(self._connect()) as connection:
+            return self._get_last_version(connection)
+
+    def get_signature(self):
+        """
+        A assinatura do banco é formada pelo inode do arquivo e pela versão do último registro, lida do próprio banco.
+        Como os registros nunca são alterados, cada transação confirmada altera a versão, mesmo que o tamanho e a data de
+        modificação do arquivo continuem iguais, e a recriação do arquivo altera o inode.
+        """
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+        with closing(self._connect()) as connection:
+            return inode, self._get_last_version(connection)
+
+    def get_signature_after_append(self, signature, version: int):
+        """
+        A versão é atribuída dentro da transação que bloqueia a escrita, então se ela for a versão seguinte à da
+        assinatura anterior nenhum outro processo adicionou registros entre as duas.
+        """
+        if signature is None:
+            return None
+
+        inode, last_version = signature
+
+        return (inode, version) if version == last_version + 1 else None
+
+    def get_version(self, index: int) -> int:
+        count = self.count()
+
+        if index < -1 or index >= count:
+            raise IndexError(f"Índice {index} fora dos limites. O histórico contém {count} entradas.")
+
+        return count if index == -1 else index + 1
+
+    def get(self, index: int) -> dict:
+        version = self.get_version(index)
+
+        with closing(self._connect()) as connection:
+            data = connection.execute('SELECT data FROM records WHERE version = ?', (version,)).fetchone()[0]
+
+        return json.loads(data)
+
+    def find(self, estimator_name: str = None) -> list[dict]:
+        if not self._exists():
+            return []
+
+        with closing(self._connect()) as connection:
+            if estimator_name is None:
+                rows = connection.execute('SELECT data FROM records ORDER BY version').fetchall()
+            else:
+                rows = connection.execute('SELECT data FROM records WHERE estimator = ? ORDER BY version',
+                                          (estimator_name,)).fetchall()
+
+        return [json.loads(data) for data, in rows]
+
+    @staticmethod
+    def _get_last_version(connection: sqlite3.Connection) -> int:
+        return connection.execute('SELECT COALESCE(MAX(version), 0) FROM records').fetchone()[0]
+
+    def _exists(self) -> bool:
+        return os.path.exists(self.path) or self._has_legacy_json()
+
+    def _has_legacy_json(self) -> bool:
+        return self.legacy_json_path is not None and os.path.exists(self.legacy_json_path)
+
+    @contextmanager
+    def _transaction(self):
+        """
+        Abre uma transação com bloqueio de escrita (BEGIN IMMEDIATE). Os outros processos que tentarem escrever aguardam
+        a transação terminar, até o limite de timeout.
+        """
+        with closing(self._connect(create=True)) as connection:
+            connection.execute('BEGIN IMMEDIATE')
+
+            try:
+                yield connection
+            except BaseException:
+                connection.execute('ROLLBACK')
+                raise
+
+            connection.execute('COMMIT')
+
+    def _connect(self, create: bool = False) -> sqlite3.Connection:
+        """
+        Abre uma conexão com o banco, criando a tabela e migrando o JSON antigo quando ela ainda não existir. A
+        existência da tabela é verificada, e não a do arquivo, pois outro processo pode ter criado o arquivo e ainda não
+        ter criado a tabela. Uma conexão é aberta a cada operação para que o objeto possa ser enviado para outros
+        processos.
+
+        A conexão é aberta em modo autocommit, as transações são controladas explicitamente.
+
+        :param create: Flag que indica se o diretório do banco deve ser criado caso não exista.
+        """
+        if create:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        connection = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        new_database = connection.execute("SELECT name FROM sqlite_master WHERE type = 'table' AND name = 'records'")\
+            .fetchone() is None
+
+        if new_database:
+            connection.execute('BEGIN IMMEDIATE')
+            connection.execute('CREATE TABLE IF NOT EXISTS records ('
+                               'version INTEGER PRIMARY KEY AUTOINCREMENT, '
+                               'estimator TEXT, '
+                               'data TEXT NOT NULL)')
+            connection.execute('CREATE INDEX IF NOT EXISTS records_estimator ON records (estimator)')
+
+            empty = connection.execute('SELECT COUNT(*) FROM records').fetchone()[0] == 0
+
+            if empty and self._has_legacy_json():
+                self._migrate_legacy_json(connection)
+
+            connection.execute('COMMIT')
+
+        return connection
+
+    def _migrate_legacy_json(self, connection: sqlite3.Connection):
+        with open(self.legacy_json_path, 'r') as file:
+            records = json.load(file)
+
+        connection.executemany('INSERT INTO records (estimator, data) VALUES (?, ?)',
+                               [(record.get('estimator'), json.dumps(record)) for record in records])
@@ -0,0 +1,163 @@
+import mmap
+import pickle
+import struct
+from abc import ABC, abstractmethod
+
+import joblib
+
+
+class ModelSerializer(ABC):
+    """
+    Classe responsável por gravar e recuperar os modelos salvos no histórico. Cada implementação define a extensão dos
+    arquivos que gera, dessa forma modelos gravados com formatos diferentes podem conviver no mesmo diretório.
+    """
+
+    extension: str = None
+
+    @abstractmethod
+    def dump(self, estimator, file_path: str):
+        """
+        Grava o modelo no arquivo.
+
+        :param estimator: Estimador que deseja salvar.
+
+        :param file_path: Caminho do arquivo que será gravado.
+        """
+
+    @abstractmethod
+    def load(self, file_path: str):
+        """
+        Recupera o modelo gravado no arquivo.
+
+        :param file_path: Caminho do arquivo que será lido.
+        """
+
+
+class PickleModelSerializer(ModelSerializer):
+    """
+    Implementação que grava os modelos com pickle, sem compressão. É o formato utilizado originalmente pelo histórico.
+    """
+
+    extension = 'pkl'
+
+    def dump(self, estimator, file_path: str):
+        with open(file_path, 'wb') as file:
+            pickle.dump(estimator, file, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def load(self, file_path: str):
+        with open(file_path, 'rb') as file:
+            return pickle.load(file)
+
+
+class JoblibModelSerializer(ModelSerializer):
+    """
+    Implementação que grava os modelos com joblib, que armazena os arrays do NumPy fora do fluxo do pickle.
+
+    Sem compressão, os arrays podem ser abertos mapeados em memória (mmap_mode), a leitura não copia os arrays grandes
+    (X_train_, alpha_ e L_ do GaussianProcessClassifier, por exemplo) e os processos que abrem o mesmo arquivo
+    compartilham as mesmas páginas de memória. Com compressão o arquivo fica menor, mas é necessário descomprimir tudo a
+    cada leitura e o mapeamento em memória não é possível.
+    """
+
+    extension = 'joblib'
+
+    def __init__(self, compress: int = 0, mmap_mode: str | None = 'r'):
+        """
+        :param compress: Nível de compressão de 0 a 9. Valores maiores geram arquivos menores e leituras mais lentas, 0
+        desativa a compressão.
+
+        :param mmap_mode: Modo de mapeamento em memória dos arrays na leitura ('r', 'r+', 'c') ou None para carregar
+        tudo em memória. Só pode ser utilizado sem compressão.
+        """
+        if compress and mmap_mode is not None:
+            raise ValueError('Arquivos comprimidos não podem ser mapeados em memória, defina compress=0 ou '
+                             'mmap_mode=None.')
+
+        self.compress = compress
+        self.mmap_mode = mmap_mode
+
+    def dump(self, estimator, file_path: str):
+        joblib.dump(estimator, file_path, compress=self.compress)
+
+    def load(self, file_path: str):
+        return joblib.load(file_path, mmap_mode=self.mmap_mode)
+
+
+class MemoryMappedModelSerializer(ModelSerializer):
+    """
+    Implementação que grava o modelo com pickle (protocolo 5) e mantém os buffers grandes, os arrays do NumPy dos
+    atributos treinados, fora do fluxo do pickle, alinhados no final do mesmo arquivo.
+
+    Na leitura o arquivo é mapeado em memória uma única vez e os arrays grandes são criados como visões somente leitura
+    desse mapeamento, sem cópia. Os processos que carregam o mesmo modelo compartilham as páginas de memória do arquivo.
+    Arrays pequenos, como os de cada árvore de um RandomForest, continuam dentro do pickle, evitando o custo de mapear
+    centenas de arrays separados que o joblib teria.
+    """
+
+    extension = 'mmpkl'
+
+    _MAGIC = b'MMPKL001'
+    _HEADER = struct.Struct('<8sQQ')
+    _BUFFER_ENTRY = struct.Struct('<QQ')
+    _ALIGNMENT = 64
+
+    def __init__(self, min_mapped_bytes: int = 64 * 1024):
+        """
+        :param min_mapped_bytes: Tamanho mínimo, em bytes, de um array para que ele seja mapeado em memória. Arrays
+        menores são gravados dentro do pickle.
+        """
+        self.min_mapped_bytes = min_mapped_bytes
+
+    def dump(self, estimator, file_path: str):
+        buffers = []
+
+        def buffer_callback(buffer: pickle.PickleBuffer) -> bool:
+            if buffer.raw().nbytes < self.min_mapped_bytes:
+                return True
+
+            buffers.append(buffer.raw())
+            return False
+
+        payload = pickle.dumps(estimator, protocol=5, buffer_callback=buffer_callback)
+
+        offset = self._align(self._HEADER.size + self._BUFFER_ENTRY.size * len(buffers) + len(payload))
+        entries = []
+
+        for buffer in buffers:
+            entries.append((offset, buffer.nbytes))
+            offset = self._align(offset + buffer.nbytes)
+
+        with open(file_path, 'wb') as file:
+            file.write(self._HEADER.pack(self._MAGIC, len(payload), len(buffers)))
+
+            for entry in entries:
+                file.write(self._BUFFER_ENTRY.pack(*entry))
+
+            file.write(payload)
+
+            for (buffer_offset, _), buffer in zip(entries, buffers):
+                file.write(b'\0' * (buffer_offset - file.tell()))
+                file.write(buffer)
+
+    def load(self, file_path: str):
+        with open(file_path, 'rb') as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(mapped)
+        magic, payload_size, buffers_count = self._HEADER.unpack_from(view)
+
+        if magic != self._MAGIC:
+            raise ValueError(f'O arquivo {file_path} não foi gravado pelo {type(self).__name__}.')
+
+        position = self._HEADER.size
+        buffers = []
+
+        for _ in range(buffers_count):
+            buffer_offset, size = self._BUFFER_ENTRY.unpack_from(view, position)
+            buffers.append(view[buffer_offset:buffer_offset + size])
+            position += self._BUFFER_ENTRY.size
+
+        return pickle.loads(view[position:position + payload_size], buffers=buffers)
+
+    def _align(self, offset: int) -> int:
+        return -(-offset // self._ALIGNMENT) * self._ALIGNMENT
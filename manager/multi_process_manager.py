@@ -1,14 +1,25 @@
+import contextlib
 from abc import ABC, abstractmethod
-from typing import TypeVar
+from typing import Any, TypeVar
 
+import time
+
+import joblib
 import numpy as np
 import pandas as pd
 from pandas import DataFrame
-from sklearn.model_selection import KFold, StratifiedKFold, RandomizedSearchCV
+from sklearn.model_selection import KFold, StratifiedKFold
+from sklearn.model_selection._search import BaseSearchCV
 from tabulate import tabulate
 
+from manager.feature_selection_cache import FeatureSelectionCache
+from manager.fit_cache import FitCache
 from manager.history_manager import CrossValidationHistoryManager, HistoryManager
 from manager.multi_process_manager_pipelines import ScikitLearnPipeline, Pipeline
+from manager.pipeline_scheduler import PipelineScheduler, SequentialPipelineScheduler
+from manager.run_checkpoint import RunCheckpoint
+from manager.shared_data_context import SharedDataContext
+from manager.tracing import Tracer
 from model_validator.result import ValidationResult
 
 P = TypeVar('P', bound=Pipeline)
@@ -17,7 +28,8 @@ H = TypeVar('H', bound=HistoryManager)
 
 class MultiProcessManager(ABC):
     """
-    Classe responsável por controlar a execução dos processos necessários para validação de N estimadores, um após o outro.
+    Classe responsável por controlar a execução dos processos necessários para validação de N estimadores. A forma como
+    os pipelines são executados, um após o outro ou em paralelo, é definida pelo PipelineScheduler.
 
     Com essa implementação é possível avaliar estimadores diferentes de uma biblioteca e ao fim do processo escolher o
     melhor entre eles para utilizar em alguma feature desejada.
@@ -33,7 +45,14 @@ class MultiProcessManager(ABC):
                  stratified: bool = False,
                  scoring: str = 'accuracy',
                  save_history: bool = True,
-                 history_index: int = None):
+                 history_index: int = None,
+                 scheduler: PipelineScheduler = None,
+                 shared_data: bool = True,
+                 fit_cache: FitCache = None,
+                 feature_selection_cache: FeatureSelectionCache = None,
+                 tracer: Tracer = None,
+                 checkpoint: RunCheckpoint = None,
+                 incremental: bool = False):
         """
         :param data_x: Valores de x (features).
 
@@ -57,6 +76,31 @@ class MultiProcessManager(ABC):
 
         :param history_index: Índice da lista de histórico que será usado para recuperar algum resultado específico e
         reutilizá-lo.
+
+        :param scheduler: Implementação de PipelineScheduler que define como os pipelines serão executados. Se não for
+        definido os pipelines serão executados um após o outro.
+
+        :param shared_data: Flag que indica se os dados e os folds da validação cruzada devem ser calculados uma única
+        vez e compartilhados, através de arrays mapeados em memória, entre todos os processos de todos os pipelines.
+
+        :param fit_cache: Implementação de FitCache consultada antes de cada fit dos estimadores dos pipelines, tanto na
+        seleção de features quanto na busca de parâmetros e na validação.
+
+        :param feature_selection_cache: Implementação de FeatureSelectionCache utilizada para reaproveitar as features
+        selecionadas entre os pipelines. Se não for definido será utilizado o cache do checkpoint ou, sem checkpoint,
+        um cache em memória.
+
+        :param tracer: Implementação de Tracer que registra spans de cada etapa dos pipelines e de cada fit e predict
+        dos estimadores, inclusive os executados em outros processos.
+
+        :param checkpoint: Implementação de RunCheckpoint que registra cada etapa, pipeline e fit concluídos. Uma
+        execução interrompida pode ser retomada criando o manager novamente com o mesmo checkpoint, apenas o trabalho
+        que não foi concluído é executado. Não é utilizado quando for definido o history_index.
+
+        :param incremental: Flag que indica se devem ser avaliados apenas os pipelines novos ou alterados. Cada
+        resultado é salvo no histórico com o fingerprint do pipeline (configuração do estimador, distribuições dos
+        parâmetros, searchers, validator, dados, folds, seed e scoring), os pipelines com um fingerprint já presente no
+        histórico são carregados dele. Não é utilizado quando for definido o history_index.
         """
 
         self.data_x = data_x
@@ -66,8 +110,23 @@ class MultiProcessManager(ABC):
         self.scoring = scoring
         self.save_history = save_history
         self.history_index = history_index
+        self.scheduler = scheduler if scheduler is not None else SequentialPipelineScheduler()
+        self.seed = seed
+        self.fit_cache = fit_cache
+        self.checkpoint = checkpoint if history_index is None else None
+        self.incremental = incremental and history_index is None
+        self.tracer = tracer
+
+        if feature_selection_cache is not None:
+            self.feature_selection_cache = feature_selection_cache
+        elif self.checkpoint is not None:
+            self.feature_selection_cache = self.checkpoint.feature_selection_cache
+        else:
+            self.feature_selection_cache = FeatureSelectionCache()
 
         self.results = []
+        self._deferred_history = None
+        self._restored_positions = set()
 
         np.random.seed(seed)
 
@@ -76,14 +135,26 @@ class MultiProcessManager(ABC):
         else:
             self.cv = KFold(n_splits=fold_splits, shuffle=True)
 
+        self.data_context = None
+
+        if shared_data:
+            self.data_context = SharedDataContext(data_x=data_x, data_y=data_y, cv=self.cv)
+            self.data_x = self.data_context.get_data_x()
+            self.data_y = self.data_context.y
+            self.cv = self.data_context.folds
+
+        self.data_fingerprint = joblib.hash((self.data_x, self.data_y))
+
     @abstractmethod
-    def _process_validation(self, pipeline: P, search_cv: RandomizedSearchCV) -> ValidationResult:
+    def _process_validation(self, pipeline: P, search_cv: BaseSearchCV, data_x) -> ValidationResult:
         """
         Função que realiza o processo de validação do estimador.
 
         :param pipeline: Pipeline definido que contem o Validator que será utilizado pela função.
 
-        :param search_cv: Instância treinada de RandomizedSearchCV que já encontrou os melhores parâmetros.
+        :param search_cv: Instância treinada da busca de parâmetros que já encontrou os melhores parâmetros.
+
+        :param data_x: Valores de x com as features selecionadas para o pipeline.
 
         :return: Retorna uma implementação de ValidationResult com os resultados da validação.
         """
@@ -101,71 +172,269 @@ class MultiProcessManager(ABC):
         Função utilizada para iniciar o processamento dos pipelines definidos.
         """
 
-        if type(self.pipelines) is list:
-            for pipeline in self.pipelines:
-                self._process_single_pipeline(pipeline)
-        else:
-            self._process_single_pipeline(self.pipelines)
+        pipelines = self.pipelines if type(self.pipelines) is list else [self.pipelines]
+        self._restored_positions = self._get_restored_positions(pipelines)
+
+        with self._trace('process_pipelines', pipelines=len(pipelines), scheduler=type(self.scheduler).__name__):
+            self.results.extend(self.scheduler.run(self, pipelines))
 
         df_results = self._show_results()
         self._on_after_process_pipelines(df_results)
 
-    def _process_single_pipeline(self, pipeline):
+    def _process_single_pipeline(self, pipeline, position: int = 0) -> dict[str, Any]:
         """
         Função que executa os processos necessários que estão presentes dentro de um Pipeline
 
+        Antes da execução, o random do np recebe a seed definida a partir da posição do pipeline, dessa forma o
+        resultado é o mesmo em qualquer PipelineScheduler e não depende de qual processo executou cada pipeline. No modo
+        incremental, um pipeline cujo fingerprint já esteja no histórico é carregado dele. Os demais recebem uma seed
+        derivada do fingerprint, dessa forma o resultado não depende de quais outros pipelines foram executados.
+
+        Quando o checkpoint estiver definido, um pipeline já concluído não é executado novamente e o gerador aleatório
+        é restaurado no início de cada etapa, dessa forma a etapa retomada sorteia os mesmos candidatos.
+
         :param pipeline: Pipeline que será executado.
+
+        :param position: Posição do pipeline na lista de pipelines, utilizada na seed e para identificá-lo no
+        checkpoint.
+
+        :return: Dicionário com as métricas de performance do pipeline.
+        """
+
+        fingerprint = self.get_pipeline_fingerprint(pipeline)
+
+        if self.incremental:
+            performance_metrics = self._load_incremental_result(pipeline)
+
+            if performance_metrics is not None:
+                return performance_metrics
+
+            np.random.seed(int(fingerprint[:8], 16))
+        else:
+            np.random.seed(self.seed + position)
+
+        checkpoint_key = None
+
+        if self.checkpoint is not None:
+            checkpoint_key = self._get_checkpoint_key(pipeline, position)
+            performance_metrics = self.checkpoint.load_pipeline_result(checkpoint_key)
+
+            if performance_metrics is not None:
+                return performance_metrics
+
+        estimator = self._wrap_estimator(pipeline.estimator)
+        estimator_name = type(estimator).__name__
+
+        with self._trace('pipeline', estimator=estimator_name):
+            with self._trace('feature_selection', estimator=estimator_name,
+                             searcher=type(pipeline.feature_searcher).__name__) as attributes:
+                self._restore_random_state(checkpoint_key, 'feature_selection')
+                data_x = self._process_feature_selection(pipeline, estimator)
+                attributes['features'] = data_x.shape[1]
+
+            with self._trace('params_search', estimator=estimator_name,
+                             searcher=type(pipeline.params_searcher).__name__):
+                self._restore_random_state(checkpoint_key, 'params_search')
+                search_cv = self._process_hiper_params_search(pipeline, estimator, data_x)
+
+            with self._trace('validation', estimator=estimator_name) as attributes:
+                self._restore_random_state(checkpoint_key, 'validation')
+                validation_result = self._process_validation(pipeline, search_cv, data_x)
+                attributes['mean'] = getattr(validation_result, 'mean', None)
+
+            with self._trace('save_history', estimator=estimator_name):
+                self._save_data_in_history(pipeline, validation_result, data_x, fingerprint)
+
+        performance_metrics = self._get_performance_metrics(pipeline, validation_result)
+
+        if checkpoint_key is not None:
+            self.checkpoint.save_pipeline_result(checkpoint_key, performance_metrics)
+
+        return performance_metrics
+
+    def get_pipeline_fingerprint(self, pipeline) -> str:
+        """
+        Calcula o fingerprint do pipeline, um hash da configuração do pipeline e das definições da execução que
+        influenciam no resultado: dados, folds, seed e scoring.
+
+        :param pipeline: Pipeline que deseja identificar.
+        """
+        return joblib.hash((pipeline.get_config(), self.data_fingerprint, self.cv, self.seed, self.scoring))
+
+    def _get_checkpoint_key(self, pipeline: P, position: int) -> str:
+        return self.checkpoint.get_pipeline_key(pipeline=pipeline,
+                                                position=position,
+                                                data_fingerprint=self.data_fingerprint,
+                                                scoring=self.scoring,
+                                                seed=self.seed)
+
+    def _get_restored_positions(self, pipelines: list[P]) -> set[int]:
+        """
+        Retorna as posições dos pipelines que já estão concluídos no checkpoint antes do início da execução, ou seja, que
+        serão restaurados dele.
+
+        :param pipelines: Pipelines que serão executados.
+        """
+        if self.checkpoint is None:
+            return set()
+
+        return {
+            position for position, pipeline in enumerate(pipelines)
+            if self.checkpoint.load_pipeline_result(self._get_checkpoint_key(pipeline, position)) is not None
+        }
+
+    def _load_incremental_result(self, pipeline: P) -> dict[str, Any] | None:
+        """
+        Função que, no modo incremental, recupera do histórico as métricas de performance do pipeline quando o seu
+        fingerprint já foi avaliado.
+
+        :param pipeline: Pipeline que seria executado.
+
+        :return: Dicionário com as métricas de performance ou None se o pipeline precisar ser executado.
+        """
+        if not self.incremental:
+            return None
+
+        history_index = pipeline.history_manager.get_index_by_fingerprint(self.get_pipeline_fingerprint(pipeline))
+
+        if history_index is None:
+            return None
+
+        return self._load_performance_metrics_from_history(pipeline, history_index)
+
+    def _load_performance_metrics_from_history(self, pipeline: P, index: int) -> dict[str, Any]:
+        """
+        Função para montar as métricas de performance do pipeline a partir de um registro do histórico, sem executar
+        nenhum processo.
+
+        :param pipeline: Pipeline que seria executado.
+
+        :param index: Índice do registro no histórico do pipeline.
+
+        :return: Dicionário com as informações do pipeline e as métricas de performance.
+        """
+        result = pipeline.history_manager.load_validation_result_from_history(index)
+        performance_metrics = result.append_data(pipeline.get_dict_pipeline_data())
+        self._load_processes_time_from_history(performance_metrics, pipeline, index)
+
+        return performance_metrics
+
+    def _wrap_estimator(self, estimator):
+        """
+        Retorna a cópia do estimador utilizada na execução do pipeline, com o FitCache, o RunCheckpoint e o Tracer
+        quando estiverem definidos. O estimador do pipeline não é alterado, dessa forma as próximas execuções e o
+        fingerprint sempre utilizam o estimador original.
+
+        :param estimator: Estimador definido no pipeline.
+        """
+        if self.fit_cache is not None:
+            estimator = self.fit_cache.wrap(estimator)
+
+        if self.checkpoint is not None:
+            estimator = self.checkpoint.wrap(estimator)
+
+        if self.tracer is not None:
+            estimator = self.tracer.wrap(estimator)
+
+        return estimator
+
+    def _restore_random_state(self, checkpoint_key: str | None, stage: str):
         """
+        Restaura o estado do gerador aleatório registrado no checkpoint no início da etapa, quando o checkpoint estiver
+        definido.
+
+        :param checkpoint_key: Chave do pipeline no checkpoint, None quando não houver checkpoint.
 
-        self._process_feature_selection(pipeline)
+        :param stage: Nome da etapa do pipeline.
+        """
+        if checkpoint_key is not None:
+            self.checkpoint.restore_random_state(checkpoint_key, stage)
 
-        search_cv = self._process_hiper_params_search(pipeline)
-        validation_result = self._process_validation(pipeline, search_cv)
+    def _trace(self, name: str, **attributes):
+        """
+        Retorna o span da etapa quando o tracer estiver definido, caso contrário um contexto que apenas retorna os
+        atributos.
+
+        :param name: Nome da etapa.
+
+        :param attributes: Atributos adicionais do span.
+        """
+        if self.tracer is None:
+            return contextlib.nullcontext(attributes)
 
-        self._save_data_in_history(pipeline, validation_result)
-        self._append_new_result(pipeline, validation_result)
+        return self.tracer.span(name, 'stage', **attributes)
 
-    def _process_feature_selection(self, pipeline: P):
+    def _process_feature_selection(self, pipeline: P, estimator) -> DataFrame:
         """
-        Função para selecionar as melhores features que serão colocadas no data_x utilizando a implementação definida
-        no pipeline. Isso vai eliminar dados que serão considerados como irrelevantes para o estimador.
+        Função para selecionar as melhores features do pipeline utilizando a implementação definida nele. Isso vai
+        eliminar dados que serão considerados como irrelevantes para o estimador.
+
+        O data_x original nunca é alterado, cada pipeline recebe a sua própria visão com as colunas selecionadas. A
+        seleção é consultada no FeatureSelectionCache antes de ser executada, quando for reaproveitada os tempos do
+        searcher são definidos como o momento atual.
 
         Esse processo só deve ser executado quando não desejar reutilizar dados históricos, ou seja, não pode ser passado
-        um valor para history_index. Se estamos reutilizando valores do histórico não faz diferença sobrescrever data_x
-        pois nenhum processamento será executado, apenas carregamos os dados do JSON.
+        um valor para history_index. Se estamos reutilizando valores do histórico nenhum processamento será executado,
+        apenas carregamos os dados do histórico.
 
         :param pipeline: Pipeline que será executado.
+
+        :param estimator: Cópia do estimador do pipeline retornada por _wrap_estimator.
+
+        :return: Valores de x contendo apenas as features selecionadas.
         """
 
-        if self.history_index is None:
-            features =  pipeline.feature_searcher.select_features(
-                estimator=pipeline.estimator,
+        if self.history_index is not None:
+            return self.data_x
+
+        key = self.feature_selection_cache.get_key(feature_searcher=pipeline.feature_searcher,
+                                                   estimator=estimator,
+                                                   data_fingerprint=self.data_fingerprint,
+                                                   cv=self.cv,
+                                                   scoring=self.scoring)
+        columns = self.feature_selection_cache.load(key)
+
+        if columns is None:
+            features = pipeline.feature_searcher.select_features(
+                estimator=estimator,
                 data_x=self.data_x,
                 data_y=self.data_y,
                 scoring=self.scoring,
                 cv=self.cv
             )
 
-            self.data_x = features
-            self.test_data_x = features
+            columns = features.columns.tolist()
+            self.feature_selection_cache.save(key, columns)
+        else:
+            pipeline.feature_searcher.start_search_features_time = time.time()
+            pipeline.feature_searcher.end_search_features_time = pipeline.feature_searcher.start_search_features_time
+
+        if self.data_context is not None:
+            return self.data_context.get_data_x(columns)
+
+        return self.data_x[columns]
 
-    def _process_hiper_params_search(self, pipeline: P) -> RandomizedSearchCV | None:
+    def _process_hiper_params_search(self, pipeline: P, estimator, data_x) -> BaseSearchCV | None:
         """
-        Função para buscar os melhores parâmetros do estimador utilizando RandomizedSearchCV definido no pipeline.
+        Função para buscar os melhores parâmetros do estimador utilizando o HipperParamsSearcher definido no pipeline.
 
         Se for definido um history_index não será feita a busca pois os dados serão recuperados do JSON.
 
         :param pipeline: Pipeline que será executado.
 
-        :return: Retorna uma instância de RandomizedSearchCV treinada que já contém o melhor estimador. Pode ser None
+        :param estimator: Cópia do estimador do pipeline retornada por _wrap_estimator.
+
+        :param data_x: Valores de x com as features selecionadas para o pipeline.
+
+        :return: Retorna uma instância da busca de parâmetros treinada que já contém o melhor estimador. Pode ser None
         se for definido o history_index.
         """
 
         if self.history_index is None:
             return pipeline.params_searcher.search_hipper_parameters(
-                estimator=pipeline.estimator,
+                estimator=estimator,
                 params=pipeline.params,
-                data_x=self.data_x,
+                data_x=data_x,
                 data_y=self.data_y,
                 scoring=self.scoring,
                 cv=self.cv
@@ -173,25 +442,40 @@ class MultiProcessManager(ABC):
         else:
             return None
 
-    def _save_data_in_history(self, pipeline: P, result: ValidationResult):
+    def _save_data_in_history(self, pipeline: P, result: ValidationResult, data_x, fingerprint: str = None):
         """
         Função para salvar os dados no histórico, utilizando o manager definido no pipeline. Só vai salvar no histórico
         se não for fornecido history_index, isso vai evitar salvar dados repetidos.
 
+        Quando o pipeline é executado em outra máquina, pelo BrokerPipelineScheduler, os dados não são salvos no
+        histórico local, eles são guardados em _deferred_history e salvos pela máquina que iniciou a execução.
+
         :param pipeline: Pipeline que será executado.
 
         :param result: Resultado da função _process_validation.
+
+        :param data_x: Valores de x com as features selecionadas para o pipeline.
+
+        :param fingerprint: Fingerprint do pipeline, salvo no registro para o modo incremental.
         """
 
         if self.save_history and self.history_index is None:
             feature_selection_time, search_time, validation_time = self._get_execution_times(pipeline)
 
-            pipeline.history_manager.save_result(result,
-                                                 feature_selection_time=self._format_time(feature_selection_time),
-                                                 search_time=self._format_time(search_time),
-                                                 validation_time=self._format_time(validation_time),
-                                                 scoring=self.scoring,
-                                                 features=self.data_x.columns.tolist())
+            history_data = {
+                'classifier_result': result,
+                'feature_selection_time': self._format_time(feature_selection_time),
+                'search_time': self._format_time(search_time),
+                'validation_time': self._format_time(validation_time),
+                'scoring': self.scoring,
+                'features': data_x.columns.tolist(),
+                'fingerprint': fingerprint
+            }
+
+            if self._deferred_history is None:
+                pipeline.history_manager.save_result(**history_data)
+            else:
+                self._deferred_history.append(history_data)
 
     def _get_execution_times(self, pipeline):
         feature_selection_time = pipeline.feature_searcher.end_search_features_time - pipeline.feature_searcher.start_search_features_time
@@ -199,9 +483,9 @@ class MultiProcessManager(ABC):
         validation_time = pipeline.validator.end_best_model_validation - pipeline.validator.start_best_model_validation
         return feature_selection_time, search_time, validation_time
 
-    def _append_new_result(self, pipeline: P, result: ValidationResult):
+    def _get_performance_metrics(self, pipeline: P, result: ValidationResult) -> dict[str, Any]:
         """
-        Função para adicionar um resultado da validação a uma lista interna que, ao fim de todos os processos, é exibida
+        Função para montar o dicionário com o resultado da validação que, ao fim de todos os processos, é exibido
         em um DataFrame para que possam ser visualizados os resultados de todos os estimadores avaliados.
 
         Se for passado um history_index ao invés de refazer os cálculo carregamos isso do histórico.
@@ -209,6 +493,8 @@ class MultiProcessManager(ABC):
         :param pipeline: Pipeline que será executado.
 
         :param result: Resultado da função _process_validation.
+
+        :return: Dicionário com as informações do pipeline e as métricas de performance.
         """
 
         pipeline_infos = pipeline.get_dict_pipeline_data()
@@ -217,9 +503,9 @@ class MultiProcessManager(ABC):
         if self.history_index is None:
             self._calculate_processes_time(performance_metrics, pipeline)
         else:
-            self._load_processes_time_from_history(performance_metrics, pipeline)
+            self._load_processes_time_from_history(performance_metrics, pipeline, self.history_index)
 
-        self.results.append(performance_metrics)
+        return performance_metrics
 
     def _calculate_processes_time(self, performance_metrics, pipeline: P):
         """
@@ -235,7 +521,7 @@ class MultiProcessManager(ABC):
         performance_metrics['search_time'] = self._format_time(search_time)
         performance_metrics['validation_time'] = self._format_time(validation_time)
 
-    def _load_processes_time_from_history(self, performance_metrics, pipeline: P):
+    def _load_processes_time_from_history(self, performance_metrics, pipeline: P, index: int):
         """
         Função para realizar o carregamento de informações de performance do histórico, as quais não estão presentes
         na implementação de ValidatorResult.
@@ -243,8 +529,10 @@ class MultiProcessManager(ABC):
         :param performance_metrics: Dicionário com algumas métricas já adicionadas
 
         :param pipeline: Pipeline que será executado.
+
+        :param index: Índice do registro no histórico do pipeline.
         """
-        history_dict = pipeline.history_manager.get_dictionary_from_json(self.history_index)
+        history_dict = pipeline.history_manager.get_dictionary_from_json(index)
 
         performance_metrics['feature_selection_time'] = history_dict['feature_selection_time']
         performance_metrics['search_time'] = history_dict['search_time']
@@ -265,6 +553,26 @@ class MultiProcessManager(ABC):
 
         return df_results
 
+    def __getstate__(self):
+        """
+        Quando os dados são compartilhados, apenas as colunas de data_x são serializadas, o processo que receber o
+        manager recupera os dados através dos arquivos mapeados em memória do SharedDataContext.
+        """
+        state = self.__dict__.copy()
+
+        if self.data_context is not None:
+            state['data_x'] = self.data_x.columns.tolist()
+            state['data_y'] = None
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if self.data_context is not None:
+            self.data_x = self.data_context.get_data_x(state['data_x'])
+            self.data_y = self.data_context.y
+
     @staticmethod
     def _format_time(seconds):
         """
@@ -292,19 +600,41 @@ class ScikitLearnMultiProcessManager(MultiProcessManager):
                  stratified: bool = False,
                  scoring: str = 'accuracy',
                  save_history: bool = True,
-                 history_index: int = None):
+                 history_index: int = None,
+                 scheduler: PipelineScheduler = None,
+                 shared_data: bool = True,
+                 fit_cache: FitCache = None,
+                 feature_selection_cache: FeatureSelectionCache = None,
+                 tracer: Tracer = None,
+                 checkpoint: RunCheckpoint = None,
+                 incremental: bool = False):
         super().__init__(data_x, data_y, seed, fold_splits, pipelines, history_manager, stratified, scoring,
-                         save_history, history_index)
+                         save_history, history_index, scheduler, shared_data, fit_cache, feature_selection_cache,
+                         tracer, checkpoint, incremental)
 
-    def _process_validation(self, pipeline: ScikitLearnPipeline, search_cv: RandomizedSearchCV) -> ValidationResult:
+    def _process_validation(self, pipeline: ScikitLearnPipeline, search_cv: BaseSearchCV, data_x) -> ValidationResult:
         if search_cv is None:
             return pipeline.history_manager.load_validation_result_from_history(self.history_index)
-        else:
-            return pipeline.validator.validate(searcher=search_cv,
-                                               data_x=self.data_x,
-                                               data_y=self.data_y,
-                                               scoring=self.scoring,
-                                               cv=self.cv)
+
+        result = pipeline.validator.validate(searcher=search_cv,
+                                             data_x=data_x,
+                                             data_y=self.data_y,
+                                             scoring=self.scoring,
+                                             cv=self.cv)
+
+        if pipeline.preprocessor is not None:
+            result.preprocessor = pipeline.preprocessor.with_output_features(data_x.columns.tolist())
+
+        if self.tracer is not None:
+            result.estimator = Tracer.unwrap(result.estimator)
+
+        if self.checkpoint is not None:
+            result.estimator = RunCheckpoint.unwrap(result.estimator)
+
+        if self.fit_cache is not None:
+            result.estimator = FitCache.unwrap(result.estimator)
+
+        return result
 
     def _on_after_process_pipelines(self, df_results: DataFrame):
         self.__save_best_estimator(df_results)
@@ -313,21 +643,39 @@ class ScikitLearnMultiProcessManager(MultiProcessManager):
         """
         Função para salvar o melhor estimador entre os melhores encontrados em cada pipeline. Isso pode ser salvo em um
         arquivo separado pois utiliza o history_manager do ProcessManager e não do pipeline.
+
+        No modo incremental o resultado do melhor pipeline é localizado pelo fingerprint, já que ele pode ter sido
+        carregado de um registro antigo, e nada é salvo se o último melhor estimador salvo for o mesmo. O mesmo vale
+        para uma execução retomada em que o melhor pipeline foi restaurado do checkpoint.
         """
 
         if self.save_history and self.history_index is None:
             best = df_results.head(1)
 
-            best_pipeline = [pipe for pipe in self.pipelines if self.__is_best_pipeline(best, pipe)][0]
-            validation_result = best_pipeline.history_manager.load_validation_result_from_history()
-            dict_history = best_pipeline.history_manager.get_dictionary_from_json(index=-1)
+            pipelines = self.pipelines if type(self.pipelines) is list else [self.pipelines]
+            position, best_pipeline = [(position, pipe) for position, pipe in enumerate(pipelines)
+                                       if self.__is_best_pipeline(best, pipe)][0]
+            fingerprint = self.get_pipeline_fingerprint(best_pipeline)
+            index = -1
+
+            if self.incremental or position in self._restored_positions:
+                if (self.history_manager.has_history() and
+                        self.history_manager.get_dictionary_from_json(-1).get('fingerprint') == fingerprint):
+                    return
+
+            if self.incremental:
+                index = best_pipeline.history_manager.get_index_by_fingerprint(fingerprint)
+
+            validation_result = best_pipeline.history_manager.load_validation_result_from_history(index)
+            dict_history = best_pipeline.history_manager.get_dictionary_from_json(index=index)
 
             self.history_manager.save_result(classifier_result=validation_result,
                                              feature_selection_time=best['feature_selection_time'].values[0],
                                              search_time=best['search_time'].values[0],
                                              validation_time=best['validation_time'].values[0],
                                              scoring=best['scoring'].values[0],
-                                             features=dict_history['features'].split(','))
+                                             features=dict_history['features'].split(','),
+                                             fingerprint=fingerprint)
 
 
     def __is_best_pipeline(self, df: DataFrame, pipe: ScikitLearnPipeline):
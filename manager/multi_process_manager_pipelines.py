@@ -3,7 +3,7 @@ from typing import Any, TypeVar
 
 from regression_vars_search.features_searcher import FeaturesSearcher
 
-from hiper_params_search.random_searcher import RandomHipperParamsSearcher
+from hiper_params_search.params_searcher import HipperParamsSearcher
 from manager.history_manager import HistoryManager, CrossValidationHistoryManager
 from model_validator.validator import ScikitLearnBaseValidator
 
@@ -18,8 +18,9 @@ class Pipeline(ABC):
                  estimator,
                  params,
                  feature_searcher: FeaturesSearcher,
-                 params_searcher: RandomHipperParamsSearcher,
-                 history_manager: H):
+                 params_searcher: HipperParamsSearcher,
+                 history_manager: H,
+                 preprocessor=None):
         """
         :param estimator: Estimador que deseja validar.
 
@@ -30,6 +31,10 @@ class Pipeline(ABC):
         :param params_searcher: Implementação que deseja utilizar para buscar o melhor estimador.
 
         :param history_manager: Implementação que deseja utilizar para manipular o histórico.
+
+        :param preprocessor: Preprocessor já treinado que gerou os dados de x a partir dos dados brutos, por exemplo, o
+        TabularPreprocessor. Ele é salvo no histórico junto com o modelo, restrito às features selecionadas através da
+        função with_output_features.
         """
 
         self.estimator = estimator
@@ -37,6 +42,16 @@ class Pipeline(ABC):
         self.feature_searcher = feature_searcher
         self.params_searcher = params_searcher
         self.history_manager = history_manager
+        self.preprocessor = preprocessor
+
+    def set_n_jobs(self, n_jobs: int):
+        """
+        Define o n_jobs de todas as implementações do pipeline que realizam processamento paralelo.
+
+        :param n_jobs: Número de threads usadas no processamento.
+        """
+        self.feature_searcher.n_jobs = n_jobs
+        self.params_searcher.n_jobs = n_jobs
 
     @abstractmethod
     def get_dict_pipeline_data(self):
@@ -44,6 +59,19 @@ class Pipeline(ABC):
         Retorna um dicionário contendo os dados do pipeline.
         """
 
+    def get_config(self) -> dict[str, Any]:
+        """
+        Retorna a configuração que influencia no resultado do pipeline: a classe e os parâmetros do estimador, as
+        distribuições dos parâmetros buscados e a configuração dos searchers. Utilizada para identificar se um pipeline
+        já foi avaliado com a mesma configuração.
+        """
+        return {
+            'estimator': (type(self.estimator).__name__, self.estimator.get_params(deep=False)),
+            'params': _describe_params(self.params),
+            'feature_searcher': (type(self.feature_searcher).__qualname__, self.feature_searcher.get_config()),
+            'params_searcher': (type(self.params_searcher).__qualname__, self.params_searcher.get_config())
+        }
+
 
 class ScikitLearnPipeline(Pipeline):
     """
@@ -54,13 +82,24 @@ class ScikitLearnPipeline(Pipeline):
                  estimator,
                  params,
                  feature_searcher: FeaturesSearcher,
-                 params_searcher: RandomHipperParamsSearcher,
+                 params_searcher: HipperParamsSearcher,
                  history_manager: HistoryManager,
-                 validator: ScikitLearnBaseValidator):
-        super().__init__(estimator, params, feature_searcher, params_searcher, history_manager)
+                 validator: ScikitLearnBaseValidator,
+                 preprocessor=None):
+        super().__init__(estimator, params, feature_searcher, params_searcher, history_manager, preprocessor)
 
         self.validator = validator
 
+    def set_n_jobs(self, n_jobs: int):
+        super().set_n_jobs(n_jobs)
+        self.validator.n_jobs = n_jobs
+
+    def get_config(self) -> dict[str, Any]:
+        config = super().get_config()
+        config['validator'] = (type(self.validator).__qualname__, self.validator.get_config())
+
+        return config
+
     def get_dict_pipeline_data(self) -> dict[str, Any]:
         return {
             'estimator': type(self.estimator).__name__,
@@ -69,3 +108,20 @@ class ScikitLearnPipeline(Pipeline):
             'validator': type(self.validator).__name__,
             'history_manager': type(self.history_manager).__name__
         }
+
+
+def _describe_params(params):
+    """
+    Descreve os parâmetros buscados de forma estável. As distribuições do scipy guardam o gerador aleatório global, que
+    muda a cada sorteio, por isso são descritas pelo nome e pelos argumentos.
+    """
+    if isinstance(params, dict):
+        return {name: _describe_params(value) for name, value in params.items()}
+
+    if isinstance(params, (list, tuple)):
+        return type(params)(_describe_params(value) for value in params)
+
+    if hasattr(params, 'dist') and hasattr(params, 'args'):
+        return params.dist.name, params.args, params.kwds
+
+    return params
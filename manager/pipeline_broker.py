@@ -0,0 +1,321 @@
+import argparse
+import pickle
+import queue
+import socket
+import threading
+import time
+import traceback
+from abc import ABC, abstractmethod
+from multiprocessing.managers import BaseManager
+from typing import Any
+
+
+
+class PipelineBroker(ABC):
+    """
+    Classe base das filas utilizadas pelo BrokerPipelineScheduler para distribuir pipelines entre os PipelineWorker.
+
+    Existem duas filas: a de tarefas, onde o scheduler coloca os pipelines serializados, e a de mensagens, onde os
+    workers informam o início de cada tarefa, os heartbeats enquanto ela é executada e o resultado ou a falha. O
+    conteúdo das tarefas e dos resultados é sempre enviado em bytes, dessa forma qualquer transporte pode ser utilizado.
+    """
+
+    @abstractmethod
+    def put_task(self, task_id: str, payload: bytes):
+        """
+        Adiciona uma tarefa na fila de tarefas.
+
+        :param task_id: Identificação da tentativa de execução do pipeline.
+
+        :param payload: Manager, pipeline e posição serializados. É None nas tarefas vazias (probes), que o worker
+        apenas registra como a última tarefa retirada da fila.
+        """
+
+    @abstractmethod
+    def get_task(self, timeout: float) -> tuple[str, bytes] | None:
+        """
+        Retira a próxima tarefa da fila, aguardando até timeout segundos. Retorna None se não houver tarefas.
+        """
+
+    @abstractmethod
+    def put_message(self, task_id: str | None, kind: str, content: Any = None):
+        """
+        Adiciona uma mensagem sobre uma tarefa na fila de mensagens.
+
+        :param task_id: Identificação da tentativa de execução do pipeline. Nas mensagens idle é a última tarefa que o
+        worker retirou da fila, ou None se ele ainda não retirou nenhuma.
+
+        :param kind: Tipo da mensagem: started, heartbeat, done, failed ou idle, enviada periodicamente pelos workers
+        que encontram a fila de tarefas vazia.
+
+        :param content: Nome do worker para started, heartbeat e idle, o resultado serializado para done e o traceback
+        para failed.
+        """
+
+    @abstractmethod
+    def get_message(self, timeout: float) -> tuple[str, str, Any] | None:
+        """
+        Retira a próxima mensagem da fila, aguardando até timeout segundos. Retorna None se não houver mensagens.
+        """
+
+
+class QueuePipelineBroker(PipelineBroker):
+    """
+    Implementação de PipelineBroker sobre dois objetos com a interface de queue.Queue.
+    """
+
+    def __init__(self, tasks, messages):
+        """
+        :param tasks: Fila de tarefas.
+
+        :param messages: Fila de mensagens.
+        """
+        self.tasks = tasks
+        self.messages = messages
+
+    def put_task(self, task_id: str, payload: bytes):
+        self.tasks.put((task_id, payload))
+
+    def get_task(self, timeout: float) -> tuple[str, bytes] | None:
+        try:
+            return self.tasks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def put_message(self, task_id: str | None, kind: str, content: Any = None):
+        self.messages.put((task_id, kind, content))
+
+    def get_message(self, timeout: float) -> tuple[str, str, Any] | None:
+        try:
+            return self.messages.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class InProcessBroker(QueuePipelineBroker):
+    """
+    Implementação com filas em memória, os workers devem ser executados em threads do mesmo processo através de
+    PipelineWorker.start. Utilizada para testar a execução distribuída sem abrir conexões. Como as threads compartilham
+    o random do np, os resultados só são reproduzíveis com um único worker.
+    """
+
+    def __init__(self):
+        super().__init__(queue.Queue(), queue.Queue())
+
+
+class TCPQueueBroker(QueuePipelineBroker):
+    """
+    Implementação com filas mantidas por um servidor do multiprocessing.managers, acessado por TCP. A máquina que inicia
+    a execução cria o broker com serve=True, o que inicia o servidor em um processo separado, e os workers de qualquer
+    máquina se conectam ao mesmo endereço com a mesma authkey.
+
+    Os dados são enviados pela rede com pickle, por isso o servidor deve ser acessível apenas por máquinas confiáveis.
+    """
+
+    def __init__(self, address: tuple[str, int], authkey: bytes, serve: bool = False):
+        """
+        :param address: Host e porta do servidor. Para aceitar conexões de outras máquinas o servidor deve utilizar o
+        host 0.0.0.0 ou o endereço da rede.
+
+        :param authkey: Chave compartilhada entre o servidor e os workers.
+
+        :param serve: Flag que indica se o servidor deve ser iniciado, caso contrário é feita a conexão com um servidor
+        existente.
+        """
+        self.address = address
+        self.serve = serve
+
+        self._manager = _QueueManager(address=address, authkey=authkey)
+
+        if serve:
+            self._manager.start()
+        else:
+            self._manager.connect()
+
+        super().__init__(self._manager.tasks(), self._manager.messages())
+
+    def shutdown(self):
+        """
+        Encerra o servidor, quando ele foi iniciado por esse objeto.
+        """
+        if self.serve:
+            self._manager.shutdown()
+
+
+class PipelineWorker:
+    """
+    Processo que executa os pipelines distribuídos pelo BrokerPipelineScheduler. Cada tarefa é executada da mesma forma
+    que no ProcessPoolPipelineScheduler, com a seed definida a partir da posição do pipeline, mas os dados do histórico
+    são devolvidos junto com o resultado e salvos pela máquina que iniciou a execução.
+
+    Enquanto uma tarefa é executada, um heartbeat é enviado periodicamente, dessa forma o scheduler consegue diferenciar
+    um pipeline demorado de um worker que parou de responder. Com a fila vazia, o worker informa no mesmo intervalo que
+    está ocioso e qual foi a última tarefa que ele retirou da fila, o que permite ao scheduler identificar tarefas
+    retiradas da fila por um worker que foi encerrado antes de iniciá-las.
+    """
+
+    def __init__(self,
+                 broker: PipelineBroker,
+                 name: str = None,
+                 n_jobs: int = None,
+                 heartbeat_interval: float = 5.0,
+                 poll_interval: float = 1.0):
+        """
+        :param broker: Implementação de PipelineBroker de onde as tarefas são retiradas.
+
+        :param name: Nome do worker, enviado nas mensagens. Se não for definido é utilizado o nome da máquina.
+
+        :param n_jobs: Número de threads usadas no processamento de cada pipeline. Se não for definido é mantido o
+        valor dos pipelines.
+
+        :param heartbeat_interval: Intervalo, em segundos, entre os heartbeats de uma tarefa e entre as mensagens de
+        worker ocioso.
+
+        :param poll_interval: Tempo máximo, em segundos, de espera por uma tarefa antes de verificar se o worker deve
+        ser encerrado.
+        """
+        self.broker = broker
+        self.name = name if name is not None else socket.gethostname()
+        self.n_jobs = n_jobs
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+        self._stop_event = threading.Event()
+
+    def run(self, max_tasks: int = None, idle_timeout: float = None) -> int:
+        """
+        Executa as tarefas da fila até que stop seja chamado.
+
+        :param max_tasks: Quantidade máxima de tarefas executadas antes de encerrar.
+
+        :param idle_timeout: Tempo, em segundos, sem receber tarefas após o qual o worker é encerrado.
+
+        :return: Quantidade de tarefas executadas.
+        """
+        processed_tasks = 0
+        last_task_time = time.monotonic()
+        last_idle_time = None
+        last_task_id = None
+
+        while not self._stop_event.is_set() and (max_tasks is None or processed_tasks < max_tasks):
+            task = self.broker.get_task(timeout=self.poll_interval)
+
+            if task is None:
+                if idle_timeout is not None and time.monotonic() - last_task_time > idle_timeout:
+                    break
+
+                if last_idle_time is None or time.monotonic() - last_idle_time > self.heartbeat_interval:
+                    self.broker.put_message(last_task_id, 'idle', self.name)
+                    last_idle_time = time.monotonic()
+
+                continue
+
+            task_id, payload = task
+            last_task_id = task_id
+
+            if payload is None:
+                last_idle_time = None
+                continue
+
+            self._process_task(task_id, payload)
+
+            processed_tasks += 1
+            last_task_time = time.monotonic()
+
+        return processed_tasks
+
+    def start(self, max_tasks: int = None, idle_timeout: float = None) -> threading.Thread:
+        """
+        Executa run em uma thread, utilizado junto com o InProcessBroker.
+        """
+        thread = threading.Thread(target=self.run, args=(max_tasks, idle_timeout), name=self.name, daemon=True)
+        thread.start()
+
+        return thread
+
+    def stop(self):
+        """
+        Solicita o encerramento do worker, a tarefa em execução é finalizada antes.
+        """
+        self._stop_event.set()
+
+    def _process_task(self, task_id: str, payload: bytes):
+        self.broker.put_message(task_id, 'started', self.name)
+
+        heartbeat_stop = threading.Event()
+        heartbeat = threading.Thread(target=self._send_heartbeats, args=(task_id, heartbeat_stop), daemon=True)
+        heartbeat.start()
+
+        try:
+            result = self._execute(payload)
+        except Exception:
+            self.broker.put_message(task_id, 'failed', f'{self.name}: {traceback.format_exc()}')
+        else:
+            self.broker.put_message(task_id, 'done', result)
+        finally:
+            heartbeat_stop.set()
+            heartbeat.join()
+
+    def _execute(self, payload: bytes) -> bytes:
+        """
+        Executa o pipeline e retorna as métricas de performance e os dados do histórico serializados.
+        """
+        manager, pipeline, position = pickle.loads(payload)
+
+        if self.n_jobs is not None:
+            pipeline.set_n_jobs(self.n_jobs)
+
+        manager._deferred_history = []
+        performance_metrics = manager._process_single_pipeline(pipeline, position)
+
+        return pickle.dumps((performance_metrics, manager._deferred_history), protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _send_heartbeats(self, task_id: str, stop_event: threading.Event):
+        while not stop_event.wait(self.heartbeat_interval):
+            self.broker.put_message(task_id, 'heartbeat', self.name)
+
+
+class _QueueManager(BaseManager):
+    pass
+
+
+_queues = {}
+
+
+def _get_queue(name: str):
+    if name not in _queues:
+        _queues[name] = queue.Queue()
+
+    return _queues[name]
+
+
+def _get_tasks_queue():
+    return _get_queue('tasks')
+
+
+def _get_messages_queue():
+    return _get_queue('messages')
+
+
+_QueueManager.register('tasks', callable=_get_tasks_queue)
+_QueueManager.register('messages', callable=_get_messages_queue)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Executa um PipelineWorker conectado a um TCPQueueBroker.')
+    parser.add_argument('--address', required=True, help='Host e porta do broker, no formato host:porta.')
+    parser.add_argument('--authkey', required=True)
+    parser.add_argument('--name')
+    parser.add_argument('--n-jobs', type=int)
+    parser.add_argument('--max-tasks', type=int)
+    parser.add_argument('--idle-timeout', type=float)
+    parser.add_argument('--heartbeat-interval', type=float, default=5.0)
+    args = parser.parse_args()
+
+    host, port = args.address.rsplit(':', 1)
+    worker = PipelineWorker(broker=TCPQueueBroker(address=(host, int(port)), authkey=args.authkey.encode()),
+                            name=args.name,
+                            n_jobs=args.n_jobs,
+                            heartbeat_interval=args.heartbeat_interval)
+
+    print(f'{worker.name}: {worker.run(max_tasks=args.max_tasks, idle_timeout=args.idle_timeout)} tarefas executadas')
@@ -0,0 +1,357 @@
+import contextlib
+import os
+import pickle
+import time
+import uuid
+from abc import ABC, abstractmethod
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any
+
+from joblib.externals.loky import get_reusable_executor
+
+from manager.pipeline_broker import PipelineBroker
+
+
+class PipelineScheduler(ABC):
+    """
+    Classe responsável por definir a forma como os pipelines de um MultiProcessManager serão executados.
+
+    Independente da estratégia utilizada, os resultados devem ser devolvidos na mesma ordem da lista de pipelines, dessa
+    forma a exibição dos resultados e a escolha do melhor estimador serão sempre as mesmas entre as execuções.
+    """
+
+    @abstractmethod
+    def run(self, manager, pipelines: list) -> list[dict[str, Any]]:
+        """
+        Função que executa os pipelines e retorna as métricas de performance obtidas em cada um deles.
+
+        :param manager: MultiProcessManager que contém os dados e as definições globais da execução.
+
+        :param pipelines: Lista de pipelines que serão executados.
+
+        :return: Lista com as métricas de performance de cada pipeline, na mesma ordem da lista recebida.
+        """
+
+
+class SequentialPipelineScheduler(PipelineScheduler):
+    """
+    Implementação que executa os pipelines um após o outro no processo atual. O paralelismo fica restrito ao n_jobs
+    definido dentro de cada implementação do pipeline.
+    """
+
+    def run(self, manager, pipelines: list) -> list[dict[str, Any]]:
+        return [manager._process_single_pipeline(pipeline, position) for position, pipeline in enumerate(pipelines)]
+
+
+class ProcessPoolPipelineScheduler(PipelineScheduler):
+    """
+    Implementação que executa pipelines inteiros em paralelo, cada um em um processo separado.
+
+    O orçamento de núcleos é dividido entre o paralelismo dos pipelines e o n_jobs interno das implementações de busca e
+    validação, evitando que sejam criados mais processos do que a máquina consegue atender.
+    """
+
+    def __init__(self,
+                 cores_budget: int = -1,
+                 max_workers: int = None):
+        """
+        :param cores_budget: Quantidade total de núcleos que podem ser utilizados. Se for -1 serão utilizados todos os
+        núcleos da máquina.
+
+        :param max_workers: Quantidade máxima de pipelines executados ao mesmo tempo. Se não for definido será limitado
+        pelo cores_budget e pela quantidade de pipelines.
+        """
+        self.cores_budget = cores_budget
+        self.max_workers = max_workers
+
+    def run(self, manager, pipelines: list) -> list[dict[str, Any]]:
+        workers, inner_n_jobs = self.split_cores(len(pipelines))
+
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(_process_pipeline_in_worker, manager, pipeline, position, inner_n_jobs)
+                for position, pipeline in enumerate(pipelines)
+            ]
+
+            return [future.result() for future in futures]
+
+    def split_cores(self, pipelines_number: int) -> tuple[int, int]:
+        """
+        Função que divide o orçamento de núcleos entre os processos dos pipelines e o n_jobs interno de cada um deles.
+
+        :param pipelines_number: Quantidade de pipelines que serão executados.
+
+        :return: Uma tupla contendo a quantidade de processos de pipeline e o n_jobs interno de cada processo.
+        """
+        cores = os.cpu_count() if self.cores_budget == -1 else self.cores_budget
+        workers = min(pipelines_number, cores)
+
+        if self.max_workers is not None:
+            workers = min(workers, self.max_workers)
+
+        workers = max(1, workers)
+
+        return workers, max(1, cores // workers)
+
+
+class BrokerPipelineScheduler(PipelineScheduler):
+    """
+    Implementação que distribui pipelines inteiros, através de um PipelineBroker, para PipelineWorker executados em uma
+    ou mais máquinas. Os dados compartilhados são enviados junto com cada tarefa, os workers não precisam acessar os
+    arquivos da máquina que iniciou a execução.
+
+    Os resultados voltam para o fluxo normal do manager: os dados do histórico de cada pipeline são salvos pelo
+    HistoryManager do pipeline nesta máquina e as métricas seguem para o _show_results e a escolha do melhor estimador.
+    No modo incremental, os pipelines já presentes no histórico não são enviados.
+
+    Uma tentativa é repetida quando o worker informa uma falha, deixa de enviar heartbeats ou retira a tarefa da fila e
+    não a inicia. Quando task_timeout é definido, uma tentativa que demora mais que esse tempo recebe uma cópia em outro
+    worker e o primeiro resultado é utilizado, os resultados das demais tentativas são descartados. Se nenhum worker
+    enviar mensagens por worker_timeout segundos, por exemplo quando nenhum worker foi iniciado, a execução é
+    interrompida.
+    """
+
+    def __init__(self,
+                 broker: PipelineBroker,
+                 max_attempts: int = 3,
+                 heartbeat_timeout: float = 60.0,
+                 task_timeout: float = None,
+                 worker_timeout: float = 300.0,
+                 poll_interval: float = 1.0):
+        """
+        :param broker: Implementação de PipelineBroker compartilhada com os workers.
+
+        :param max_attempts: Quantidade máxima de tentativas de cada pipeline, incluindo as cópias de tentativas lentas.
+        Quando todas falharem a execução é interrompida com o erro da última tentativa.
+
+        :param heartbeat_timeout: Tempo, em segundos, sem heartbeats após o qual o worker de uma tentativa é considerado
+        perdido. Deve ser maior que o heartbeat_interval dos workers.
+
+        :param task_timeout: Tempo, em segundos, após o início de uma tentativa a partir do qual ela é considerada
+        lenta. Se não for definido as tentativas não têm limite de tempo.
+
+        :param worker_timeout: Tempo, em segundos, sem nenhuma mensagem dos workers após o qual a execução é
+        interrompida. Os workers ociosos enviam mensagens no mesmo intervalo dos heartbeats, por isso esse tempo só é
+        atingido quando nenhum worker está conectado ao broker. Se for None a execução aguarda os workers
+        indefinidamente.
+
+        :param poll_interval: Tempo máximo, em segundos, de espera por uma mensagem antes de verificar os limites de
+        tempo das tentativas.
+        """
+        self.broker = broker
+        self.max_attempts = max_attempts
+        self.heartbeat_timeout = heartbeat_timeout
+        self.task_timeout = task_timeout
+        self.worker_timeout = worker_timeout
+        self.poll_interval = poll_interval
+
+    def run(self, manager, pipelines: list) -> list[dict[str, Any]]:
+        return _BrokerRun(self, manager, pipelines).run()
+
+    def __getstate__(self):
+        """
+        O scheduler é serializado junto com o manager enviado aos workers, que não utilizam o broker.
+        """
+        state = self.__dict__.copy()
+        state['broker'] = None
+
+        return state
+
+
+class _BrokerRun:
+    """
+    Estado de uma execução do BrokerPipelineScheduler: as tentativas em andamento de cada pipeline e os resultados já
+    recebidos.
+
+    A fila de tarefas é FIFO, então quando uma tentativa é retirada da fila, o que os workers informam ao iniciá-la ou
+    nas mensagens idle com a última tarefa retirada, todas as tentativas enviadas antes dela também já foram retiradas.
+    Se alguma dessas tentativas não for iniciada em até heartbeat_timeout segundos, o worker que a retirou foi perdido e
+    ela é repetida.
+
+    Quando um worker está ocioso e ainda existem tentativas que não foram retiradas, uma tarefa vazia (probe) é enviada
+    para o final da fila. O worker que a retirar informa isso na próxima mensagem idle, dessa forma também são
+    identificadas as últimas tentativas enviadas, que não são seguidas por nenhuma outra tarefa.
+    """
+
+    def __init__(self, scheduler: BrokerPipelineScheduler, manager, pipelines: list):
+        self.scheduler = scheduler
+        self.broker = scheduler.broker
+        self.manager = manager
+        self.pipelines = pipelines
+
+        self.run_id = uuid.uuid4().hex
+        self.results = [manager._load_incremental_result(pipeline) for pipeline in pipelines]
+        self.attempts = {position: {} for position, result in enumerate(self.results) if result is None}
+        self.attempts_count = {position: 0 for position in self.attempts}
+        self.sequences = {}
+        self.sequence = 0
+        self.dequeued_sequence = 0
+        self.probe = None
+        self.last_worker_message = time.monotonic()
+
+    def run(self) -> list[dict[str, Any]]:
+        while self.broker.get_message(timeout=0) is not None:
+            pass
+
+        for position in self.attempts:
+            self._submit(position)
+
+        while self.attempts:
+            message = self.broker.get_message(timeout=self.scheduler.poll_interval)
+
+            if message is not None:
+                self.last_worker_message = time.monotonic()
+                self._handle_message(*message)
+
+            self._check_timeouts()
+
+        return self.results
+
+    def _submit(self, position: int):
+        """
+        Envia uma nova tentativa do pipeline para o broker.
+        """
+        self.attempts_count[position] += 1
+        self.sequence += 1
+        task_id = f'{self.run_id}:{position}:{self.attempts_count[position]}'
+        self.sequences[task_id] = self.sequence
+
+        data_context = self.manager.data_context
+
+        with data_context.portable() if data_context is not None else contextlib.nullcontext():
+            payload = pickle.dumps((self.manager, self.pipelines[position], position),
+                                   protocol=pickle.HIGHEST_PROTOCOL)
+
+        self.attempts[position][task_id] = {
+            'sequence': self.sequence,
+            'dequeued': None,
+            'started': None,
+            'heartbeat': None,
+            'duplicated': False
+        }
+        self.broker.put_task(task_id, payload)
+
+    def _handle_message(self, task_id: str | None, kind: str, content: Any):
+        """
+        Atualiza o estado das tentativas a partir da mensagem do worker. Mensagens de outras execuções ou de pipelines
+        já concluídos são ignoradas.
+        """
+        if kind == 'idle':
+            if task_id in self.sequences:
+                self._mark_dequeued(self.sequences[task_id])
+
+            self._send_probe()
+            return
+
+        message_run_id, position, _ = task_id.split(':')
+        position = int(position)
+
+        if message_run_id != self.run_id or task_id not in self.attempts.get(position, {}):
+            return
+
+        attempt = self.attempts[position][task_id]
+
+        if kind in ('started', 'heartbeat'):
+            attempt['started'] = attempt['started'] or time.monotonic()
+            attempt['heartbeat'] = time.monotonic()
+            self._mark_dequeued(attempt['sequence'])
+        elif kind == 'done':
+            performance_metrics, history_data = pickle.loads(content)
+
+            for data in history_data:
+                self.pipelines[position].history_manager.save_result(**data)
+
+            self.results[position] = performance_metrics
+            del self.attempts[position]
+        elif kind == 'failed':
+            self._retry(position, task_id, content)
+
+    def _mark_dequeued(self, sequence: int):
+        """
+        Marca como retiradas da fila as tentativas ainda não iniciadas enviadas até a tentativa sequence.
+        """
+        self.dequeued_sequence = max(self.dequeued_sequence, sequence)
+
+        for position_attempts in self.attempts.values():
+            for attempt in position_attempts.values():
+                if attempt['started'] is None and attempt['dequeued'] is None and attempt['sequence'] <= sequence:
+                    attempt['dequeued'] = time.monotonic()
+
+    def _send_probe(self):
+        """
+        Envia um probe quando existem tentativas que ainda não foram retiradas da fila. Um novo probe só é enviado
+        depois que o anterior for retirado ou após heartbeat_timeout segundos, caso ele tenha sido retirado por um worker
+        perdido.
+        """
+        if not any(attempt['started'] is None and attempt['dequeued'] is None
+                   for position_attempts in self.attempts.values() for attempt in position_attempts.values()):
+            return
+
+        if (self.probe is not None and self.probe['sequence'] > self.dequeued_sequence and
+                time.monotonic() - self.probe['time'] <= self.scheduler.heartbeat_timeout):
+            return
+
+        self.sequence += 1
+        task_id = f'{self.run_id}:probe:{self.sequence}'
+        self.sequences[task_id] = self.sequence
+        self.probe = {'sequence': self.sequence, 'time': time.monotonic()}
+
+        self.broker.put_task(task_id, None)
+
+    def _check_timeouts(self):
+        """
+        Repete as tentativas cujo worker foi perdido e duplica as tentativas lentas. Interrompe a execução quando nenhum
+        worker envia mensagens por worker_timeout segundos.
+        """
+        now = time.monotonic()
+        heartbeat_timeout = self.scheduler.heartbeat_timeout
+        task_timeout = self.scheduler.task_timeout
+        worker_timeout = self.scheduler.worker_timeout
+
+        if worker_timeout is not None and now - self.last_worker_message > worker_timeout:
+            raise RuntimeError(f'Nenhuma mensagem dos workers foi recebida em {worker_timeout} segundos, verifique se '
+                               f'existem workers em execução conectados ao broker.')
+
+        for position in list(self.attempts):
+            for task_id, attempt in list(self.attempts.get(position, {}).items()):
+                if attempt['started'] is None:
+                    if attempt['dequeued'] is not None and now - attempt['dequeued'] > heartbeat_timeout:
+                        self._retry(position, task_id, 'A tarefa foi retirada da fila e não foi iniciada.')
+                elif now - attempt['heartbeat'] > heartbeat_timeout:
+                    self._retry(position, task_id, f'O worker não enviou heartbeats por {heartbeat_timeout} segundos.')
+                elif (task_timeout is not None and not attempt['duplicated'] and now - attempt['started'] > task_timeout
+                      and self.attempts_count[position] < self.scheduler.max_attempts):
+                    attempt['duplicated'] = True
+                    self._submit(position)
+
+    def _retry(self, position: int, task_id: str, error: str):
+        """
+        Descarta a tentativa que falhou e envia uma nova, a menos que outra tentativa do mesmo pipeline ainda esteja em
+        andamento.
+        """
+        del self.attempts[position][task_id]
+
+        if self.attempts[position]:
+            return
+
+        if self.attempts_count[position] >= self.scheduler.max_attempts:
+            raise RuntimeError(f'O pipeline {position} falhou após {self.attempts_count[position]} tentativas. '
+                               f'Último erro:\n{error}')
+
+        self._submit(position)
+
+
+def _process_pipeline_in_worker(manager, pipeline, position: int, inner_n_jobs: int) -> dict[str, Any]:
+    """
+    Função executada dentro do processo filho. Cada processo recebe sua própria cópia do manager e do pipeline, por isso
+    os tempos registrados nas implementações não se misturam entre os pipelines.
+
+    Ao final, os processos internos do joblib são encerrados, caso contrário o processo filho ficaria aguardando o tempo
+    de inatividade desses processos antes de ser finalizado.
+    """
+    pipeline.set_n_jobs(inner_n_jobs)
+
+    try:
+        return manager._process_single_pipeline(pipeline, position)
+    finally:
+        get_reusable_executor().shutdown(wait=True)
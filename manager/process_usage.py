@@ -0,0 +1,96 @@
+import ctypes
+import os
+import sys
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss(children: bool = False) -> int:
+    """
+    Retorna o pico de memória (RSS) em bytes. No Linux e no macOS é utilizado o ru_maxrss, informado em KB no Linux e
+    em bytes no macOS. No Windows é utilizado o PeakWorkingSetSize do processo.
+
+    :param children: Flag que indica se deve ser retornado o maior pico entre os processos filhos já finalizados. No
+    Windows essa informação não está disponível e é retornado 0.
+    """
+    if resource is None:
+        return 0 if children else _get_windows_peak_working_set()
+
+    peak = resource.getrusage(resource.RUSAGE_CHILDREN if children else resource.RUSAGE_SELF).ru_maxrss
+
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def get_rss() -> int:
+    """
+    Retorna a memória (RSS) utilizada pelo processo atual no momento, em bytes. No Linux é lido o /proc/self/statm e no
+    Windows é utilizado o WorkingSetSize do processo. Nos outros sistemas essa informação não está disponível sem
+    dependências externas e é retornado 0.
+    """
+    if sys.platform.startswith('linux'):
+        try:
+            with open('/proc/self/statm', 'r') as file:
+                resident_pages = int(file.read().split()[1])
+        except (OSError, IndexError, ValueError):
+            return 0
+
+        return resident_pages * os.sysconf('SC_PAGE_SIZE')
+
+    if resource is None:
+        counters = _get_windows_memory_counters()
+        return counters.WorkingSetSize if counters is not None else 0
+
+    return 0
+
+
+def get_cpu_time() -> float:
+    """
+    Retorna o tempo de CPU, de usuário e de sistema, em segundos do processo e dos processos filhos já finalizados. No
+    Windows o tempo dos processos filhos não está disponível.
+    """
+    times = os.times()
+
+    return times.user + times.system + times.children_user + times.children_system
+
+
+class _ProcessMemoryCounters(ctypes.Structure):
+    _fields_ = [('cb', ctypes.c_ulong),
+                ('PageFaultCount', ctypes.c_ulong),
+                ('PeakWorkingSetSize', ctypes.c_size_t),
+                ('WorkingSetSize', ctypes.c_size_t),
+                ('QuotaPeakPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaPeakNonPagedPoolUsage', ctypes.c_size_t),
+                ('QuotaNonPagedPoolUsage', ctypes.c_size_t),
+                ('PagefileUsage', ctypes.c_size_t),
+                ('PeakPagefileUsage', ctypes.c_size_t)]
+
+
+def _get_windows_peak_working_set() -> int:
+    """
+    Retorna o PeakWorkingSetSize do processo atual, ou 0 se não for possível obtê-lo.
+    """
+    counters = _get_windows_memory_counters()
+
+    return counters.PeakWorkingSetSize if counters is not None else 0
+
+
+def _get_windows_memory_counters():
+    """
+    Retorna os contadores de memória do processo atual através do GetProcessMemoryInfo, ou None se não for possível
+    obtê-los.
+    """
+    try:
+        counters = _ProcessMemoryCounters()
+        counters.cb = ctypes.sizeof(counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return None
+    except (AttributeError, OSError):
+        return None
+
+    return counters
@@ -0,0 +1,343 @@
+import os
+import tempfile
+
+import joblib
+import numpy as np
+from pandas import DataFrame
+from sklearn.utils.metaestimators import available_if
+
+from manager.feature_selection_cache import FeatureSelectionCache
+from manager.fit_cache import FitCache, _CachedFitMixin, _get_cached_class
+
+_RESTORED_ATTRIBUTES = ['classes_', 'n_features_in_', 'feature_names_in_', 'n_outputs_']
+"""
+Atributos do estimador treinado que são gravados junto com o fit. Eles são utilizados pelos scorers do scikit-learn
+antes de chamar o predict, por exemplo, o classes_ dos classificadores.
+"""
+
+
+class RunCheckpoint:
+    """
+    Checkpoints duráveis de uma execução do MultiProcessManager, gravados em um diretório, que permitem que uma execução
+    interrompida seja retomada a partir do ponto em que parou. São registrados:
+
+    - as features selecionadas de cada pipeline, através de um FeatureSelectionCache no subdiretório feature_selection;
+    - os pipelines concluídos, com as métricas de performance, que não são executados novamente;
+    - o estado do gerador aleatório do np no início de cada etapa, dessa forma os candidatos sorteados na busca são os
+      mesmos da execução interrompida;
+    - cada fit concluído dos candidatos da busca e dos folds da validação, com as saídas do predict, predict_proba e
+      decision_function nos dados em que o fit foi avaliado.
+
+    Na execução retomada, os fits já registrados não são realizados, o estimador recebe apenas os atributos de
+    _RESTORED_ATTRIBUTES e as saídas gravadas, o que reproduz exatamente os scores de cada fold. Se for necessário algo
+    que não foi gravado, como um predict em outros dados ou algum outro atributo do estimador treinado, o fit é
+    realizado nesse momento. Um fit só é registrado depois de avaliado, ou seja, o trabalho perdido em uma interrupção é
+    no máximo o dos fits em andamento.
+
+    Assim como no FitCache, estimadores com random_state=None também são reaproveitados, ou seja, um fit repetido com os
+    mesmos parâmetros e dados retorna o primeiro resultado obtido.
+
+    A execução deve ser retomada com os mesmos dados, pipelines (na mesma ordem), seed e scoring. Para começar uma
+    execução do zero utilize outro diretório.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: Diretório onde os checkpoints serão gravados.
+        """
+        self.directory = directory
+        self.feature_selection_cache = FeatureSelectionCache(os.path.join(directory, 'feature_selection'))
+
+    def wrap(self, estimator):
+        """
+        Retorna uma cópia do estimador, com os mesmos parâmetros, que registra cada fit concluído e reaproveita os fits
+        já registrados, inclusive nas cópias criadas pelo clone do scikit-learn e enviadas para outros processos. A
+        classe retornada possui o mesmo nome da classe original e pode ser combinada com o FitCache e com o Tracer.
+
+        :param estimator: Instância do estimador que deseja utilizar com o checkpoint.
+        """
+        if isinstance(estimator, _CheckpointedFitMixin):
+            return estimator
+
+        checkpointed_class = _get_checkpointed_class(type(estimator), self)
+
+        return checkpointed_class(**estimator.get_params(deep=False))
+
+    @staticmethod
+    def unwrap(estimator):
+        """
+        Retorna o estimador treinado sem o registro dos fits. Se o fit tiver sido recuperado do checkpoint ele é
+        realizado nesse momento, dessa forma o estimador salvo no histórico sempre possui todos os atributos.
+
+        :param estimator: Instância retornada por wrap ou alguma cópia dela.
+        """
+        if not isinstance(estimator, _CheckpointedFitMixin):
+            return estimator
+
+        estimator._materialize()
+
+        estimator_class = type(estimator).__bases__[-1]
+        unwrapped = estimator_class.__new__(estimator_class)
+        unwrapped.__dict__.update(estimator.__dict__)
+        _pop_checkpoint_state(unwrapped)
+
+        return unwrapped
+
+    def get_pipeline_key(self, pipeline, position: int, data_fingerprint: str, scoring: str, seed: int) -> str:
+        """
+        Calcula a chave do pipeline a partir da sua posição, das implementações utilizadas, da configuração retornada
+        por get_config, que inclui o estimador, as distribuições dos parâmetros buscados, os searchers e o validador, e
+        das definições globais da execução.
+
+        :param pipeline: Pipeline que será executado.
+
+        :param position: Posição do pipeline na lista de pipelines do manager.
+
+        :param data_fingerprint: Hash dos dados de x e y.
+
+        :param scoring: Métrica avaliada para definição do melhor estimador.
+
+        :param seed: Seed do manager.
+        """
+        return joblib.hash((
+            position,
+            pipeline.get_dict_pipeline_data(),
+            pipeline.get_config(),
+            data_fingerprint,
+            scoring,
+            seed
+        ))
+
+    def load_pipeline_result(self, pipeline_key: str) -> dict | None:
+        """
+        Recupera as métricas de performance de um pipeline concluído.
+
+        :param pipeline_key: Chave calculada por get_pipeline_key.
+        """
+        return self._load(self._get_path('pipelines', pipeline_key))
+
+    def save_pipeline_result(self, pipeline_key: str, performance_metrics: dict):
+        """
+        Registra o pipeline como concluído.
+
+        :param pipeline_key: Chave calculada por get_pipeline_key.
+
+        :param performance_metrics: Dicionário com as métricas de performance do pipeline.
+        """
+        self._dump(performance_metrics, self._get_path('pipelines', pipeline_key))
+
+    def restore_random_state(self, pipeline_key: str, stage: str):
+        """
+        Restaura o estado do gerador aleatório do np registrado no início da etapa. Se a etapa ainda não foi iniciada
+        em nenhuma execução o estado atual é registrado.
+
+        :param pipeline_key: Chave calculada por get_pipeline_key.
+
+        :param stage: Nome da etapa do pipeline.
+        """
+        path = self._get_path('random_states', f'{pipeline_key}_{stage}')
+        state = self._load(path)
+
+        if state is None:
+            self._dump(np.random.get_state(), path)
+        else:
+            np.random.set_state(state)
+
+    def get_fit_key(self, estimator, data_x, data_y, fit_params: dict) -> str:
+        """
+        Calcula a chave do fit a partir da classe e dos parâmetros do estimador e dos dados de treino, da mesma forma
+        que o FitCache.
+        """
+        estimator_class = _get_estimator_class(type(estimator))
+        columns = data_x.columns.tolist() if isinstance(data_x, DataFrame) else None
+
+        return joblib.hash((
+            f'{estimator_class.__module__}.{estimator_class.__qualname__}',
+            estimator.get_params(deep=False),
+            columns,
+            data_x,
+            data_y,
+            fit_params
+        ))
+
+    def load_fit(self, fit_key: str) -> dict | None:
+        """
+        Recupera o registro de um fit, um dicionário com os atributos gravados (attributes) e as saídas de cada
+        avaliação (outputs).
+
+        :param fit_key: Chave calculada por get_fit_key.
+        """
+        return self._load(self._get_path('fits', fit_key))
+
+    def save_fit(self, fit_key: str, record: dict):
+        """
+        Grava o registro de um fit.
+
+        :param fit_key: Chave calculada por get_fit_key.
+
+        :param record: Dicionário com os atributos gravados e as saídas de cada avaliação.
+        """
+        self._dump(record, self._get_path('fits', fit_key))
+
+    def _get_path(self, kind: str, key: str) -> str:
+        return os.path.join(self.directory, kind, f'{key}.joblib')
+
+    @staticmethod
+    def _load(path: str):
+        try:
+            return joblib.load(path)
+        except (FileNotFoundError, EOFError):
+            return None
+
+    @staticmethod
+    def _dump(value, path: str):
+        """
+        Grava o arquivo em um arquivo temporário e o renomeia, dessa forma uma interrupção durante a escrita nunca
+        deixa um checkpoint incompleto.
+        """
+        directory = os.path.dirname(path)
+        os.makedirs(directory, exist_ok=True)
+
+        file_descriptor, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        os.close(file_descriptor)
+
+        joblib.dump(value, temp_path)
+        os.replace(temp_path, path)
+
+
+class _CheckpointedFitMixin:
+    """
+    Mixin adicionado às classes dos estimadores para que os fits sejam registrados e recuperados do RunCheckpoint. O
+    predict, o predict_proba e o decision_function só existem quando o estimador original também os disponibiliza.
+    """
+
+    run_checkpoint: RunCheckpoint = None
+
+    def fit(self, X, y=None, **fit_params):
+        _pop_checkpoint_state(self)
+
+        fit_key = self.run_checkpoint.get_fit_key(self, X, y, fit_params)
+        record = self.run_checkpoint.load_fit(fit_key)
+
+        if record is None:
+            super().fit(X, y, **fit_params)
+            record = {
+                'attributes': {name: self.__dict__[name] for name in _RESTORED_ATTRIBUTES if name in self.__dict__},
+                'outputs': {},
+            }
+        else:
+            self.__dict__.update(record['attributes'])
+            self._checkpoint_pending_fit = (X, y, fit_params)
+
+        self._checkpoint_key = fit_key
+        self._checkpoint_record = record
+
+        return self
+
+    @available_if(lambda self: hasattr(super(_CheckpointedFitMixin, self), 'predict'))
+    def predict(self, X):
+        return self._get_output('predict', X)
+
+    @available_if(lambda self: hasattr(super(_CheckpointedFitMixin, self), 'predict_proba'))
+    def predict_proba(self, X):
+        return self._get_output('predict_proba', X)
+
+    @available_if(lambda self: hasattr(super(_CheckpointedFitMixin, self), 'decision_function'))
+    def decision_function(self, X):
+        return self._get_output('decision_function', X)
+
+    def _get_output(self, method: str, X):
+        """
+        Retorna a saída gravada para os mesmos dados ou realiza a avaliação e a adiciona no registro do fit.
+        """
+        record = self.__dict__.get('_checkpoint_record')
+
+        if record is None:
+            return getattr(super(), method)(X)
+
+        output_key = f'{method}_{joblib.hash(X)}'
+
+        if output_key not in record['outputs']:
+            self._materialize()
+            record['outputs'][output_key] = getattr(super(), method)(X)
+            self.run_checkpoint.save_fit(self._checkpoint_key, record)
+
+        return record['outputs'][output_key]
+
+    def _materialize(self):
+        """
+        Realiza o fit que foi recuperado do checkpoint, quando for necessário algo que não foi gravado.
+        """
+        pending_fit = self.__dict__.get('_checkpoint_pending_fit')
+
+        if pending_fit is None:
+            return
+
+        X, y, fit_params = pending_fit
+        checkpoint_state = _pop_checkpoint_state(self)
+
+        super().fit(X, y, **fit_params)
+
+        checkpoint_state.pop('_checkpoint_pending_fit')
+        self.__dict__.update(checkpoint_state)
+
+    def __getattr__(self, name: str):
+        if name.startswith('__') or self.__dict__.get('_checkpoint_pending_fit') is None:
+            raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+        self._materialize()
+
+        return getattr(self, name)
+
+    def __reduce__(self):
+        estimator_class = _get_estimator_class(type(self))
+        fit_cache = getattr(type(self), 'fit_cache', None) if issubclass(type(self), _CachedFitMixin) else None
+
+        return _rebuild_checkpointed_estimator, (estimator_class, fit_cache, self.run_checkpoint), self.__getstate__()
+
+
+_checkpointed_classes = {}
+
+
+def _get_checkpointed_class(estimator_class, run_checkpoint: RunCheckpoint):
+    """
+    Cria, uma única vez por classe de estimador e diretório de checkpoint, a subclasse que registra os fits. Quando a
+    classe já utiliza o FitCache a subclasse é criada a partir dela, dessa forma os fits realizados também são salvos no
+    cache.
+    """
+    key = (estimator_class, os.path.abspath(run_checkpoint.directory))
+
+    if key not in _checkpointed_classes:
+        _checkpointed_classes[key] = type(estimator_class.__name__,
+                                          (_CheckpointedFitMixin, estimator_class),
+                                          {'run_checkpoint': run_checkpoint,
+                                           '__module__': _CheckpointedFitMixin.__module__})
+
+    return _checkpointed_classes[key]
+
+
+def _get_estimator_class(estimator_class):
+    while issubclass(estimator_class, (_CheckpointedFitMixin, _CachedFitMixin)):
+        estimator_class = estimator_class.__bases__[-1]
+
+    return estimator_class
+
+
+def _rebuild_checkpointed_estimator(estimator_class, fit_cache: FitCache, run_checkpoint: RunCheckpoint):
+    if fit_cache is not None:
+        estimator_class = _get_cached_class(estimator_class, fit_cache)
+
+    checkpointed_class = _get_checkpointed_class(estimator_class, run_checkpoint)
+
+    return checkpointed_class.__new__(checkpointed_class)
+
+
+def _pop_checkpoint_state(estimator) -> dict:
+    """
+    Remove do estimador os atributos do checkpoint, que não devem ser salvos pelo FitCache nem no histórico.
+    """
+    return {
+        name: estimator.__dict__.pop(name)
+        for name in ['_checkpoint_key', '_checkpoint_record', '_checkpoint_pending_fit']
+        if name in estimator.__dict__
+    }
@@ -0,0 +1,148 @@
+import contextlib
+import os
+import shutil
+import tempfile
+import weakref
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from sklearn.model_selection import BaseCrossValidator
+
+
+class SharedFolds(BaseCrossValidator):
+    """
+    Implementação de validação cruzada que devolve sempre os mesmos folds, calculados uma única vez, para que a seleção de
+    features, a busca de parâmetros e a validação avaliem exatamente as mesmas divisões dos dados.
+
+    Quando a quantidade de amostras recebida for diferente da original, por exemplo, em uma busca aninhada dentro de um
+    fold de treino, a divisão é delegada para a implementação de validação cruzada original.
+    """
+
+    def __init__(self, cv, folds: list[tuple[np.ndarray, np.ndarray]], n_samples: int):
+        """
+        :param cv: Implementação de validação cruzada original (KFold ou StratifiedKFold).
+
+        :param folds: Lista com os índices de treino e teste de cada fold.
+
+        :param n_samples: Quantidade de amostras dos dados utilizados para calcular os folds.
+        """
+        self.cv = cv
+        self.folds = folds
+        self.n_samples = n_samples
+
+    def split(self, X, y=None, groups=None):
+        if X.shape[0] == self.n_samples:
+            yield from self.folds
+        else:
+            yield from self.cv.split(X, y, groups)
+
+    def get_n_splits(self, X=None, y=None, groups=None):
+        return len(self.folds)
+
+    def __repr__(self):
+        return f'{type(self).__name__}(cv={self.cv}, n_splits={len(self.folds)})'
+
+
+class SharedDataContext:
+    """
+    Classe que mantém os dados de x e y uma única vez em arrays do NumPy mapeados em memória, somente leitura, e os folds
+    da validação cruzada já calculados.
+
+    Os processos do joblib que recebem esses arrays não fazem uma cópia dos dados, apenas abrem o mesmo arquivo mapeado,
+    reduzindo o custo de serialização e o pico de memória quando vários processos são utilizados.
+    """
+
+    def __init__(self, data_x: DataFrame, data_y, cv, directory: str = None):
+        """
+        :param data_x: Valores de x (features).
+
+        :param data_y: Valores de y (target).
+
+        :param cv: Definição da validação cruzada utilizada para calcular os folds. Valores que podem ser usados: KFold
+        ou StratifiedKFold.
+
+        :param directory: Diretório onde os arrays serão armazenados. Se não for definido será utilizado um diretório
+        temporário que é removido quando o objeto não for mais utilizado.
+        """
+        if directory is None:
+            self.directory = tempfile.mkdtemp(prefix='shared_data_')
+            weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+        else:
+            self.directory = directory
+            os.makedirs(self.directory, exist_ok=True)
+
+        self._portable = False
+        self.columns = data_x.columns.tolist()
+        self._x_path = self._write_array('x', data_x.to_numpy(dtype=np.float64))
+        self._y_path = self._write_array('y', np.asarray(data_y))
+
+        self._load_arrays()
+
+        self.folds = SharedFolds(cv=cv, folds=list(cv.split(self.x, self.y)), n_samples=self.x.shape[0])
+
+    def get_data_x(self, columns: list[str] = None) -> DataFrame:
+        """
+        Retorna um DataFrame cujas colunas são visões do array mapeado em memória, nenhuma cópia dos dados é feita, nem
+        mesmo quando apenas algumas colunas são selecionadas.
+
+        Cada coluna é mantida como um bloco separado dentro do DataFrame. Um único bloco seria a transposta do array
+        gravado e o joblib não reconstrói corretamente visões transpostas de arquivos mapeados em memória.
+
+        :param columns: Colunas que devem estar presentes no DataFrame. Se não for definido serão retornadas todas.
+        """
+        columns = self.columns if columns is None else columns
+        positions = {column: position for position, column in enumerate(self.columns)}
+
+        return pd.DataFrame({column: self.x[:, positions[column]] for column in columns}, copy=False)
+
+    @contextlib.contextmanager
+    def portable(self):
+        """
+        Enquanto o contexto estiver ativo, a serialização inclui os próprios arrays ao invés dos caminhos dos arquivos.
+        O processo que receber o objeto grava os arrays em um diretório temporário local, o que permite enviar os dados
+        para processos de outras máquinas.
+        """
+        self._portable = True
+
+        try:
+            yield self
+        finally:
+            self._portable = False
+
+    def _load_arrays(self):
+        self.x = np.load(self._x_path, mmap_mode='r')
+        self.y = np.load(self._y_path, mmap_mode='r')
+
+    def _write_array(self, name: str, array: np.ndarray) -> str:
+        """
+        Grava o array no formato de colunas (Fortran), dessa forma cada coluna ocupa uma região contínua do arquivo.
+        """
+        path = os.path.join(self.directory, f'{name}.npy')
+        np.save(path, np.asfortranarray(array))
+
+        return path
+
+    def __getstate__(self):
+        """
+        Ao serializar o contexto apenas os caminhos dos arquivos são enviados, o processo que receber o objeto abre os
+        mesmos arquivos mapeados em memória. Dentro de portable os arrays são enviados junto.
+        """
+        state = self.__dict__.copy()
+        state['x'] = np.asarray(self.x) if self._portable else None
+        state['y'] = np.asarray(self.y) if self._portable else None
+        state['_portable'] = False
+
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+        if state['x'] is not None:
+            self.directory = tempfile.mkdtemp(prefix='shared_data_')
+            weakref.finalize(self, shutil.rmtree, self.directory, ignore_errors=True)
+
+            self._x_path = self._write_array('x', state['x'])
+            self._y_path = self._write_array('y', state['y'])
+
+        self._load_arrays()
@@ -0,0 +1,333 @@
+import contextlib
+import contextvars
+import hashlib
+import json
+import os
+import threading
+import time
+import uuid
+from abc import ABC, abstractmethod
+
+import numpy as np
+import pandas as pd
+from pandas import DataFrame
+from sklearn.utils.metaestimators import available_if
+
+from manager.fit_cache import _CachedFitMixin, _get_cached_class
+from manager.process_usage import get_rss
+from manager.run_checkpoint import _CheckpointedFitMixin, _get_checkpointed_class
+
+
+class SpanExporter(ABC):
+    """
+    Classe base dos destinos dos spans registrados pelo Tracer.
+
+    O exporter é enviado junto com o Tracer para os processos do joblib e do ProcessPoolPipelineScheduler, por isso
+    cada span deve ser gravado assim que for finalizado, de uma forma que vários processos possam gravar ao mesmo tempo.
+    """
+
+    @abstractmethod
+    def export(self, span: dict):
+        """
+        Grava um span finalizado.
+
+        :param span: Dicionário com os dados do span, conforme descrito no Tracer.
+        """
+
+
+class JsonLinesSpanExporter(SpanExporter):
+    """
+    Grava cada span como uma linha JSON. Cada linha é gravada com uma única escrita em modo append, dessa forma linhas
+    de processos diferentes não se misturam. O arquivo pode ser lido com load_spans.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Caminho do arquivo .jsonl.
+        """
+        self.path = path
+
+    def export(self, span: dict):
+        _append_line(self.path, json.dumps(span, default=repr))
+
+
+class ChromeTraceSpanExporter(SpanExporter):
+    """
+    Grava os spans no formato de eventos do Chrome (Trace Event Format), que pode ser aberto no chrome://tracing ou no
+    Perfetto. Cada processo aparece em uma linha separada, com os spans aninhados pelo tempo.
+
+    É utilizado o formato de array sem o colchete final, que é opcional nesse formato, o que permite que os eventos
+    sejam adicionados por vários processos sem reescrever o arquivo.
+    """
+
+    def __init__(self, path: str):
+        """
+        :param path: Caminho do arquivo .json.
+        """
+        self.path = path
+
+    def export(self, span: dict):
+        if not os.path.exists(self.path):
+            try:
+                file_descriptor = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_EXCL)
+                os.write(file_descriptor, b'[\n')
+                os.close(file_descriptor)
+            except FileExistsError:
+                pass
+
+        event = {
+            'name': span['name'],
+            'cat': span['category'],
+            'ph': 'X',
+            'ts': span['start'] * 1_000_000,
+            'dur': span['duration'] * 1_000_000,
+            'pid': span['pid'],
+            'tid': span['thread'],
+            'args': {**span['attributes'], 'cpu_time': span['cpu_time'],
+                     'rss_start': span['rss_start'], 'rss_end': span['rss_end']},
+        }
+
+        _append_line(self.path, json.dumps(event, default=repr) + ',')
+
+
+class Tracer:
+    """
+    Registra spans de cada etapa do processo e de cada fit e predict dos estimadores, com a duração e o tempo de CPU em
+    segundos (float), a memória (RSS) do processo no início e no fim do span e o processo e a thread que executaram o
+    span.
+
+    Cada span é um dicionário com as chaves trace_id, span_id, parent_id, name, category, start (timestamp), duration,
+    cpu_time, rss_start e rss_end (bytes), pid, thread e attributes. Os spans dos fits possuem nos atributos o estimador, os seus
+    parâmetros, a quantidade de linhas e colunas e o fold, identificado pelo hash do índice dos dados de treino, que é o
+    mesmo para todos os candidatos avaliados no mesmo fold.
+
+    Os spans são enviados para todos os exporters assim que são finalizados.
+    """
+
+    def __init__(self, exporters: list[SpanExporter], trace_id: str = None):
+        """
+        :param exporters: Implementações de SpanExporter que receberão os spans.
+
+        :param trace_id: Identificação da execução, gravada em todos os spans. Se não for definido é gerado um id.
+        """
+        self.exporters = exporters
+        self.trace_id = trace_id if trace_id is not None else uuid.uuid4().hex
+
+    @contextlib.contextmanager
+    def span(self, name: str, category: str = 'stage', **attributes):
+        """
+        Registra um span com a duração do bloco with. O dicionário de atributos é retornado, dessa forma informações
+        obtidas durante o bloco, como o score, podem ser adicionadas ao span.
+
+        :param name: Nome do span.
+
+        :param category: Categoria do span, por exemplo, stage, fit ou predict.
+
+        :param attributes: Atributos adicionais do span.
+        """
+        span_id = uuid.uuid4().hex[:16]
+        parent_id = _current_span_id.get()
+        token = _current_span_id.set(span_id)
+
+        start = time.time()
+        start_counter = time.perf_counter()
+        start_cpu = time.process_time()
+        rss_start = get_rss()
+
+        try:
+            yield attributes
+        except BaseException as error:
+            attributes['error'] = repr(error)
+            raise
+        finally:
+            duration = time.perf_counter() - start_counter
+            cpu_time = time.process_time() - start_cpu
+            _current_span_id.reset(token)
+
+            self._export({
+                'trace_id': self.trace_id,
+                'span_id': span_id,
+                'parent_id': parent_id,
+                'name': name,
+                'category': category,
+                'start': start,
+                'duration': duration,
+                'cpu_time': cpu_time,
+                'rss_start': rss_start,
+                'rss_end': get_rss(),
+                'pid': os.getpid(),
+                'thread': threading.get_ident(),
+                'attributes': attributes,
+            })
+
+    def wrap(self, estimator):
+        """
+        Retorna uma cópia do estimador, com os mesmos parâmetros, que registra um span a cada fit, predict e
+        predict_proba, inclusive nas cópias criadas pelo clone do scikit-learn e enviadas para outros processos. A
+        classe retornada possui o mesmo nome da classe original e pode ser combinada com o FitCache.
+
+        :param estimator: Instância do estimador que deseja rastrear.
+        """
+        if isinstance(estimator, _TracedEstimatorMixin):
+            return estimator
+
+        traced_class = _get_traced_class(type(estimator), self)
+
+        return traced_class(**estimator.get_params(deep=False))
+
+    @staticmethod
+    def unwrap(estimator):
+        """
+        Retorna o estimador, com o mesmo estado, sem o registro dos spans. Utilizado antes de salvar o modelo, dessa
+        forma quem carregar o modelo não continua gravando spans no arquivo da execução.
+
+        :param estimator: Instância retornada por wrap ou alguma cópia dela.
+        """
+        if not isinstance(estimator, _TracedEstimatorMixin):
+            return estimator
+
+        estimator_class = type(estimator).__bases__[-1]
+        unwrapped = estimator_class.__new__(estimator_class)
+        unwrapped.__dict__.update(estimator.__dict__)
+
+        return unwrapped
+
+    def _export(self, span: dict):
+        for exporter in self.exporters:
+            exporter.export(span)
+
+
+def load_spans(path: str) -> DataFrame:
+    """
+    Lê os spans gravados pelo JsonLinesSpanExporter. Os atributos são expandidos em colunas com o prefixo
+    attributes.
+    """
+    with open(path, 'r') as file:
+        spans = [json.loads(line) for line in file if line.strip()]
+
+    return pd.json_normalize(spans)
+
+
+def summarize_spans(spans: DataFrame, by: list[str] = None) -> DataFrame:
+    """
+    Agrupa os spans e calcula a quantidade, a duração total, média e máxima e o tempo de CPU total de cada grupo,
+    ordenados pela duração total.
+
+    :param spans: DataFrame retornado por load_spans.
+
+    :param by: Colunas utilizadas no agrupamento. Se não for definido os spans são agrupados pela categoria, pelo nome,
+    pelo estimador e pelos parâmetros, o que mostra as configurações de estimador mais lentas.
+    """
+    if by is None:
+        by = [column for column in ['category', 'name', 'attributes.estimator', 'attributes.params']
+              if column in spans.columns]
+
+    grouped = spans.fillna({column: '' for column in by}).groupby(by)
+
+    summary = grouped.agg(count=('duration', 'size'),
+                          total_duration=('duration', 'sum'),
+                          mean_duration=('duration', 'mean'),
+                          max_duration=('duration', 'max'),
+                          total_cpu_time=('cpu_time', 'sum'))
+
+    return summary.sort_values('total_duration', ascending=False).reset_index()
+
+
+_current_span_id = contextvars.ContextVar('current_span_id', default=None)
+
+
+class _TracedEstimatorMixin:
+    """
+    Mixin adicionado às classes dos estimadores para que o fit, o predict e o predict_proba registrem spans no Tracer.
+    O predict e o predict_proba só existem quando o estimador original também os disponibiliza.
+    """
+
+    tracer: Tracer = None
+
+    def fit(self, X, y=None, **fit_params):
+        with self.tracer.span('fit', 'fit', **_get_estimator_attributes(self, X, with_fold=True)):
+            return super().fit(X, y, **fit_params)
+
+    @available_if(lambda self: hasattr(super(_TracedEstimatorMixin, self), 'predict'))
+    def predict(self, X):
+        with self.tracer.span('predict', 'predict', **_get_estimator_attributes(self, X)):
+            return super().predict(X)
+
+    @available_if(lambda self: hasattr(super(_TracedEstimatorMixin, self), 'predict_proba'))
+    def predict_proba(self, X):
+        with self.tracer.span('predict_proba', 'predict', **_get_estimator_attributes(self, X)):
+            return super().predict_proba(X)
+
+    def __reduce__(self):
+        estimator_class = _get_estimator_class(type(self))
+        fit_cache = getattr(type(self), 'fit_cache', None) if issubclass(type(self), _CachedFitMixin) else None
+        run_checkpoint = (getattr(type(self), 'run_checkpoint', None)
+                          if issubclass(type(self), _CheckpointedFitMixin) else None)
+
+        return (_rebuild_traced_estimator, (estimator_class, fit_cache, self.tracer, run_checkpoint),
+                self.__getstate__())
+
+
+_traced_classes = {}
+
+
+def _get_traced_class(estimator_class, tracer: Tracer):
+    """
+    Cria, uma única vez por classe de estimador e execução, a subclasse que registra os spans. Quando a classe já
+    utiliza o FitCache ou o RunCheckpoint a subclasse é criada a partir dela, dessa forma os fits recuperados do cache
+    também aparecem.
+    """
+    key = (estimator_class, tracer.trace_id)
+
+    if key not in _traced_classes:
+        _traced_classes[key] = type(estimator_class.__name__,
+                                    (_TracedEstimatorMixin, estimator_class),
+                                    {'tracer': tracer, '__module__': _TracedEstimatorMixin.__module__})
+
+    return _traced_classes[key]
+
+
+def _get_estimator_class(estimator_class):
+    while issubclass(estimator_class, (_TracedEstimatorMixin, _CheckpointedFitMixin, _CachedFitMixin)):
+        estimator_class = estimator_class.__bases__[-1]
+
+    return estimator_class
+
+
+def _rebuild_traced_estimator(estimator_class, fit_cache, tracer: Tracer, run_checkpoint=None):
+    if fit_cache is not None:
+        estimator_class = _get_cached_class(estimator_class, fit_cache)
+
+    if run_checkpoint is not None:
+        estimator_class = _get_checkpointed_class(estimator_class, run_checkpoint)
+
+    traced_class = _get_traced_class(estimator_class, tracer)
+
+    return traced_class.__new__(traced_class)
+
+
+def _get_estimator_attributes(estimator, X, with_fold: bool = False) -> dict:
+    attributes = {
+        'estimator': _get_estimator_class(type(estimator)).__name__,
+        'params': json.dumps(estimator.get_params(deep=False), sort_keys=True, default=repr),
+        'rows': X.shape[0],
+        'columns': X.shape[1] if len(X.shape) > 1 else 1,
+    }
+
+    if with_fold and hasattr(X, 'index'):
+        index = np.ascontiguousarray(X.index.to_numpy())
+        attributes['fold'] = hashlib.blake2b(index.view(np.uint8), digest_size=6).hexdigest()
+
+    return attributes
+
+
+def _append_line(path: str, line: str):
+    """
+    Adiciona uma linha no arquivo com uma única escrita em modo append.
+    """
+    file_descriptor = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT)
+
+    try:
+        os.write(file_descriptor, (line + '\n').encode())
+    finally:
+        os.close(file_descriptor)
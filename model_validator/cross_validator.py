@@ -1,6 +1,6 @@
 import time
 
-import numpy as np
+from sklearn.base import clone
 from sklearn.model_selection import cross_val_score
 
 from model_validator.result import ScikitLearnCrossValidationResult
@@ -9,9 +9,16 @@ from model_validator.validator import ScikitLearnBaseValidator
 
 class CrossValidatorScikitLearn(ScikitLearnBaseValidator):
     """
-    Classe que implementa a validação cruzada do modelo encontrado pela busca de hiper parâmetros de modelos do Scikit-Learn.
+    Classe que implementa a validação cruzada aninhada (nested) do modelo encontrado pela busca de hiper parâmetros de
+    modelos do Scikit-Learn.
+
+    A busca inteira é refeita dentro de cada fold de treino, o que mede sem viés o processo de busca, mas multiplica a
+    quantidade de fits pela quantidade de folds. Para validar apenas o melhor estimador encontrado utilize
+    BestEstimatorCrossValidatorScikitLearn.
     """
 
+    validation_mode = 'nested'
+
     def __init__(self,
                  log_level: int = 0,
                  n_jobs: int = -1):
@@ -35,15 +42,40 @@ class CrossValidatorScikitLearn(ScikitLearnBaseValidator):
 
         self.end_best_model_validation = time.time()
 
-        result = ScikitLearnCrossValidationResult(
-            mean=np.mean(scores),
-            standard_deviation=np.std(scores),
-            median=np.median(scores),
-            variance=np.var(scores),
-            standard_error=np.std(scores) / np.sqrt(len(scores)),
-            min_max_score=(round(float(np.min(scores)), 4), round(float(np.max(scores)), 4)),
-            estimator=searcher.best_estimator_,
-            scoring=scoring
-        )
-
-        return result
+        return self._create_result(scores, searcher.best_estimator_, scoring)
+
+
+class BestEstimatorCrossValidatorScikitLearn(ScikitLearnBaseValidator):
+    """
+    Classe que implementa a validação cruzada apenas do melhor estimador encontrado pela busca de hiper parâmetros.
+
+    Um clone do estimador com os melhores parâmetros, já congelados, é treinado e avaliado em cada fold, dessa forma a
+    validação realiza apenas um fit por fold ao invés de repetir a busca inteira.
+    """
+
+    validation_mode = 'best_estimator'
+
+    def __init__(self,
+                 log_level: int = 0,
+                 n_jobs: int = -1):
+        super().__init__(log_level, n_jobs)
+
+    def validate(self,
+                 searcher,
+                 data_x,
+                 data_y,
+                 cv,
+                 scoring='accuracy') -> ScikitLearnCrossValidationResult:
+        self.start_best_model_validation = time.time()
+
+        scores = cross_val_score(estimator=clone(searcher.best_estimator_),
+                                 X=data_x,
+                                 y=data_y,
+                                 cv=cv,
+                                 n_jobs=self.n_jobs,
+                                 verbose=self.log_level,
+                                 scoring=scoring)
+
+        self.end_best_model_validation = time.time()
+
+        return self._create_result(scores, searcher.best_estimator_, scoring)
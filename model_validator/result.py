@@ -28,7 +28,9 @@ class ScikitLearnCrossValidationResult(ValidationResult):
                  standard_error: float,
                  min_max_score: tuple[float, float],
                  estimator,
-                 scoring: str):
+                 scoring: str,
+                 validation_mode: str = 'nested',
+                 preprocessor=None):
         """
             :param mean: Média dos scores individuais, fornece uma estimativa central do desempenho do modelo.
             :param standard_deviation: Desvio Padrão, mede a variação dos scores em diferentes folds. Um Desvio Padrão
@@ -44,6 +46,10 @@ class ScikitLearnCrossValidationResult(ValidationResult):
             folds.
             :param estimator Estimador com os melhores parâmetros e que foi testado.
             :param scoring Métrica avalida.
+            :param validation_mode Estratégia de validação utilizada, por exemplo, 'nested' quando a busca foi refeita
+            em cada fold ou 'best_estimator' quando apenas o melhor estimador foi validado.
+            :param preprocessor Preprocessor treinado que transforma os dados brutos nas features utilizadas pelo
+            estimador, pode ser None.
         """
 
         self.mean = mean
@@ -54,6 +60,8 @@ class ScikitLearnCrossValidationResult(ValidationResult):
         self.min_max_score = min_max_score
         self.estimator = estimator
         self.scoring = scoring
+        self.validation_mode = validation_mode
+        self.preprocessor = preprocessor
 
     def append_data(self, pipeline_infos: dict[str, Any]) -> dict[str, Any]:
         pipeline_infos['scoring'] = self.scoring
@@ -64,5 +72,6 @@ class ScikitLearnCrossValidationResult(ValidationResult):
         pipeline_infos['standard_error'] = self.standard_error
         pipeline_infos['min_max_score'] = self.min_max_score
         pipeline_infos['scoring'] = self.scoring
+        pipeline_infos['validation_mode'] = self.validation_mode
 
         return pipeline_infos
\ No newline at end of file
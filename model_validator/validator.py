@@ -17,6 +17,12 @@ class ScikitLearnBaseValidator(ABC):
     Classe base para implementar validadores de estimadores do Scikit-Learn.
     """
 
+    validation_mode = None
+    """
+    Identificação da estratégia de validação, salva junto com o resultado para que os registros do histórico possam ser
+    comparados.
+    """
+
     def __init__(self,
                  log_level: int = 1,
                  n_jobs: int = -1):
@@ -39,6 +45,37 @@ class ScikitLearnBaseValidator(ABC):
         :return: Retorna um objeto CrossValScoreResult contendo as métricas matemáticas
         """
 
+    def get_config(self) -> dict:
+        """
+        Retorna a configuração que influencia no resultado da validação, ou seja, todos os atributos exceto os de
+        paralelismo, log e tempos de execução.
+        """
+        ignored = {'n_jobs', 'log_level', 'start_best_model_validation', 'end_best_model_validation'}
+
+        return {name: value for name, value in vars(self).items() if name not in ignored}
+
+    def _create_result(self, scores, estimator, scoring: str) -> ScikitLearnCrossValidationResult:
+        """
+        Função que calcula as métricas a partir dos scores de cada fold.
+
+        :param scores: Scores obtidos em cada fold da validação.
+
+        :param estimator: Estimador com os melhores parâmetros e que foi testado.
+
+        :param scoring: Métrica avaliada.
+        """
+        return ScikitLearnCrossValidationResult(
+            mean=np.mean(scores),
+            standard_deviation=np.std(scores),
+            median=np.median(scores),
+            variance=np.var(scores),
+            standard_error=np.std(scores) / np.sqrt(len(scores)),
+            min_max_score=(round(float(np.min(scores)), 4), round(float(np.max(scores)), 4)),
+            estimator=estimator,
+            scoring=scoring,
+            validation_mode=self.validation_mode
+        )
+
 
 class ClassifierFinalValidator:
     """
@@ -0,0 +1,194 @@
+import time
+
+import numpy as np
+from joblib import Parallel, delayed
+from sklearn.base import clone
+from sklearn.inspection import permutation_importance
+from sklearn.metrics import check_scoring
+
+from regression_vars_search.features_searcher import FeaturesSearcher
+
+
+class AdaptiveRecursiveFeatureSearcher(FeaturesSearcher):
+    """
+    Implementação de eliminação recursiva de features com validação cruzada, assim como o RFECV, mas que remove as
+    features em blocos adaptativos.
+
+    Primeiro as features são eliminadas em blocos grandes (uma fração das features restantes a cada rodada) e, depois
+    de encontrar a melhor quantidade entre esses tamanhos, a eliminação é refeita de uma em uma apenas no intervalo
+    vizinho ao melhor tamanho. A rodada fina de cada fold parte do estimador e das importâncias já calculados na rodada
+    grossa, sem refazer o caminho desde o início.
+
+    Os folds são processados em paralelo. Estimadores que não possuem feature_importances_ nem coef_, como o
+    KNeighborsClassifier e o GaussianProcessClassifier, utilizam a importância por permutação calculada nos dados de
+    teste do fold.
+    """
+
+    def __init__(self,
+                 n_jobs: int = -1,
+                 log_level: int = 0,
+                 min_features: int = 3,
+                 coarse_step: float = 0.25,
+                 permutation_repeats: int = 5):
+        """
+        :param n_jobs: Número de processos usados no processamento dos folds.
+
+        :param log_level: Nível de log do processo, isso impacta em quanta informação você verá no console.
+
+        :param min_features: Quantidade mínima de features que devem ser selecionadas.
+
+        :param coarse_step: Fração das features restantes removida a cada rodada da eliminação grossa. Sempre é removida
+        pelo menos uma feature por rodada.
+
+        :param permutation_repeats: Quantidade de vezes que cada feature é embaralhada no cálculo da importância por
+        permutação.
+        """
+        super().__init__(n_jobs, log_level)
+
+        self.min_features = min_features
+        self.coarse_step = coarse_step
+        self.permutation_repeats = permutation_repeats
+
+    def select_features(self, data_x, data_y, cv, scoring: str = 'accuracy', estimator=None):
+        self.start_search_features_time = time.time()
+
+        x = np.asarray(data_x)
+        y = np.asarray(data_y)
+        scorer = check_scoring(estimator, scoring=scoring)
+        random_state = np.random.randint(np.iinfo(np.int32).max)
+        folds = list(cv.split(x, y))
+
+        all_features = np.arange(x.shape[1])
+        coarse_sizes = self._get_coarse_sizes(x.shape[1])
+
+        coarse_paths = self._run_folds(
+            delayed(_eliminate)(estimator, x, y, train, test, coarse_sizes, scorer, (all_features, None),
+                                self.permutation_repeats, random_state)
+            for train, test in folds
+        )
+
+        best_position = self._get_best_position(coarse_sizes, coarse_paths)
+        upper_size = coarse_sizes[max(best_position - 1, 0)]
+        lower_size = coarse_sizes[min(best_position + 1, len(coarse_sizes) - 1)]
+        fine_sizes = list(range(upper_size - 1, lower_size, -1))
+
+        fine_paths = self._run_folds(
+            delayed(_eliminate)(estimator, x, y, train, test, fine_sizes, scorer, path[upper_size][1:],
+                                self.permutation_repeats, random_state, keep_last_importances=False)
+            for (train, test), path in zip(folds, coarse_paths)
+        )
+
+        paths = [{**coarse_path, **fine_path} for coarse_path, fine_path in zip(coarse_paths, fine_paths)]
+        sizes = sorted(paths[0].keys())
+        best_size = sizes[self._get_best_position(sizes, paths)]
+
+        final_sizes = [size for size in coarse_sizes if size >= upper_size]
+        final_sizes += list(range(upper_size - 1, best_size - 1, -1))
+        final_path = _eliminate(estimator, x, y, np.arange(x.shape[0]), None, final_sizes, scorer, (all_features, None),
+                                self.permutation_repeats, random_state, n_jobs=self.n_jobs, keep_last_importances=False)
+        support = np.sort(final_path[best_size][1])
+
+        self.end_search_features_time = time.time()
+
+        return data_x.iloc[:, support]
+
+    def _get_coarse_sizes(self, n_features: int) -> list[int]:
+        """
+        Retorna as quantidades de features avaliadas na eliminação grossa, da maior para a menor.
+        """
+        min_features = min(self.min_features, n_features)
+        sizes = [n_features]
+
+        while sizes[-1] > min_features:
+            removed = max(1, int(sizes[-1] * self.coarse_step))
+            sizes.append(max(min_features, sizes[-1] - removed))
+
+        return sizes
+
+    @staticmethod
+    def _get_best_position(sizes: list[int], paths: list[dict]) -> int:
+        """
+        Retorna a posição, dentro de sizes, da quantidade de features com a maior média de score entre os folds. Em caso
+        de empate é escolhida a menor quantidade, assim como no RFECV.
+        """
+        mean_scores = np.array([np.mean([path[size][0] for path in paths]) for size in sizes])
+        candidates = np.flatnonzero(mean_scores == mean_scores.max())
+
+        return int(min(candidates, key=lambda position: sizes[position]))
+
+    def _run_folds(self, tasks) -> list[dict]:
+        return Parallel(n_jobs=self.n_jobs, verbose=self.log_level)(tasks)
+
+
+def _eliminate(estimator,
+               x: np.ndarray,
+               y: np.ndarray,
+               train: np.ndarray,
+               test: np.ndarray | None,
+               sizes: list[int],
+               scorer,
+               start: tuple,
+               permutation_repeats: int,
+               random_state: int,
+               n_jobs: int = 1,
+               keep_last_importances: bool = True) -> dict:
+    """
+    Percorre o caminho de eliminação a partir das features e importâncias de start, removendo as features menos
+    importantes até atingir cada tamanho de sizes.
+
+    :param start: Tupla com as posições das features e as suas importâncias. Se as importâncias forem None, o primeiro
+    tamanho deve ser igual à quantidade de features de start.
+
+    :param test: Índices de teste do fold. Se for None o score não é calculado e a importância por permutação utiliza os
+    dados de treino.
+
+    :param keep_last_importances: Flag que indica se as importâncias do último tamanho devem ser calculadas, elas só são
+    necessárias quando o caminho for continuado depois.
+
+    :return: Dicionário com o tamanho como chave e uma tupla com o score, as posições das features e as importâncias.
+    """
+    features, importances = start
+    evaluation_rows = train if test is None else test
+    path = {}
+
+    for position, size in enumerate(sizes):
+        if importances is not None:
+            features = _drop_least_important(features, importances, len(features) - size)
+
+        model = clone(estimator).fit(x[np.ix_(train, features)], y[train])
+        score = None if test is None else scorer(model, x[np.ix_(test, features)], y[test])
+
+        if keep_last_importances or position < len(sizes) - 1:
+            importances = _get_importances(model, x[np.ix_(evaluation_rows, features)], y[evaluation_rows], scorer,
+                                           permutation_repeats, random_state, n_jobs)
+        else:
+            importances = None
+
+        path[size] = (score, features, importances)
+
+    return path
+
+
+def _drop_least_important(features: np.ndarray, importances: np.ndarray, count: int) -> np.ndarray:
+    order = np.argsort(importances, kind='stable')
+
+    return features[np.sort(order[count:])]
+
+
+def _get_importances(model, x: np.ndarray, y: np.ndarray, scorer, repeats: int, random_state: int, n_jobs: int):
+    """
+    Retorna a importância de cada feature para o modelo treinado, utilizando feature_importances_, o valor absoluto de
+    coef_ ou, quando nenhum dos dois existir, a importância por permutação.
+    """
+    if hasattr(model, 'feature_importances_'):
+        return np.asarray(model.feature_importances_)
+
+    if hasattr(model, 'coef_'):
+        coef = np.abs(np.asarray(model.coef_))
+
+        return coef.sum(axis=0) if coef.ndim > 1 else coef
+
+    result = permutation_importance(model, x, y, scoring=scorer, n_repeats=repeats, random_state=random_state,
+                                    n_jobs=n_jobs)
+
+    return result.importances_mean
@@ -3,6 +3,12 @@ from abc import ABC, abstractmethod
 
 class FeaturesSearcher(ABC):
 
+    uses_estimator = True
+    """
+    Indica se a seleção depende do estimador do pipeline. Quando não depende, a mesma seleção pode ser reaproveitada por
+    pipelines de estimadores diferentes.
+    """
+
     def __init__(self,
                  n_jobs: int = -1,
                  log_level: int = 0):
@@ -29,4 +35,13 @@ class FeaturesSearcher(ABC):
         :param estimator: Estimador que será considerado na busca da features.
 
         :return Retorna um novo data_x contendo apenas as colunas das features selecionadas.
-        """
\ No newline at end of file
+        """
+
+    def get_config(self) -> dict:
+        """
+        Retorna a configuração que influencia no resultado da seleção, ou seja, todos os atributos exceto os de
+        paralelismo, log e tempos de execução.
+        """
+        ignored = {'n_jobs', 'log_level', 'start_search_features_time', 'end_search_features_time'}
+
+        return {name: value for name, value in vars(self).items() if name not in ignored}
@@ -0,0 +1,285 @@
+import time
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+from regression_vars_search.features_searcher import FeaturesSearcher
+
+
+class ClassStatistics:
+    """
+    Estatísticas suficientes de cada classe do target, acumuladas em uma única passada pelos dados: quantidade de
+    amostras, soma e soma dos quadrados de cada feature. Opcionalmente também acumula X^T X, utilizado no cálculo da
+    correlação entre as features.
+
+    Todas as estatísticas são calculadas com multiplicações de matrizes sobre todas as colunas ao mesmo tempo, e os dados
+    podem ser processados em blocos de linhas para limitar a memória utilizada.
+    """
+
+    def __init__(self, classes: np.ndarray, n_features: int, with_products: bool = False):
+        """
+        :param classes: Classes existentes no target.
+
+        :param n_features: Quantidade de features.
+
+        :param with_products: Flag que indica se X^T X deve ser acumulado.
+        """
+        self.classes = classes
+        self.counts = np.zeros(len(classes))
+        self.sums = np.zeros((len(classes), n_features))
+        self.squared_sums = np.zeros((len(classes), n_features))
+        self.minimum = np.full(n_features, np.inf)
+        self.products = np.zeros((n_features, n_features)) if with_products else None
+
+    @classmethod
+    def from_data(cls, x: np.ndarray, y: np.ndarray, chunk_size: int = None, with_products: bool = False):
+        """
+        Calcula as estatísticas dos dados.
+
+        :param x: Valores de x (features).
+
+        :param y: Valores de y (target).
+
+        :param chunk_size: Quantidade de linhas processadas por vez. Se não for definido todas as linhas são processadas
+        de uma vez.
+
+        :param with_products: Flag que indica se X^T X deve ser acumulado.
+        """
+        statistics = cls(np.unique(y), x.shape[1], with_products)
+        chunk_size = chunk_size or max(len(x), 1)
+
+        for start in range(0, len(x), chunk_size):
+            statistics.update(x[start:start + chunk_size], y[start:start + chunk_size])
+
+        return statistics
+
+    def update(self, x: np.ndarray, y: np.ndarray):
+        """
+        Acumula um bloco de linhas nas estatísticas.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        membership = (np.asarray(y)[:, None] == self.classes[None, :]).astype(np.float64)
+
+        self.counts += membership.sum(axis=0)
+        self.sums += membership.T @ x
+        self.squared_sums += membership.T @ np.square(x)
+        self.minimum = np.minimum(self.minimum, x.min(axis=0, initial=np.inf))
+
+        if self.products is not None:
+            self.products += x.T @ x
+
+    @property
+    def n_samples(self) -> float:
+        return self.counts.sum()
+
+    def anova_f(self) -> np.ndarray:
+        """
+        Retorna a estatística F da ANOVA de cada feature em relação às classes, o mesmo valor do f_classif.
+        """
+        total_sums = self.sums.sum(axis=0)
+        correction = np.square(total_sums) / self.n_samples
+
+        total_variation = self.squared_sums.sum(axis=0) - correction
+        between_variation = (np.square(self.sums) / self.counts[:, None]).sum(axis=0) - correction
+        within_variation = total_variation - between_variation
+
+        between_degrees = len(self.classes) - 1
+        within_degrees = self.n_samples - len(self.classes)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (between_variation / between_degrees) / (within_variation / within_degrees)
+
+    def chi2(self) -> np.ndarray:
+        """
+        Retorna a estatística chi² de cada feature em relação às classes, o mesmo valor do chi2 do scikit-learn. As
+        features devem ser não negativas, como contagens ou colunas do get_dummies.
+        """
+        if np.any(self.minimum < 0):
+            raise ValueError('A estatística chi² só pode ser calculada com features não negativas.')
+
+        expected = (self.counts / self.n_samples)[:, None] * self.sums.sum(axis=0)[None, :]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return (np.square(self.sums - expected) / expected).sum(axis=0)
+
+    def correlation(self) -> np.ndarray:
+        """
+        Retorna a matriz de correlação de Pearson entre as features, calculada a partir de X^T X.
+        """
+        if self.products is None:
+            raise ValueError('As estatísticas devem ser calculadas com with_products=True.')
+
+        means = self.sums.sum(axis=0) / self.n_samples
+        covariance = self.products / self.n_samples - np.outer(means, means)
+        deviations = np.sqrt(np.clip(np.diag(covariance), 0, None))
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = covariance / np.outer(deviations, deviations)
+
+        return np.nan_to_num(correlation)
+
+
+class FilterFeatureSearcher(FeaturesSearcher, ABC):
+    """
+    Implementação base dos searchers de filtro, que pontuam todas as features de uma vez com uma estatística em relação
+    ao target e selecionam as feature_number melhores. Não dependem do estimador nem da validação cruzada, por isso são
+    muito mais rápidos que os searchers recursivos e podem ser utilizados como pré-filtro deles.
+    """
+
+    uses_estimator = False
+
+    def __init__(self,
+                 n_jobs: int = -1,
+                 log_level: int = 0,
+                 feature_number: int = 3,
+                 chunk_size: int = None):
+        """
+        :param n_jobs: Mantido por compatibilidade, os cálculos são vetorizados e não utilizam processos.
+
+        :param log_level: Nível de log do processo, isso impacta em quanta informação você verá no console.
+
+        :param feature_number: Quantidade de features que devem ser selecionadas.
+
+        :param chunk_size: Quantidade de linhas processadas por vez no cálculo das estatísticas. Se não for definido
+        todas as linhas são processadas de uma vez.
+        """
+        super().__init__(n_jobs, log_level)
+
+        self.feature_number = feature_number
+        self.chunk_size = chunk_size
+
+    def select_features(self, data_x, data_y, cv, scoring: str = 'accuracy', estimator=None):
+        self.start_search_features_time = time.time()
+
+        x = np.asarray(data_x, dtype=np.float64)
+        y = np.asarray(data_y)
+
+        support = self._select(x, y)
+
+        self.end_search_features_time = time.time()
+
+        return data_x.iloc[:, np.sort(support)]
+
+    def _select(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Retorna as posições das features selecionadas. Por padrão são as feature_number features de maior score.
+        """
+        scores = np.nan_to_num(self._score_features(x, y), nan=-np.inf)
+        number = min(self.feature_number, x.shape[1])
+
+        return np.argsort(-scores, kind='stable')[:number]
+
+    @abstractmethod
+    def _score_features(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Retorna o score de cada feature, quanto maior melhor.
+        """
+
+
+class AnovaFeatureSearcher(FilterFeatureSearcher):
+    """
+    Searcher que seleciona as features com maior estatística F da ANOVA em relação às classes do target.
+    """
+
+    def _score_features(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return ClassStatistics.from_data(x, y, self.chunk_size).anova_f()
+
+
+class Chi2FeatureSearcher(FilterFeatureSearcher):
+    """
+    Searcher que seleciona as features com maior estatística chi² em relação às classes do target. As features devem ser
+    não negativas.
+    """
+
+    def _score_features(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return ClassStatistics.from_data(x, y, self.chunk_size).chi2()
+
+
+class MutualInformationFeatureSearcher(FilterFeatureSearcher):
+    """
+    Searcher que seleciona as features com maior informação mútua em relação às classes do target. As features
+    contínuas são discretizadas por quantis e a tabela de contagens de todas as features é montada com um único
+    bincount por bloco de linhas.
+    """
+
+    def __init__(self,
+                 n_jobs: int = -1,
+                 log_level: int = 0,
+                 feature_number: int = 3,
+                 chunk_size: int = None,
+                 n_bins: int = 10):
+        """
+        :param n_bins: Quantidade máxima de faixas utilizadas na discretização das features.
+        """
+        super().__init__(n_jobs, log_level, feature_number, chunk_size)
+
+        self.n_bins = n_bins
+
+    def _score_features(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return _mutual_information(x, y, self.n_bins, self.chunk_size)
+
+
+class MRMRFeatureSearcher(FilterFeatureSearcher):
+    """
+    Searcher que utiliza a estratégia mRMR (minimum redundancy, maximum relevance). As features são escolhidas uma a uma
+    e a cada passo é escolhida a feature com a maior razão entre a relevância (estatística F) e a redundância (média da
+    correlação absoluta com as features já escolhidas).
+
+    A estatística F e a matriz de correlação são obtidas das mesmas estatísticas suficientes, calculadas em uma passada.
+    """
+
+    def _score_features(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        return ClassStatistics.from_data(x, y, self.chunk_size).anova_f()
+
+    def _select(self, x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        statistics = ClassStatistics.from_data(x, y, self.chunk_size, with_products=True)
+
+        relevance = np.nan_to_num(statistics.anova_f(), nan=0.0, posinf=0.0)
+        redundancy = np.abs(statistics.correlation())
+        number = min(self.feature_number, x.shape[1])
+
+        selected = [int(np.argmax(relevance))]
+        redundancy_sum = redundancy[selected[0]].copy()
+        available = np.ones(x.shape[1], dtype=bool)
+        available[selected[0]] = False
+
+        while len(selected) < number:
+            with np.errstate(divide='ignore', invalid='ignore'):
+                scores = relevance / (redundancy_sum / len(selected))
+
+            scores = np.where(available, np.nan_to_num(scores, nan=-np.inf, posinf=np.finfo(float).max), -np.inf)
+            chosen = int(np.argmax(scores))
+
+            selected.append(chosen)
+            redundancy_sum += redundancy[chosen]
+            available[chosen] = False
+
+        return np.array(selected)
+
+
+def _mutual_information(x: np.ndarray, y: np.ndarray, n_bins: int, chunk_size: int = None) -> np.ndarray:
+    """
+    Calcula a informação mútua entre cada feature discretizada e o target.
+    """
+    classes, y_codes = np.unique(y, return_inverse=True)
+    n_features = x.shape[1]
+
+    edges = np.quantile(x, np.linspace(0, 1, n_bins + 1)[1:-1], axis=0)
+    offsets = (np.arange(n_features) * n_bins)[None, :]
+    counts = np.zeros(n_features * n_bins * len(classes))
+    chunk_size = chunk_size or max(len(x), 1)
+
+    for start in range(0, len(x), chunk_size):
+        chunk = x[start:start + chunk_size]
+        bins = (chunk[:, None, :] > edges[None, :, :]).sum(axis=1)
+        cells = (offsets + bins) * len(classes) + y_codes[start:start + chunk_size, None]
+        counts += np.bincount(cells.ravel(), minlength=counts.size)
+
+    joint = counts.reshape(n_features, n_bins, len(classes)) / len(x)
+    bin_probabilities = joint.sum(axis=2, keepdims=True)
+    class_probabilities = joint.sum(axis=1, keepdims=True)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        terms = joint * np.log(joint / (bin_probabilities * class_probabilities))
+
+    return np.nansum(terms, axis=(1, 2))
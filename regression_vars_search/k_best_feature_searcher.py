@@ -7,18 +7,28 @@ from regression_vars_search.features_searcher import FeaturesSearcher
 
 class SelectKBestFeatureSearcher(FeaturesSearcher):
 
+    uses_estimator = False
+
     def __init__(self,
                  n_jobs: int = -1,
                  log_level: int = 0,
-                 feature_number: int = 3):
+                 feature_number: int = 3,
+                 score_func=f_regression):
+        """
+        :param feature_number: Quantidade de features que devem ser selecionadas.
+
+        :param score_func: Função de score utilizada pelo SelectKBest. Para classificação utilize f_classif, chi2 ou
+        mutual_info_classif, ou um dos FilterFeatureSearcher.
+        """
         super().__init__(n_jobs, log_level)
 
         self.feature_number = feature_number
+        self.score_func = score_func
 
     def select_features(self, data_x, data_y, cv, scoring: str = 'accuracy', estimator=None):
         self.start_search_features_time = time.time()
 
-        searcher = SelectKBest(score_func=f_regression, k=self.feature_number)
+        searcher = SelectKBest(score_func=self.score_func, k=self.feature_number)
         searcher.fit_transform(data_x, data_y)
 
         self.end_search_features_time = time.time()
@@ -0,0 +1,50 @@
+from regression_vars_search.features_searcher import FeaturesSearcher
+
+
+class PreFilterFeatureSearcher(FeaturesSearcher):
+    """
+    Implementação que combina dois searchers: um pré-filtro barato, normalmente um FilterFeatureSearcher, reduz a
+    quantidade de colunas e depois o searcher principal, como o RecursiveFeatureSearcher, faz a seleção final apenas
+    entre as colunas que restaram.
+    """
+
+    def __init__(self,
+                 pre_filter: FeaturesSearcher,
+                 searcher: FeaturesSearcher,
+                 n_jobs: int = -1,
+                 log_level: int = 0):
+        """
+        :param pre_filter: Searcher executado primeiro, sobre todas as features.
+
+        :param searcher: Searcher executado sobre as features selecionadas pelo pre_filter.
+
+        :param n_jobs: Número de processos usados pelos searchers.
+
+        :param log_level: Nível de log do processo, isso impacta em quanta informação você verá no console.
+        """
+        super().__init__(n_jobs, log_level)
+
+        self.pre_filter = pre_filter
+        self.searcher = searcher
+
+    @property
+    def uses_estimator(self) -> bool:
+        return self.pre_filter.uses_estimator or self.searcher.uses_estimator
+
+    def select_features(self, data_x, data_y, cv, scoring: str = 'accuracy', estimator=None):
+        self.pre_filter.n_jobs = self.n_jobs
+        self.searcher.n_jobs = self.n_jobs
+
+        filtered_x = self.pre_filter.select_features(data_x, data_y, cv, scoring, estimator)
+        features = self.searcher.select_features(filtered_x, data_y, cv, scoring, estimator)
+
+        self.start_search_features_time = self.pre_filter.start_search_features_time
+        self.end_search_features_time = self.searcher.end_search_features_time
+
+        return features
+
+    def get_config(self) -> dict:
+        return {
+            'pre_filter': (type(self.pre_filter).__qualname__, self.pre_filter.get_config()),
+            'searcher': (type(self.searcher).__qualname__, self.searcher.get_config())
+        }
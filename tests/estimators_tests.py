@@ -1,6 +1,5 @@
 import warnings
 
-import pandas as pd
 from scipy.stats import randint, uniform
 from sklearn.ensemble import AdaBoostClassifier, RandomForestClassifier
 from sklearn.gaussian_process import GaussianProcessClassifier
@@ -9,28 +8,24 @@ from sklearn.neural_network import MLPClassifier
 from sklearn.svm import SVC
 from sklearn.tree import DecisionTreeClassifier
 
-from data.data_processing import get_train_data
+from data.data_processing import get_encoded_train_data
 from hiper_params_search.random_searcher import RandomHipperParamsSearcher
 from manager.history_manager import CrossValidationHistoryManager
 from manager.multi_process_manager import ScikitLearnPipeline, ScikitLearnMultiProcessManager
-from model_validator.cross_validator import CrossValidatorScikitLearn
+from model_validator.cross_validator import BestEstimatorCrossValidatorScikitLearn
 from model_validator.validator import ClassifierFinalValidator
 from regression_vars_search.recursive_feature_searcher import RecursiveFeatureSearcher
 
 warnings.filterwarnings("ignore", category=RuntimeWarning)
 
-df_train = get_train_data()
+df_train, preprocessor = get_encoded_train_data()
 
 x = df_train.drop(columns=['sobreviveu'], axis=1)
-
-obj_columns = df_train.select_dtypes(include='object').columns
-
-x = pd.get_dummies(x, columns=obj_columns)
 y = df_train['sobreviveu']
 
 feature_searcher = RecursiveFeatureSearcher(log_level=1, n_jobs=8)
 params_searcher = RandomHipperParamsSearcher(number_iterations=500, log_level=1, n_jobs=8)
-cross_validator = CrossValidatorScikitLearn(log_level=1, n_jobs=8)
+cross_validator = BestEstimatorCrossValidatorScikitLearn(log_level=1, n_jobs=8)
 
 pipelines = [
     ScikitLearnPipeline(
@@ -47,6 +42,7 @@ pipelines = [
         feature_searcher=feature_searcher,
         params_searcher=params_searcher,
         validator=cross_validator,
+        preprocessor=preprocessor,
         history_manager=CrossValidationHistoryManager(
             output_directory='history',
             models_directory='decision_tree_classifier_models',
@@ -66,6 +62,7 @@ pipelines = [
         feature_searcher=feature_searcher,
         params_searcher=params_searcher,
         validator=cross_validator,
+        preprocessor=preprocessor,
         history_manager=CrossValidationHistoryManager(
             output_directory='history',
             models_directory='random_forest_classifier_models',
@@ -82,6 +79,7 @@ pipelines = [
         feature_searcher=feature_searcher,
         params_searcher=params_searcher,
         validator=cross_validator,
+        preprocessor=preprocessor,
         history_manager=CrossValidationHistoryManager(
             output_directory='history',
             models_directory='gausian_process_classifier_models',
@@ -100,6 +98,7 @@ pipelines = [
         feature_searcher=feature_searcher,
         params_searcher=params_searcher,
         validator=cross_validator,
+        preprocessor=preprocessor,
         history_manager=CrossValidationHistoryManager(
             output_directory='history',
             models_directory='k_neighbors_classifier_models',